@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.jobs'
-    verbose_name = 'Jobs' 
\ No newline at end of file
+    verbose_name = 'Jobs'
+
+    def ready(self):
+        from . import signals  # noqa
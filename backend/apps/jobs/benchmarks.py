@@ -0,0 +1,123 @@
+"""
+Helpers shared by the ``bench_*`` management commands.
+
+Benchmarks build throwaway data inside a transaction that is rolled back
+at the end, so they can run against a development database without
+leaving anything behind.
+"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from . import geo
+from .models import Job
+
+User = get_user_model()
+
+TITLES = [
+    'Lawn Mowing & Yard Work', 'Private Math Tutor', 'Lifeguard', 'Camp Counselor',
+    'Retail Assistant', 'Pet Sitter & Dog Walker', 'Babysitter', 'Grocery Store Clerk',
+    'Library Assistant', 'Restaurant Host/Hostess', 'Barista', 'Snow Shovelling',
+    'Swim Instructor', 'Cashier', 'Dishwasher', 'Warehouse Helper', 'Soccer Referee',
+    'Coding Instructor', 'Car Wash Attendant', 'Movie Theatre Usher',
+]
+COMPANIES = [
+    'Green Thumb Services', 'Toronto Math Academy', 'Toronto Community Centres',
+    'High Park Nature Camp', 'Yorkdale Shopping Centre', 'Pawsome Pet Care',
+    'Family Care Network', 'Fresh Market', 'Toronto Public Library', 'Downtown Diner',
+    'Bean There Cafe', 'City Youth Soccer', 'Ultimate Coders', 'Cineplex Yonge',
+]
+LOCATIONS = [
+    'Scarborough, ON', 'North York, ON', 'Etobicoke, ON', 'Toronto, ON', 'Mississauga, ON',
+    'Markham, ON', 'Vaughan, ON', 'Brampton, ON', 'Oakville, ON', 'Richmond Hill, ON',
+]
+TAGS = [
+    'Outdoors', 'Flexible', 'Physical Work', 'Garden', 'Education', 'Math', 'Teaching',
+    'Safety', 'Swimming', 'Leadership', 'Community', 'Summer', 'Children', 'Retail',
+    'Customer Service', 'Animals', 'Pet Care', 'Childcare', 'Evenings', 'Food',
+    'Library', 'Books', 'Restaurant', 'Hospitality', 'Sports', 'Technology', 'Weekends',
+]
+REQUIREMENTS = [
+    'Must be 14+ years old', 'Must be 15+ years old', 'Must be 16+ years old',
+    'Reliable transportation', 'First aid certification preferred',
+    'Available weekends and after school', 'Good communication skills',
+    'Friendly and outgoing personality', 'Basic computer skills', 'Love for animals',
+]
+WORDS = (
+    'help customers maintain store lawns gardens students tutor math lead outdoor '
+    'activities supervise children summer camp pool safety swimmers shelve books '
+    'assist patrons greet guests manage reservations walk dogs feed pets stock '
+    'shelves inventory prepare meals homework friendly flexible hours weekend '
+    'evening shifts responsibility leadership teamwork training provided great '
+    'opportunity develop skills community service clean organize schedule'
+).split()
+
+
+def make_jobs(count, employer, seed=0, locations=LOCATIONS):
+    """
+    Return ``count`` unsaved, realistic-looking ``Job`` instances. Jobs are
+    scattered a few kilometres around their place's gazetteer coordinates,
+    as if geocoded from street addresses.
+    """
+    rng = random.Random(seed)
+    points = {place['key']: (place['latitude'], place['longitude']) for place in geo.read_gazetteer()}
+    jobs = []
+    for _ in range(count):
+        rate_min = Decimal(rng.randrange(1400, 3000)) / 100
+        location = rng.choice(locations)
+        latitude, longitude = points[geo.place_key(location)]
+        jobs.append(Job(
+            **geo.point_fields(latitude + rng.uniform(-0.05, 0.05), longitude + rng.uniform(-0.05, 0.05)),
+            title=rng.choice(TITLES),
+            company=rng.choice(COMPANIES),
+            location=location,
+            hourly_rate_min=rate_min,
+            hourly_rate_max=rate_min + rng.choice([0, 2, 5, 10]),
+            pay_bucket=Job.pay_bucket_for(rate_min),
+            job_type=rng.choice(Job.JOB_TYPE_CHOICES)[0],
+            schedule=rng.choice(Job.SCHEDULE_CHOICES)[0],
+            description=' '.join(rng.choice(WORDS) for _ in range(rng.randint(25, 60))),
+            requirements=rng.sample(REQUIREMENTS, 3),
+            tags=rng.sample(TAGS, rng.randint(2, 5)),
+            rating=Decimal(rng.randint(30, 50)) / 10,
+            review_count=rng.randint(0, 80),
+            featured=rng.random() < 0.05,
+            employer=employer,
+        ))
+    return jobs
+
+
+def create_jobs(count, seed=0, batch_size=5000, locations=LOCATIONS):
+    """Bulk-insert ``count`` synthetic jobs owned by a throwaway employer."""
+    employer = User.objects.create(username=f'bench-employer-{seed}', email=f'bench-{seed}@example.com')
+    for start in range(0, count, batch_size):
+        jobs = make_jobs(min(batch_size, count - start), employer, seed=f'{seed}-{start}', locations=locations)
+        Job.objects.bulk_create(jobs)
+    return employer
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def measure(fn, repeat=20):
+    """Call ``fn`` ``repeat`` times and return timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': statistics.median(timings),
+        'min_ms': min(timings),
+        'max_ms': max(timings),
+    }
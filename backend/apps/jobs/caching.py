@@ -0,0 +1,109 @@
+"""
+Cache for rendered job payloads (the homepage feeds).
+
+Entries are stamped with the job *generation*, a token that is replaced
+whenever a ``Job`` is written, so invalidation is a single cache write no
+matter how many entries exist. Stale entries are not deleted: while one
+request holds the rebuild lock the others keep serving the old payload,
+so an invalidation triggers exactly one rebuild instead of a stampede.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+GENERATION_KEY = 'jobs:generation'
+STATS_KEY = 'jobs:cache-stats:{}'
+STATS = ['hit', 'miss', 'stale']
+
+# How long a stale entry stays around to be served during a rebuild
+STALE_GRACE = 300
+LOCK_TIMEOUT = 10
+# How long a request without any cached copy waits for another rebuilder
+COLD_WAIT = 2.0
+COLD_POLL = 0.05
+
+
+def current_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate():
+    """Mark every cached job payload as stale."""
+    cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def _record(outcome):
+    key = STATS_KEY.format(outcome)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); losing one sample is fine
+        pass
+
+
+def stats():
+    """Return the hit/miss/stale counters recorded so far."""
+    values = cache.get_many([STATS_KEY.format(outcome) for outcome in STATS])
+    return {outcome: values.get(STATS_KEY.format(outcome), 0) for outcome in STATS}
+
+
+def get_or_build(name, build, timeout=None):
+    """
+    Return ``(payload, outcome)`` for the cache entry ``name``.
+
+    ``build`` renders a fresh payload. ``outcome`` is ``'HIT'``, ``'MISS'``
+    (this call rebuilt it) or ``'STALE'`` (another request is rebuilding
+    and the previous payload was served).
+    """
+    timeout = timeout or settings.JOB_FEED_CACHE_TIMEOUT
+    key = f'jobs:payload:{name}'
+    entry = cache.get(key)
+    generation = current_generation()
+
+    if _is_fresh(entry, generation, timeout):
+        _record('hit')
+        return entry['payload'], 'HIT'
+
+    lock = f'{key}:lock'
+    if cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+        try:
+            payload = build()
+            cache.set(key, {
+                'payload': payload,
+                'generation': generation,
+                'built_at': time.time(),
+            }, timeout=timeout + STALE_GRACE)
+        finally:
+            cache.delete(lock)
+        _record('miss')
+        return payload, 'MISS'
+
+    if entry is not None:
+        _record('stale')
+        return entry['payload'], 'STALE'
+
+    # Cold cache and somebody else is rebuilding: wait for them briefly
+    deadline = time.monotonic() + COLD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(COLD_POLL)
+        entry = cache.get(key)
+        if entry is not None:
+            _record('hit')
+            return entry['payload'], 'HIT'
+
+    _record('miss')
+    return build(), 'MISS'
+
+
+def _is_fresh(entry, generation, timeout):
+    return (
+        entry is not None
+        and entry['generation'] == generation
+        and time.time() - entry['built_at'] < timeout
+    )
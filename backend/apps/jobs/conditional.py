@@ -0,0 +1,87 @@
+"""
+Conditional GET (``ETag``/``If-None-Match``) for the polled job and
+application lists.
+
+The validator comes from one aggregate over the filtered queryset: the
+newest modification timestamp(s) plus the row count. The count catches
+rows that were deleted or left the filter, which never move the maximum.
+The short homepage feeds and ``?cursor=`` pages hash the ids and
+timestamps of their own rows instead, so they never count the whole list.
+A repeat request is answered ``304 Not Modified`` after that single
+query, before any row is fetched or serialized.
+
+Bodies also carry relative ages ("5 minutes ago") rendered against the
+current time, so the validator changes every ``JOB_FEED_CACHE_TIMEOUT``
+seconds as well. A client revalidating a quiet list gets a fresh body as
+often as the feed cache rebuilds one, not only when a row changes.
+
+``Last-Modified`` is sent as well, but ``If-Modified-Since`` alone is not
+honoured: with one-second resolution and no view of removed rows it would
+answer 304 for lists that did change.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def validators(queryset, timestamps, *salt):
+    """
+    Return ``(etag, last_modified)`` for ``queryset``. ``timestamps`` are
+    the field paths whose maximum marks a change (e.g. ``job__updated_at``
+    for data rendered from a related row); ``salt`` is anything else the
+    response body depends on. A sliced queryset (a feed, or the rows of a
+    keyset page) is read row by row.
+    """
+    if queryset.query.is_sliced:
+        # A short feed or page: its ids and timestamps, as membership can change
+        # without moving the maximum or the count
+        rows = list(queryset.values_list('pk', *timestamps))
+        state = rows
+        stamps = [stamp for row in rows for stamp in row[1:]]
+    else:
+        aggregates = {f'modified_{index}': Max(path) for index, path in enumerate(timestamps)}
+        row = queryset.order_by().aggregate(rows=Count('pk'), **aggregates)
+        stamps = [row[name] for name in aggregates]
+        state = [row['rows'], *stamps]
+    digest = hashlib.sha1(repr([*state, *salt]).encode('utf-8')).hexdigest()
+    last_modified = max((stamp for stamp in stamps if stamp is not None), default=None)
+    return quote_etag(digest), last_modified
+
+
+def age_bucket():
+    """The current ``JOB_FEED_CACHE_TIMEOUT``-long window, for validators of bodies with relative ages."""
+    return int(time.time() // settings.JOB_FEED_CACHE_TIMEOUT)
+
+
+def respond(request, queryset, timestamps, render, private=False):
+    """
+    Return ``304 Not Modified`` when the client's ``If-None-Match`` still
+    matches ``queryset``, otherwise ``render()``. Either way the response
+    carries the validators. ``private`` responses depend on the user.
+    """
+    salt = [request.get_full_path(), request.META.get('HTTP_ACCEPT', ''), age_bucket()]
+    if private:
+        salt.append(request.user.pk)
+    etag, last_modified = validators(queryset, timestamps, *salt)
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = render()
+        # A stale cached payload (see caching.get_or_build) predates the
+        # validator; tagging it would pin the client to the old body
+        if response.status_code != 200 or response.get('X-Cache') == 'STALE':
+            return response
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Always revalidate, so a changed list is never served from a cache
+    if private:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ['Accept'])
+    return response
@@ -0,0 +1,132 @@
+"""
+Per-job application counters.
+
+``Job.applications_total`` and one ``Job.applications_<status>`` column
+per ``JobApplication.STATUS_CHOICES`` value count a job's applications.
+Employer listings read the counts with the jobs instead of running a
+``COUNT ... GROUP BY`` per card.
+
+The views call the functions below for every application they create,
+delete or move to another status, in the same transaction as that write.
+Each call is one ``UPDATE`` of ``F()`` expressions, so concurrent
+writers never lose an increment. Writes that go around the views (bulk
+inserts, cascades from deleted users, the admin) leave the counters off;
+``reconcile()`` (the ``reconcile_application_counts`` command) recounts
+them in bulk.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from .models import APPLICATION_COUNTER_FIELDS, APPLICATION_STATUS_COUNTERS, Job, JobApplication
+
+TOTAL = 'applications_total'
+RECONCILE_BATCH_SIZE = 1000
+
+
+def _adjust(job_id, deltas, jobs=None):
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes:
+        return (Job.objects if jobs is None else jobs).filter(pk=job_id).update(**changes)
+    return 0
+
+
+def added(job_id, status, jobs=None):
+    """
+    An application with ``status`` was created for the job. With ``jobs``,
+    only count it if the job is in that queryset; returns whether it was.
+    """
+    return bool(_adjust(job_id, {TOTAL: 1, APPLICATION_STATUS_COUNTERS[status]: 1}, jobs))
+
+
+def added_to_each(job_ids, status):
+    """One application with ``status`` was created for each of ``job_ids``."""
+    field = APPLICATION_STATUS_COUNTERS[status]
+    Job.objects.filter(pk__in=job_ids).update(**{TOTAL: F(TOTAL) + 1, field: F(field) + 1})
+
+
+def removed(job_id, status):
+    """An application with ``status`` was deleted from the job."""
+    _adjust(job_id, {TOTAL: -1, APPLICATION_STATUS_COUNTERS[status]: -1})
+
+
+def moved(job_id, old_status, new_status):
+    """One of the job's applications went from ``old_status`` to ``new_status``."""
+    if old_status != new_status:
+        _adjust(job_id, {APPLICATION_STATUS_COUNTERS[old_status]: -1, APPLICATION_STATUS_COUNTERS[new_status]: 1})
+
+
+def moved_many(moves, new_status):
+    """
+    Applications moved to ``new_status``, given as ``{job_id: {old_status:
+    count}}``. One ``UPDATE`` covers every job, with a ``CASE`` on the job
+    id picking each job's change per counter.
+    """
+    deltas = {}
+    for job_id, old_statuses in moves.items():
+        for old_status, count in old_statuses.items():
+            if old_status == new_status:
+                continue
+            for field, delta in ((APPLICATION_STATUS_COUNTERS[old_status], -count),
+                                 (APPLICATION_STATUS_COUNTERS[new_status], count)):
+                per_job = deltas.setdefault(field, {})
+                per_job[job_id] = per_job.get(job_id, 0) + delta
+    changes = {
+        field: F(field) + Case(
+            *(When(pk=job_id, then=Value(delta)) for job_id, delta in per_job.items()),
+            default=Value(0), output_field=IntegerField(),
+        )
+        for field, per_job in deltas.items()
+    }
+    if changes:
+        Job.objects.filter(pk__in=moves).update(**changes)
+
+
+def as_dict(row):
+    """``{'total': n, '<status>': n, ...}`` from a row holding the counter columns."""
+    counts = {'total': row[TOTAL]}
+    counts.update((status, row[field]) for status, field in APPLICATION_STATUS_COUNTERS.items())
+    return counts
+
+
+def recount(job_ids):
+    """The counter values ``JobApplication`` implies for ``job_ids``: ``{job_id: {field: count}}``."""
+    counts = {job_id: dict.fromkeys(APPLICATION_COUNTER_FIELDS, 0) for job_id in job_ids}
+    rows = (
+        JobApplication.objects.filter(job_id__in=job_ids).order_by()
+        .values_list('job_id', 'status').annotate(count=Count('id'))
+    )
+    for job_id, status, count in rows:
+        counts[job_id][TOTAL] += count
+        counts[job_id][APPLICATION_STATUS_COUNTERS[status]] = count
+    return counts
+
+
+def reconcile(batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Recount every job's counters from its applications, ``batch_size``
+    jobs per transaction, and write back the ones that drifted. Returns
+    ``(jobs checked, jobs corrected)``.
+    """
+    checked = corrected = 0
+    last_id = 0
+    while True:
+        job_ids = list(
+            Job.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not job_ids:
+            return checked, corrected
+        last_id = job_ids[-1]
+        with transaction.atomic():
+            batch = Job.objects.filter(id__in=job_ids)
+            # Write first: that takes the lock concurrent applies need, so
+            # nothing changes between the recount and the write-back
+            batch.update(**{TOTAL: F(TOTAL)})
+            stored = {row['id']: row for row in batch.values('id', *APPLICATION_COUNTER_FIELDS)}
+            drifted = []
+            for job_id, counts in recount(job_ids).items():
+                row = stored.get(job_id)
+                if row is not None and any(row[field] != value for field, value in counts.items()):
+                    drifted.append(Job(id=job_id, **counts))
+            Job.objects.bulk_update(drifted, APPLICATION_COUNTER_FIELDS)
+        checked += len(job_ids)
+        corrected += len(drifted)
@@ -0,0 +1,350 @@
+"""
+Deterministic synthetic datasets for load testing (``generate_dataset``).
+
+``generate(scale)`` fills every table the API reads. Per unit of scale it
+writes:
+- ``EMPLOYERS`` employers posting ``JOBS`` jobs;
+- ``STUDENTS`` students, each with a dashboard (achievements, finance
+  goals, tracked applications), most with a resume (education,
+  experience, skills);
+- about ``APPLICATIONS_PER_STUDENT`` job applications per student, about
+  a million at ``--scale 10``.
+
+Distributions are skewed the way real traffic is. Applications per
+student are overdispersed, and a few popular jobs draw most applications.
+Jobs and applications are spread over the past ``HISTORY_DAYS``. The same
+seed always produces the same rows; timestamps are relative to the run.
+
+Everything goes in with ``bulk_create``, students ``STUDENT_BATCH`` at a
+time, one transaction per batch. Derived data that ``post_save`` or the
+views would maintain (dashboard XP and level, job application counters,
+the job indexes) is computed directly.
+Accounts are ``ds<seed>-student<n>@example.com`` and
+``ds<seed>-employer<n>@example.com``, all with the password ``PASSWORD``.
+"""
+import math
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.resume.models import (
+    STATUS_CHOICES as TRACKED_STATUS_CHOICES,
+    Achievement, AppliedJob, Dashboard, Education, Experience, FinanceGoal, Resume, Skill,
+    level_from_xp,
+)
+
+from . import benchmarks, caching, counters, recommend, search, similar, tagging
+from .models import Job, JobApplication
+
+User = get_user_model()
+
+EMPLOYERS = 200
+JOBS = 10_000
+STUDENTS = 10_000
+APPLICATIONS_PER_STUDENT = 10
+# Share of students who filled in a resume
+RESUME_SHARE = 0.8
+ACTIVE_SHARE = 0.85
+HISTORY_DAYS = 365
+STUDENT_BATCH = 1000
+JOB_BATCH = 5000
+PASSWORD = 'password'
+# Free-text fields are drawn from a pool of this many generated texts each
+TEXT_POOL = 500
+
+APPLICATION_STATUSES = [
+    ('submitted', 45), ('under_review', 25), ('interview_scheduled', 8),
+    ('interviewed', 7), ('hired', 3), ('rejected', 12),
+]
+FIRST_NAMES = [
+    'Aarav', 'Olivia', 'Liam', 'Zara', 'Noah', 'Maya', 'Ethan', 'Priya', 'Lucas', 'Emma',
+    'Arjun', 'Chloe', 'Mateo', 'Aisha', 'Owen', 'Sofia', 'Kai', 'Leah', 'Jayden', 'Nora',
+]
+LAST_NAMES = [
+    'Singh', 'Smith', 'Nguyen', 'Patel', 'Brown', 'Chen', 'Tremblay', 'Ali', 'Wilson',
+    'Martin', 'Khan', 'Roy', 'Li', 'Campbell', 'Gagnon', 'Lee', 'Taylor', 'Wong',
+]
+SCHOOLS = [
+    'Chinguacousy Secondary School', 'Northern Secondary School', 'Earl Haig Secondary School',
+    'Western Technical-Commercial School', 'Oakville Trafalgar High School',
+    'University of Waterloo', 'University of Toronto', 'Toronto Metropolitan University',
+    'York University', 'Sheridan College', 'Humber College', 'McMaster University',
+]
+DEGREES = [
+    ('High School Diploma', 'General'), ('High School Diploma', 'SciTech'),
+    ('BSc', 'Computer Science'), ('BBA', 'Business'), ('Diploma', 'Early Childhood Education'),
+    ('BA', 'Psychology'), ('BMath', 'Computing and Financial Management'),
+]
+SKILLS = [
+    'Customer Service', 'Python', 'JavaScript', 'HTML/CSS', 'Excel', 'First aid', 'Swimming',
+    'Leadership', 'Teamwork', 'Math tutoring', 'Retail', 'Cash handling', 'Childcare',
+    'Public speaking', 'French', 'Social media', 'Cooking', 'Time management',
+]
+PROFICIENCIES = ['Beginner', 'Intermediate', 'Advanced']
+ACHIEVEMENTS = [
+    ('Completed resume', 50), ('Joined a club', 50), ('First application', 25),
+    ('Landed an interview', 100), ('Volunteered 10 hours', 75), ('Finished a course', 75),
+    ('Set a savings goal', 25), ('Got hired', 100),
+]
+FINANCE_GOALS = ['Laptop fund', 'Tuition', 'Car insurance', 'Concert tickets', 'Phone', 'Summer trip']
+AVAILABILITY = ['Weekday mornings', 'Weekday afternoons', 'Weekday evenings', 'Weekends', 'Summer']
+
+
+def account_email(seed, kind, number):
+    """Login (email and username) of a generated ``'student'`` or ``'employer'``."""
+    return f'ds{seed}-{kind}{number}@example.com'
+
+
+def is_loaded(seed):
+    """Whether a dataset with this ``seed`` has been written already."""
+    return User.objects.filter(username__startswith=f'ds{seed}-').exists()
+
+
+def _sentence(rng, low, high):
+    return ' '.join(rng.choices(benchmarks.WORDS, k=rng.randint(low, high))).capitalize() + '.'
+
+
+def _application_count(rng):
+    # Negative binomial (r=2) via a gamma-Poisson mixture: mean
+    # APPLICATIONS_PER_STUDENT, many students with a few, some with dozens
+    rate = rng.gammavariate(2, APPLICATIONS_PER_STUDENT / 2)
+    count, threshold, product = 0, math.exp(-rate), rng.random()
+    while product > threshold:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+class Dataset:
+    """Writes one dataset; see ``generate``."""
+
+    def __init__(self, scale, seed=0, progress=None):
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+        self.progress = progress or (lambda phase, rows, seconds: None)
+        self.counts = {}
+        self.password = make_password(PASSWORD)
+        self.texts = {
+            name: [_sentence(self.rng, low, high) for _ in range(TEXT_POOL)]
+            for name, low, high in (('long', 20, 60), ('medium', 8, 25), ('short', 5, 12))
+        }
+
+    def _count(self, unit):
+        return max(1, round(unit * self.scale))
+
+    def _ago(self, days):
+        return self.now - timedelta(days=days)
+
+    def _write(self, model, objects, timestamps=()):
+        """
+        Insert ``objects``. ``timestamps`` names ``auto_now``/``auto_now_add``
+        fields whose generated values ``bulk_create`` stamps over with the
+        current time; they are written back with one ``bulk_update``.
+        """
+        generated = [[getattr(obj, name) for name in timestamps] for obj in objects]
+        model.objects.bulk_create(objects, batch_size=2000)
+        if timestamps:
+            for obj, values in zip(objects, generated):
+                for name, value in zip(timestamps, values):
+                    setattr(obj, name, value)
+            model.objects.bulk_update(objects, timestamps, batch_size=2000)
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(objects)
+        return objects
+
+    def run(self):
+        if is_loaded(self.seed):
+            raise ValueError(f'a dataset with seed {self.seed} is already loaded')
+        self._phase('employers and jobs', self.jobs)
+        self._phase('students', self.students)
+        # bulk_create went around the per-application counter updates
+        counters.reconcile()
+        return self.counts
+
+    def _phase(self, name, step):
+        before = sum(self.counts.values())
+        started = time.perf_counter()
+        step()
+        self.progress(name, sum(self.counts.values()) - before, time.perf_counter() - started)
+
+    def _users(self, kind, start, count):
+        users = []
+        for number in range(start, start + count):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            email = account_email(self.seed, kind, number)
+            # Accounts log in by email, which doubles as the username
+            users.append(User(
+                username=email, email=email,
+                first_name=first, last_name=last, password=self.password,
+                date_joined=self._ago(self.rng.uniform(0, HISTORY_DAYS * 2)),
+            ))
+        return self._write(User, users)
+
+    def jobs(self):
+        with transaction.atomic():
+            employers = self._users('employer', 0, self._count(EMPLOYERS))
+        employer_ids = [employer.pk for employer in employers]
+
+        self.job_ids = []
+        self.job_posted = []
+        total = self._count(JOBS)
+        for start in range(0, total, JOB_BATCH):
+            jobs = benchmarks.make_jobs(min(JOB_BATCH, total - start), employers[0], seed=f'{self.seed}-jobs-{start}')
+            for job in jobs:
+                job.employer_id = self.rng.choice(employer_ids)
+                job.posted_date = self._ago(self.rng.uniform(0, HISTORY_DAYS))
+                job.updated_at = job.posted_date + (self.now - job.posted_date) * self.rng.random() * 0.2
+                job.is_active = self.rng.random() < ACTIVE_SHARE
+            with transaction.atomic():
+                self._write(Job, jobs, timestamps=['posted_date', 'updated_at'])
+            self.job_ids.extend(job.pk for job in jobs)
+            self.job_posted.extend(job.posted_date for job in jobs)
+
+        # Popularity falls off with a random rank: a long tail of quiet jobs
+        ranks = list(range(len(self.job_ids)))
+        self.rng.shuffle(ranks)
+        weights = [1 / (rank + 1) ** 0.7 for rank in ranks]
+        self.cum_weights = []
+        running = 0.0
+        for weight in weights:
+            running += weight
+            self.cum_weights.append(running)
+
+    def students(self):
+        total = self._count(STUDENTS)
+        for start in range(0, total, STUDENT_BATCH):
+            with transaction.atomic():
+                students = self._users('student', start, min(STUDENT_BATCH, total - start))
+                self._resumes(students)
+                self._dashboards(students)
+                self._applications(students)
+
+    def _resumes(self, students):
+        rng = self.rng
+        resumes = self._write(Resume, [
+            Resume(
+                user_id=student.pk,
+                phone=f'416-555-{rng.randrange(10000):04d}',
+                location=rng.choice(benchmarks.LOCATIONS),
+                linkedin=f'https://www.linkedin.com/in/{student.username}' if rng.random() < 0.4 else '',
+            )
+            for student in students if rng.random() < RESUME_SHARE
+        ])
+        educations, experiences, skills = [], [], []
+        for resume in resumes:
+            for _ in range(rng.choice([1, 1, 2])):
+                degree, field = rng.choice(DEGREES)
+                started = date(rng.randint(2018, 2025), 9, 1)
+                educations.append(Education(
+                    resume_id=resume.pk, school_name=rng.choice(SCHOOLS), degree=degree, field_of_study=field,
+                    start=started, end=started + timedelta(days=365 * 4) if rng.random() < 0.5 else None,
+                    gpa=Decimal(rng.randint(250, 400)) / 100 if rng.random() < 0.6 else None,
+                ))
+            for _ in range(rng.choice([0, 1, 1, 2, 3])):
+                started = self.now.date() - timedelta(days=rng.randint(30, 1500))
+                current = rng.random() < 0.3
+                experiences.append(Experience(
+                    resume_id=resume.pk, job_name=rng.choice(benchmarks.TITLES),
+                    company=rng.choice(benchmarks.COMPANIES), location=rng.choice(benchmarks.LOCATIONS),
+                    start=started, end=None if current else started + timedelta(days=rng.randint(60, 400)),
+                    is_working_currently=current, description=rng.choice(self.texts['medium']),
+                ))
+            for name in rng.sample(SKILLS, rng.randint(2, 8)):
+                skills.append(Skill(resume_id=resume.pk, name=name, proficiency=rng.choice(PROFICIENCIES)))
+        self._write(Education, educations)
+        self._write(Experience, experiences)
+        self._write(Skill, skills)
+
+    def _dashboards(self, students):
+        rng = self.rng
+        earned = {
+            student.pk: rng.sample(ACHIEVEMENTS, rng.choice([0, 1, 2, 3, 4, 6, 8]))
+            for student in students
+        }
+        dashboards = []
+        for student in students:
+            xp = sum(task_xp for _, task_xp in earned[student.pk])
+            dashboards.append(Dashboard(user_id=student.pk, total_xp=xp, level=level_from_xp(xp)))
+        self._write(Dashboard, dashboards)
+
+        achievements, goals, tracked = [], [], []
+        for dashboard in dashboards:
+            for title, task_xp in earned[dashboard.user_id]:
+                awarded = self._ago(rng.uniform(0, HISTORY_DAYS))
+                achievements.append(Achievement(
+                    dashboard_id=dashboard.pk, title=title, task_xp=task_xp,
+                    awarded_on=awarded.date(), awarded_at=awarded,
+                ))
+            for title in rng.sample(FINANCE_GOALS, rng.choice([0, 0, 1, 1, 2, 3])):
+                goal = Decimal(rng.randrange(100, 5000))
+                goals.append(FinanceGoal(
+                    dashboard_id=dashboard.pk, title=title, goal_amount=goal,
+                    current_amount=(goal * Decimal(rng.random())).quantize(Decimal('0.01')),
+                    due_date=self.now.date() + timedelta(days=rng.randint(-30, 400)) if rng.random() < 0.7 else None,
+                ))
+            for _ in range(rng.choice([0, 0, 1, 2, 3, 6])):
+                tracked.append(AppliedJob(
+                    dashboard_id=dashboard.pk, title=rng.choice(benchmarks.TITLES),
+                    company=rng.choice(benchmarks.COMPANIES), location=rng.choice(benchmarks.LOCATIONS),
+                    status=rng.choice(TRACKED_STATUS_CHOICES)[0],
+                    applied_on=self.now.date() - timedelta(days=rng.randint(0, HISTORY_DAYS)),
+                ))
+        self._write(Achievement, achievements)
+        self._write(FinanceGoal, goals)
+        self._write(AppliedJob, tracked)
+
+    def _applications(self, students):
+        rng, texts = self.rng, self.texts
+        statuses = [status for status, _ in APPLICATION_STATUSES]
+        status_weights = [weight for _, weight in APPLICATION_STATUSES]
+        positions = range(len(self.job_ids))
+        applications = []
+        for student in students:
+            count = min(_application_count(rng), len(self.job_ids))
+            chosen = set(rng.choices(positions, cum_weights=self.cum_weights, k=count))
+            for position in sorted(chosen):
+                posted = self.job_posted[position]
+                applied = posted + (self.now - posted) * rng.random()
+                status = rng.choices(statuses, status_weights)[0]
+                updated = applied if status == 'submitted' else applied + (self.now - applied) * rng.random()
+                applications.append(JobApplication(
+                    job_id=self.job_ids[position], applicant_id=student.pk,
+                    cover_letter=rng.choice(texts['long']), why_interested=rng.choice(texts['medium']),
+                    relevant_experience=rng.choice(texts['medium']),
+                    questions=rng.choice(texts['short']) if rng.random() < 0.2 else '',
+                    availability=rng.sample(AVAILABILITY, rng.randint(1, 3)),
+                    status=status, applied_date=applied, last_updated=updated,
+                ))
+        self._write(JobApplication, applications, timestamps=['applied_date', 'last_updated'])
+
+    def rebuild_indexes(self):
+        """What post_save would have maintained for the jobs: search, tags, vectors, similar jobs."""
+        for name, rebuild in (
+            ('search index', lambda: search.rebuild(Job.objects.all())),
+            ('tag index', lambda: tagging.sync_queryset(Job.objects.all())),
+            ('job vectors', recommend.rebuild),
+            ('similar jobs', similar.rebuild),
+        ):
+            started = time.perf_counter()
+            rows = rebuild()
+            self.progress(name, rows, time.perf_counter() - started)
+        caching.invalidate()
+
+
+def generate(scale, seed=0, progress=None, indexes=True):
+    """
+    Write a dataset of the given scale and return ``{model name: rows}``.
+    ``progress(phase, rows, seconds)`` is called after each phase.
+    """
+    dataset = Dataset(scale, seed=seed, progress=progress)
+    counts = dataset.run()
+    if indexes:
+        dataset.rebuild_indexes()
+    return counts
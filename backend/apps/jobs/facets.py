@@ -0,0 +1,149 @@
+"""
+Facet counts and the pay histogram for the job filter sidebar.
+
+Counts follow the usual sidebar semantics: the count shown next to a
+value is the number of jobs you would get by picking that value while
+keeping every *other* active filter. All facets come out of one
+``GROUP BY location`` query with a conditional ``COUNT`` per value.
+"""
+import hashlib
+import json
+
+from decimal import Decimal
+
+from django.db.models import Count, Max, Min, Q
+
+from . import search, tagging
+from .models import Job
+
+# Facets whose values are known up front; location is grouped on instead
+ENUMERATED = ['job_type', 'schedule', 'featured', 'pay_range']
+FACETS = ENUMERATED + ['location']
+
+
+def facet_values():
+    """Return ``{facet: [(value, label), ...]}`` for the enumerated facets."""
+    return {
+        'job_type': list(Job.JOB_TYPE_CHOICES),
+        'schedule': list(Job.SCHEDULE_CHOICES),
+        'featured': [(True, 'Featured'), (False, 'Not featured')],
+        'pay_range': list(Job.PAY_BUCKET_CHOICES),
+    }
+
+
+def value_condition(facet, value):
+    if facet == 'pay_range':
+        return Q(pay_bucket=value)
+    return Q(**{facet: value})
+
+
+def _combine(conditions):
+    combined = Q()
+    for condition in conditions:
+        combined &= condition
+    return combined or None
+
+
+def compute(queryset, active):
+    """
+    Count jobs per facet value.
+
+    ``queryset`` must already carry the non-facet filters (search, tags);
+    ``active`` maps facet name -> selected value for the facet filters.
+    """
+    conditions = {
+        facet: value_condition(facet, value)
+        for facet, value in active.items() if facet != 'location'
+    }
+
+    def others(*excluded):
+        return [condition for facet, condition in conditions.items() if facet not in excluded]
+
+    values = facet_values()
+    aggregates = {
+        'all': Count('id', filter=_combine(others())),
+        'location_count': Count('id', filter=_combine(others('location'))),
+    }
+    for facet in ENUMERATED:
+        for index, (value, _) in enumerate(values[facet]):
+            condition = _combine([value_condition(facet, value), *others(facet)])
+            aggregates[f'{facet}_{index}'] = Count('id', filter=condition)
+
+    rows = queryset.order_by().values('location').annotate(**aggregates)
+
+    location = active.get('location')
+    totals = dict.fromkeys(aggregates, 0)
+    locations = []
+    for row in rows:
+        if row['location_count']:
+            locations.append({'value': row['location'], 'label': row['location'], 'count': row['location_count']})
+        if location is None or row['location'] == location:
+            for name in aggregates:
+                totals[name] += row[name]
+
+    facets = {
+        facet: [
+            {'value': value, 'label': label, 'count': totals[f'{facet}_{index}']}
+            for index, (value, label) in enumerate(values[facet])
+        ]
+        for facet in ENUMERATED
+    }
+    facets['location'] = sorted(locations, key=lambda item: (-item['count'], item['value']))
+    return {'count': totals['all'], 'facets': facets}
+
+
+def _rate(value):
+    return str(value.quantize(Decimal('0.01'))) if value is not None else None
+
+
+def pay_histogram(queryset):
+    """
+    Job counts per pay bucket plus min/median/max ``hourly_rate_min``.
+
+    The counts and extremes are one ``GROUP BY pay_bucket`` over the pay
+    bucket index; the median is read by offsetting into the rate index,
+    so nothing is sorted or summed in Python.
+    """
+    queryset = queryset.order_by()
+    rows = {
+        row['pay_bucket']: row
+        for row in queryset.values('pay_bucket').annotate(
+            count=Count('id'), low=Min('hourly_rate_min'), high=Max('hourly_rate_min'),
+        )
+    }
+    total = sum(row['count'] for row in rows.values())
+
+    median = None
+    if total:
+        rates = queryset.order_by('hourly_rate_min').values_list('hourly_rate_min', flat=True)
+        middle = list(rates[(total - 1) // 2:total // 2 + 1])
+        median = sum(middle) / len(middle)
+
+    return {
+        'count': total,
+        'buckets': [
+            {'value': key, 'label': label, 'count': rows[key]['count'] if key in rows else 0}
+            for key, label in Job.PAY_BUCKET_CHOICES
+        ],
+        'min': _rate(min((row['low'] for row in rows.values()), default=None)),
+        'median': _rate(median),
+        'max': _rate(max((row['high'] for row in rows.values()), default=None)),
+    }
+
+
+def normalized_params(query_params, active):
+    """Everything that affects the counts, normalized so equivalent requests share a key."""
+    return {
+        'filters': active,
+        'search': search.build_match_query(query_params.get('search')),
+        'tags': sorted(tagging.parse_names(query_params.get('tags'))),
+        'requirements': sorted(tagging.parse_names(query_params.get('requirements'))),
+        'match_any': query_params.get('tag_match') == 'any',
+        'near': [query_params.get('near'), query_params.get('radius_km')],
+    }
+
+
+def cache_key(params):
+    """Stable cache key for a normalized set of filter parameters."""
+    encoded = json.dumps(params, sort_keys=True, default=str).encode('utf-8')
+    return 'facets:' + hashlib.sha1(encoded).hexdigest()
@@ -0,0 +1,126 @@
+"""
+Sparse fieldsets for the job and application endpoints.
+
+``?fields=id,title`` keeps only the listed fields, ``?omit=description``
+drops fields, and ``?view=card`` selects a named preset (``?view=full``
+is the default). ``fields`` replaces the preset, ``omit`` is applied last.
+Fewer fields means fewer bytes on the wire and fewer columns read: list
+endpoints select just the needed ``.values()`` columns and detail
+endpoints defer the rest with ``only()``.
+"""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+VIEW_PARAM = 'view'
+PARAMS = (FIELDS_PARAM, OMIT_PARAM, VIEW_PARAM)
+
+
+def _names(value):
+    return [name for name in (part.strip() for part in (value or '').split(',')) if name]
+
+
+def requested_fields(query_params, available, views):
+    """
+    Return the output field names a request asks for, in serializer
+    order, or ``None`` for every field. ``views`` maps preset names to
+    field lists. Unknown fields or views are a 400.
+    """
+    view = query_params.get(VIEW_PARAM)
+    fields = _names(query_params.get(FIELDS_PARAM))
+    omit = _names(query_params.get(OMIT_PARAM))
+    if not (view or fields or omit):
+        return None
+
+    errors = {}
+    if view and view != 'full' and view not in views:
+        errors[VIEW_PARAM] = [f'Unknown view "{view}". Choose from: {", ".join(["full", *views])}.']
+    for param, names in ((FIELDS_PARAM, fields), (OMIT_PARAM, omit)):
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            errors[param] = [f'Unknown field(s): {", ".join(unknown)}.']
+    if errors:
+        raise ValidationError(errors)
+
+    if fields:
+        keep = set(fields)
+    elif view and view != 'full':
+        keep = set(views[view])
+    else:
+        keep = set(available)
+    keep.difference_update(omit)
+    return [name for name in available if name in keep]
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin applying ``?fields=``/``?omit=``/``?view=`` to GET
+    responses. ``field_views`` holds the presets; ``nested_field_views``
+    maps a nested serializer field to the fields it shows per preset.
+    """
+    field_views = {}
+    nested_field_views = {}
+
+    def get_fieldset(self):
+        """Return ``(fields, nested)`` for the request; ``fields`` is ``None`` for all."""
+        if not hasattr(self, '_fieldset'):
+            fields = nested = None
+            if self.request.method == 'GET':
+                serializer_class = self.get_serializer_class()
+                fields = requested_fields(
+                    self.request.query_params, serializer_class.Meta.fields, self.field_views,
+                )
+                view = self.request.query_params.get(VIEW_PARAM)
+                nested = {
+                    name: views[view]
+                    for name, views in self.nested_field_views.items()
+                    if view in views and (fields is None or name in fields)
+                }
+            self._fieldset = fields, nested or None
+        return self._fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        fields, nested = self.get_fieldset()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if nested:
+            kwargs.setdefault('nested', nested)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_value_columns(self):
+        """
+        The ``.values()`` columns a list response needs, including its sort
+        key. Nested serializers in ``nested_field_views`` are read through
+        the join as ``<name>__<column>``, in the same query.
+        """
+        fields, nested = self.get_fieldset()
+        extra = ['id']
+        # Keyset pages need the sort key for the cursor, even when not shown
+        pagination = getattr(self.pagination_class, 'keyset_class', None) or self.pagination_class
+        ordering_field = getattr(pagination, 'ordering_field', None)
+        if ordering_field:
+            extra.append(ordering_field)
+        columns = self.get_serializer_class().value_columns(fields, extra=extra)
+        return columns + self._nested_columns(fields, nested)
+
+    def get_only_columns(self):
+        """
+        Columns for ``only()`` on a detail response, or ``None`` for all.
+        Nested serializers listed in ``nested_field_views`` contribute
+        ``<name>__<column>`` entries for use with ``select_related``.
+        """
+        fields, nested = self.get_fieldset()
+        if fields is None:
+            return None
+        columns = self.get_serializer_class().value_columns(fields, extra=['id'])
+        return columns + self._nested_columns(fields, nested)
+
+    def _nested_columns(self, fields, nested):
+        serializer_class = self.get_serializer_class()
+        columns = []
+        for name in self.nested_field_views:
+            if fields is None or name in fields:
+                nested_class = type(serializer_class._declared_fields[name])
+                subfields = (nested or {}).get(name)
+                columns += [f'{name}__{column}' for column in nested_class.value_columns(subfields, extra=['id'])]
+        return columns
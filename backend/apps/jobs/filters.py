@@ -0,0 +1,86 @@
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from . import geo, search, tagging
+
+
+class JobSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the FTS5 job index, ranked by relevance.
+    Falls back to DRF's icontains search where FTS5 is unavailable.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not search.is_supported():
+            return super().filter_queryset(request, queryset, view)
+
+        match = search.build_match_query(request.query_params.get(self.search_param, ''))
+        if not match:
+            return queryset
+        return search.filter_ranked(queryset, match)
+
+
+class JobOrderingFilter(filters.OrderingFilter):
+    """
+    Ordering filter that sorts search results by relevance, and ``?near=``
+    results nearest first, unless the client asked for an explicit
+    ``?ordering=``.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params and 'search_rank' in queryset.query.extra_select:
+            return ['search_rank', *(self.get_default_ordering(view) or [])]
+        if not params and 'geo_proximity' in queryset.query.annotations:
+            # Ties broken on id rather than posted_date so the sort never
+            # leaves job_active_geo_idx
+            return ['-geo_proximity', '-id']
+        return super().get_ordering(request, queryset, view)
+
+
+class JobTagFilter(filters.BaseFilterBackend):
+    """
+    ``?tags=Outdoors,Flexible`` and ``?requirements=...`` filters backed by
+    the normalized tag index. ``?tag_match=any`` switches from requiring
+    every listed value (the default) to requiring at least one.
+    """
+    match_param = 'tag_match'
+    kind_params = [
+        ('tags', 'tag'),
+        ('requirements', 'requirement'),
+    ]
+
+    def filter_queryset(self, request, queryset, view):
+        match_all = request.query_params.get(self.match_param, 'all') != 'any'
+        for param, kind in self.kind_params:
+            keys = tagging.parse_names(request.query_params.get(param))
+            if keys:
+                queryset = queryset.filter(id__in=tagging.matching_job_ids(keys, kind, match_all))
+        return queryset
+
+
+class JobNearFilter(filters.BaseFilterBackend):
+    """
+    ``?near=43.65,-79.38&radius_km=10`` keeps jobs within ``radius_km``
+    (default 25) of the point, using the geo grid index.
+    """
+    near_param = 'near'
+    radius_param = 'radius_km'
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.near_param)
+        if not value:
+            return queryset
+        try:
+            latitude, longitude = geo.parse_point(value)
+        except ValueError as exc:
+            raise ValidationError({self.near_param: [str(exc)]})
+        try:
+            radius = float(request.query_params.get(self.radius_param, geo.DEFAULT_RADIUS_KM))
+        except ValueError:
+            radius = None
+        if radius is None or not 0 < radius <= geo.MAX_RADIUS_KM:
+            raise ValidationError({
+                self.radius_param: [f'Must be a number of kilometres up to {geo.MAX_RADIUS_KM}.'],
+            })
+        return geo.within(queryset, latitude, longitude, radius)
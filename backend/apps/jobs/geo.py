@@ -0,0 +1,167 @@
+"""
+Offline geocoding and "jobs near me" lookups.
+
+Job coordinates come from the bundled gazetteer (``data/places.csv``,
+loaded into ``Place``); nothing here makes a network call. Alongside its
+latitude/longitude every job stores:
+
+* ``geo_row``/``geo_col``: the 0.1 degree grid cell it falls in, and
+* ``geo_x``/``geo_y``/``geo_z``: its position as a unit vector, which
+  turns the exact great-circle distance test into a dot product that
+  plain SQLite evaluates without any math extension.
+
+A radius query becomes ``geo_row IN (...) AND geo_col BETWEEN ...`` over
+the cells covering the circle plus the dot product check, all answered
+from one covering index. (An ``OR`` of ranges over a single cell number
+would read better, but SQLite will not seek on it.)
+"""
+import csv
+import math
+from pathlib import Path
+
+from django.db.models import F, Q
+
+EARTH_RADIUS_KM = 6371.0088
+CELL_DEGREES = 0.1
+COLUMNS = 3600
+ROWS = 1800
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 200
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'places.csv'
+POINT_FIELDS = ['latitude', 'longitude', 'geo_row', 'geo_col', 'geo_x', 'geo_y', 'geo_z']
+
+
+def place_key(location):
+    """Normalize a free-text location ("Scarborough,  ON") for lookups."""
+    return ' '.join(str(location).split()).casefold()
+
+
+def read_gazetteer(path=GAZETTEER_PATH):
+    """Yield ``Place`` field dicts from a ``name,province,latitude,longitude`` CSV."""
+    with open(path, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            yield {
+                'name': row['name'],
+                'province': row['province'],
+                'key': place_key(f"{row['name']}, {row['province']}"),
+                'latitude': float(row['latitude']),
+                'longitude': float(row['longitude']),
+            }
+
+
+def lookup(location):
+    """
+    Return ``(latitude, longitude)`` for a location such as
+    "Scarborough, ON", or ``None`` when the gazetteer does not know it.
+    """
+    return lookup_many([location]).get(location)
+
+
+def lookup_many(locations):
+    """``{location: (latitude, longitude)}`` for the ``locations`` the gazetteer knows, in one query."""
+    from .models import Place
+
+    keys = {}
+    for location in locations:
+        key = place_key(location)
+        if key:
+            keys.setdefault(key, []).append(location)
+    points = {}
+    rows = Place.objects.filter(key__in=keys).values_list('key', 'latitude', 'longitude')
+    for key, latitude, longitude in rows:
+        for location in keys[key]:
+            points[location] = (latitude, longitude)
+    return points
+
+
+def _row(latitude):
+    return min(int((latitude + 90) // CELL_DEGREES), ROWS - 1)
+
+
+def _column(longitude):
+    return int((longitude + 180) // CELL_DEGREES)
+
+
+def cell_for(latitude, longitude):
+    """Return the ``(row, column)`` grid cell of a point."""
+    return _row(latitude), _column(longitude) % COLUMNS
+
+
+def unit_vector(latitude, longitude):
+    phi = math.radians(latitude)
+    lam = math.radians(longitude)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def point_fields(latitude, longitude):
+    """Return the ``Job`` geo columns for a point (all ``None`` without one)."""
+    if latitude is None or longitude is None:
+        return dict.fromkeys(POINT_FIELDS)
+    x, y, z = unit_vector(latitude, longitude)
+    row, column = cell_for(latitude, longitude)
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'geo_row': row,
+        'geo_col': column,
+        'geo_x': x,
+        'geo_y': y,
+        'geo_z': z,
+    }
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points (haversine)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_point(value):
+    """Parse ``"lat,lon"``; raises ``ValueError`` with a user-facing message."""
+    try:
+        latitude, longitude = (float(part) for part in str(value).split(','))
+    except ValueError:
+        raise ValueError('Expected "latitude,longitude".')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('Latitude must be within [-90, 90] and longitude within [-180, 180].')
+    return latitude, longitude
+
+
+def cell_filter(latitude, longitude, radius_km):
+    """
+    Return a ``Q`` matching the grid cells that cover every point within
+    ``radius_km`` of the given point.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    rows = Q(geo_row__in=range(_row(max(latitude - dlat, -90)), _row(min(latitude + dlat, 90)) + 1))
+
+    # Widest longitude offset anywhere on the circle; near a pole the
+    # circle wraps all the way around.
+    if abs(latitude) + dlat >= 90 or math.sin(angle) >= math.cos(math.radians(latitude)):
+        return rows
+    dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+    first, last = _column(longitude - dlon), _column(longitude + dlon)
+    if last - first + 1 >= COLUMNS:
+        return rows
+    if first < 0:
+        return rows & (Q(geo_col__lte=last) | Q(geo_col__gte=first + COLUMNS))
+    if last >= COLUMNS:
+        return rows & (Q(geo_col__lte=last - COLUMNS) | Q(geo_col__gte=first))
+    return rows & Q(geo_col__range=(first, last))
+
+
+def within(queryset, latitude, longitude, radius_km):
+    """
+    Narrow ``queryset`` to jobs within ``radius_km`` of the point. Adds a
+    ``geo_proximity`` alias (cosine of the angular distance; larger is
+    nearer) that can be ordered on.
+    """
+    x, y, z = unit_vector(latitude, longitude)
+    return queryset.filter(cell_filter(latitude, longitude, radius_km)).alias(
+        geo_proximity=F('geo_x') * x + F('geo_y') * y + F('geo_z') * z,
+    ).filter(geo_proximity__gte=math.cos(radius_km / EARTH_RADIUS_KM))
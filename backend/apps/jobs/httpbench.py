@@ -0,0 +1,484 @@
+"""
+In-process HTTP load tests for the API (the ``bench_http`` command).
+
+The project's own WSGI and ASGI handlers are driven directly, with no
+server, socket or network in between. Each request still passes through
+the full middleware stack, URL routing, authentication and rendering. A
+run works on a throwaway copy of the SQLite database, so writes (applies,
+logins, token refreshes) never reach the real file. The data comes from a
+``generate_dataset`` seed; when that seed is not loaded, a dataset of the
+requested scale is generated into the copy first.
+
+``CONCURRENCY`` clients each get their own generated student account and
+tokens. Every scenario (``SCENARIOS``) runs on its own: a warm-up, then
+``requests`` timed calls spread over the clients. WSGI clients are
+threads. ASGI clients are tasks on one event loop, which is how an ASGI
+server runs this project's sync views. Each scenario reports latency
+percentiles, throughput, status codes and the SQL queries per request.
+The queries are counted with a database execute wrapper, so ``DEBUG``
+does not need to be on.
+"""
+import asyncio
+import contextvars
+import io
+import itertools
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+import django
+import orjson
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import dataset
+from .models import Job, JobApplication
+
+User = get_user_model()
+
+CONCURRENCY = 8
+REQUESTS = 400
+WARMUP = 20
+# Clients ask for compressed bodies, as browsers do
+ACCEPT_ENCODING = 'br, gzip'
+
+JOB_FILTERS = [
+    {'job_type': 'part-time'},
+    {'schedule': 'weekends', 'ordering': '-hourly_rate_min'},
+    {'location': 'Toronto, ON'},
+    {'tags': 'Outdoors'},
+    {'pay_range': '15_20', 'job_type': 'seasonal'},
+    {'featured': 'true', 'view': 'card'},
+]
+SEARCHES = ['lifeguard', 'math tutor', 'barista', 'camp counselor', 'dog', 'library assistant', 'cashier weekend']
+
+
+class Call:
+    """One request: method, path, query parameters, JSON body and whether to send the access token."""
+
+    def __init__(self, method, path, query=None, body=None, auth=False):
+        self.method = method
+        self.path = path
+        self.query_string = urlencode(query or {})
+        self.body = orjson.dumps(body) if body is not None else b''
+        self.auth = auth
+
+
+class Client:
+    """A simulated user: one student account, its tokens and jobs it can still apply to."""
+
+    def __init__(self, user, apply_to):
+        refresh = RefreshToken.for_user(user)
+        self.email = user.email
+        self.access = str(refresh.access_token)
+        self.refresh = str(refresh)
+        self.apply_to = iter(apply_to)
+        self.rng = random.Random(user.pk)
+
+
+def _job_list(client):
+    return Call('GET', '/api/jobs/jobs/', client.rng.choice(JOB_FILTERS))
+
+
+def _search(client):
+    return Call('GET', '/api/jobs/jobs/', {'search': client.rng.choice(SEARCHES)})
+
+
+def _apply(client):
+    return Call('POST', f'/api/jobs/jobs/{next(client.apply_to)}/apply/', body={
+        'cover_letter': 'I would love to help out this summer.',
+        'why_interested': 'It is close to home and fits my schedule.',
+        'relevant_experience': 'Two summers as a camp counsellor.',
+        'availability': ['Weekends', 'Summer'],
+    }, auth=True)
+
+
+def _login(client):
+    return Call('POST', '/api/accounts/login/', body={'email': client.email, 'password': dataset.PASSWORD})
+
+
+def _refresh(client):
+    return Call('POST', '/api/accounts/token/refresh/', body={'refresh': client.refresh})
+
+
+def _keep_rotated_token(client, body):
+    # ROTATE_REFRESH_TOKENS hands out a new refresh token with every refresh
+    client.refresh = orjson.loads(body).get('refresh', client.refresh)
+
+
+# name: (request builder, response hook)
+SCENARIOS = {
+    'job_list': (_job_list, None),
+    'search': (_search, None),
+    'featured': (lambda client: Call('GET', '/api/jobs/jobs/featured/'), None),
+    'recent': (lambda client: Call('GET', '/api/jobs/jobs/recent/'), None),
+    'apply': (_apply, None),
+    'applications': (lambda client: Call('GET', '/api/jobs/applications/', auth=True), None),
+    'login': (_login, None),
+    'refresh': (_refresh, _keep_rotated_token),
+}
+
+
+# --- SQL query counting ----------------------------------------------
+
+_query_count = contextvars.ContextVar('httpbench_query_count', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_counter(sender, connection, **kwargs):
+    # Outermost: connections can open inside a request, under wrappers
+    # (querystats) that pop the last wrapper when they are done
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+@contextmanager
+def counting_queries():
+    """Count queries, on every thread, for requests made under ``_query_count``."""
+    # Request handling closes connections, so new ones get the wrapper as they open
+    connection_created.connect(_install_counter)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(_install_counter)
+
+
+# --- Drivers -----------------------------------------------------------
+
+def _host():
+    hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS if host and host != '*']
+    return hosts[0] if hosts else 'localhost'
+
+
+class WSGIDriver:
+    """Calls the project's WSGI application from the current thread."""
+
+    def __init__(self):
+        self.handler = WSGIHandler()
+        self.host = _host()
+
+    def __call__(self, client, call):
+        environ = {
+            'REQUEST_METHOD': call.method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': call.path,
+            'QUERY_STRING': call.query_string,
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'HTTP_HOST': self.host,
+            'HTTP_ACCEPT': 'application/json',
+            'HTTP_ACCEPT_ENCODING': ACCEPT_ENCODING,
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(call.body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        if call.body:
+            environ['CONTENT_TYPE'] = 'application/json'
+            environ['CONTENT_LENGTH'] = str(len(call.body))
+        if call.auth:
+            environ['HTTP_AUTHORIZATION'] = f'Bearer {client.access}'
+        started = []
+        response = self.handler(environ, lambda status, headers, exc_info=None: started.append(status))
+        try:
+            body = b''.join(response)
+        finally:
+            response.close()
+        return int(started[0].split(' ', 1)[0]), body
+
+
+class ASGIDriver:
+    """Calls the project's ASGI application from the running event loop."""
+
+    def __init__(self):
+        self.handler = ASGIHandler()
+        self.host = _host()
+
+    async def __call__(self, client, call):
+        headers = [
+            (b'host', self.host.encode()),
+            (b'accept', b'application/json'),
+            (b'accept-encoding', ACCEPT_ENCODING.encode()),
+        ]
+        if call.body:
+            headers += [(b'content-type', b'application/json'), (b'content-length', str(len(call.body)).encode())]
+        if call.auth:
+            headers.append((b'authorization', f'Bearer {client.access}'.encode()))
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': call.method,
+            'scheme': 'http',
+            'path': call.path,
+            'raw_path': call.path.encode(),
+            'query_string': call.query_string.encode(),
+            'root_path': '',
+            'headers': headers,
+            'client': ('127.0.0.1', 0),
+            'server': (self.host, 80),
+        }
+        request = [{'type': 'http.request', 'body': call.body, 'more_body': False}]
+        disconnected = asyncio.get_running_loop().create_future()
+
+        async def receive():
+            if request:
+                return request.pop()
+            # The client stays connected; Django cancels this wait once it has responded
+            return await disconnected
+
+        status, chunks = [], []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        await self.handler(scope, receive, send)
+        return status[0], b''.join(chunks)
+
+
+# --- Running -----------------------------------------------------------
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def summarize(samples, seconds):
+    """Stats for ``[(milliseconds, status, queries), ...]`` collected over ``seconds`` of wall time."""
+    latencies = sorted(sample[0] for sample in samples)
+    queries = [sample[2] for sample in samples]
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if status >= 400),
+        'statuses': statuses,
+        'seconds': round(seconds, 3),
+        'throughput_rps': round(len(samples) / seconds, 1) if seconds else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 2),
+            'p95': round(percentile(latencies, 0.95), 2),
+            'p99': round(percentile(latencies, 0.99), 2),
+            'mean': round(sum(latencies) / len(latencies), 2),
+            'max': round(latencies[-1], 2),
+        },
+        'queries_per_request': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        },
+    }
+
+
+def _shares(total, parts):
+    return [total // parts + (1 if index < total % parts else 0) for index in range(parts)]
+
+
+def run_wsgi(clients, name, requests, warmup):
+    driver = WSGIDriver()
+    build, after = SCENARIOS[name]
+
+    def work(client, count, samples):
+        for _ in range(count):
+            call = build(client)
+            counter = [0]
+            token = _query_count.set(counter)
+            started = time.perf_counter()
+            try:
+                status, body = driver(client, call)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                _query_count.reset(token)
+            if after is not None and status < 400:
+                after(client, body)
+            samples.append((elapsed, status, counter[0]))
+
+    with ThreadPoolExecutor(len(clients)) as pool:
+        list(pool.map(work, clients, _shares(warmup, len(clients)), itertools.repeat([])))
+        samples = []
+        started = time.perf_counter()
+        list(pool.map(work, clients, _shares(requests, len(clients)), itertools.repeat(samples)))
+        return summarize(samples, time.perf_counter() - started)
+
+
+def run_asgi(clients, name, requests, warmup):
+    driver = ASGIDriver()
+    build, after = SCENARIOS[name]
+
+    async def work(client, count, samples):
+        for _ in range(count):
+            call = build(client)
+            counter = [0]
+            _query_count.set(counter)
+            started = time.perf_counter()
+            status, body = await driver(client, call)
+            elapsed = (time.perf_counter() - started) * 1000
+            if after is not None and status < 400:
+                after(client, body)
+            samples.append((elapsed, status, counter[0]))
+
+    async def run():
+        await asyncio.gather(*(work(*args, []) for args in zip(clients, _shares(warmup, len(clients)))))
+        samples = []
+        started = time.perf_counter()
+        await asyncio.gather(*(work(*args, samples) for args in zip(clients, _shares(requests, len(clients)))))
+        return summarize(samples, time.perf_counter() - started)
+
+    return asyncio.run(run())
+
+
+RUNNERS = {'wsgi': run_wsgi, 'asgi': run_asgi}
+
+
+def make_clients(seed, count, applies):
+    """
+    ``count`` clients logged in as the dataset's first students, each with
+    ``applies`` active jobs it has not applied to yet.
+    """
+    emails = [dataset.account_email(seed, 'student', number) for number in range(count)]
+    users = list(User.objects.filter(email__in=emails).order_by('id'))
+    if len(users) < count:
+        raise ValueError(f'dataset {seed} has fewer than {count} students')
+    applied = set(
+        JobApplication.objects.filter(applicant__in=users).values_list('applicant_id', 'job_id')
+    )
+    rng = random.Random(seed)
+    active = list(Job.objects.filter(is_active=True).values_list('id', flat=True))
+    clients = []
+    for user in users:
+        candidates = rng.sample(active, min(len(active), applies + len(applied)))
+        clients.append(Client(user, [job_id for job_id in candidates if (user.pk, job_id) not in applied][:applies]))
+    return clients
+
+
+@contextmanager
+def database_copy():
+    """Point the default database at a temporary copy of itself for the duration."""
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        raise ValueError('load tests run against a copy of a file-based SQLite database')
+    settings_dict = connections['default'].settings_dict
+    original = settings_dict['NAME']
+    directory = tempfile.mkdtemp(prefix='bench-http-')
+    copy = os.path.join(directory, 'db.sqlite3')
+    source = sqlite3.connect(original)
+    target = sqlite3.connect(copy)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    connections.close_all()
+    settings_dict['NAME'] = copy
+    try:
+        yield copy
+    finally:
+        connections.close_all()
+        settings_dict['NAME'] = original
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def environment(seed):
+    """What a result was measured on, so two result files can be compared."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'debug': settings.DEBUG,
+        'dataset': {
+            'seed': seed,
+            'jobs': Job.objects.count(),
+            'active_jobs': Job.objects.filter(is_active=True).count(),
+            'applications': JobApplication.objects.count(),
+            'users': User.objects.count(),
+        },
+    }
+
+
+def run(interfaces, scenarios, seed=0, scale=0.1, concurrency=CONCURRENCY, requests=REQUESTS,
+        warmup=WARMUP, progress=None):
+    """
+    Load-test each scenario on each interface against a copy of the
+    database and return the results as a JSON-serializable dict.
+    ``progress(interface, scenario, stats)`` is called after each run.
+    """
+    progress = progress or (lambda interface, scenario, stats: None)
+    with database_copy(), counting_queries():
+        if not User.objects.filter(email=dataset.account_email(seed, 'student', 0)).exists():
+            dataset.generate(scale, seed=seed)
+        meta = environment(seed)
+        meta.update(concurrency=concurrency, requests=requests, warmup=warmup)
+        # Every apply needs a job its client has not applied to, on every interface
+        applies = 0
+        if 'apply' in scenarios:
+            applies = (-(-requests // concurrency) - (-warmup // concurrency)) * len(interfaces)
+        clients = make_clients(seed, concurrency, applies)
+        results = {}
+        for interface in interfaces:
+            results[interface] = {}
+            for name in scenarios:
+                stats = RUNNERS[interface](clients, name, requests, warmup)
+                results[interface][name] = stats
+                progress(interface, name, stats)
+        connections.close_all()
+    return {'meta': meta, 'results': results}
+
+
+def compare(before, after):
+    """
+    Yield ``(interface, scenario, metric, old, new)`` for the scenarios
+    present in both result dicts.
+    """
+    for interface, scenarios in after['results'].items():
+        for name, stats in scenarios.items():
+            old = before['results'].get(interface, {}).get(name)
+            if old is None:
+                continue
+            for metric in ('p50', 'p95', 'p99'):
+                yield interface, name, metric, old['latency_ms'][metric], stats['latency_ms'][metric]
+            yield interface, name, 'rps', old['throughput_rps'], stats['throughput_rps']
+            yield interface, name, 'queries', old['queries_per_request']['mean'], stats['queries_per_request']['mean']
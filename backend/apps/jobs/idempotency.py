@@ -0,0 +1,78 @@
+"""
+``Idempotency-Key`` support for POST actions.
+
+A client that sends an ``Idempotency-Key`` header can retry the request
+(after a timeout on a flaky mobile connection, say) without doing the work
+twice. The first successful response is saved in the cache for
+``settings.IDEMPOTENCY_KEY_TIMEOUT`` seconds. A retry with the same key,
+from the same user, to the same path gets the saved response back with an
+``Idempotent-Replayed: true`` header. The key stands for one request, so
+reusing it with a different body is an error (422) rather than a replay of
+the other request's response. Only successful responses are saved,
+so a request that failed validation can be fixed and sent again under the
+same key. A retry that arrives while the first request is still running
+gets a 409.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+LOCK_TIMEOUT = 30
+
+
+def _cache_key(request, key):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'idempotency:{request.user.pk}:{request.path}:{digest}'
+
+
+def _fingerprint(request):
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def idempotent(view):
+    """Wrap a viewset action so requests carrying ``Idempotency-Key`` run at most once."""
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cache_key = _cache_key(request, key)
+        fingerprint = _fingerprint(request)
+        saved = cache.get(cache_key)
+        if saved is None:
+            lock = f'{cache_key}:lock'
+            if not cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+                return Response(
+                    {'error': f'A request with this {HEADER} is still in progress.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            try:
+                response = view(self, request, *args, **kwargs)
+                if status.is_success(response.status_code):
+                    saved = {'status': response.status_code, 'data': response.data, 'fingerprint': fingerprint}
+                    cache.set(cache_key, saved, timeout=settings.IDEMPOTENCY_KEY_TIMEOUT)
+            finally:
+                cache.delete(lock)
+            return response
+
+        if saved['fingerprint'] != fingerprint:
+            return Response(
+                {'error': f'This {HEADER} was already used with a different request body.'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        response = Response(saved['data'], status=saved['status'])
+        response['Idempotent-Replayed'] = 'true'
+        return response
+    return wrapper
@@ -0,0 +1,163 @@
+"""
+Streaming job ingestion from partner feeds (the ``import_jobs`` command).
+
+A feed is CSV with a header row or JSON Lines, one job per row, identified
+by the partner's ``external_id``. CSV cells for ``requirements`` and
+``tags`` hold a JSON array or ``|``-separated values; empty cells fall
+back to the model defaults.
+
+Rows are read lazily and handled ``batch_size`` at a time. Each batch is
+validated with one ``JobImportSerializer`` and then upserted in a single
+transaction. The upsert is one ``bulk_create(update_conflicts=True)`` on
+``(source, external_id)``, followed by what ``post_save`` would have done:
+the search and tag indexes are updated in the batch's transaction, and a
+``JOB_CHANGED`` message per job leaves the recommendation vectors and
+similar-job lists to ``run_worker``, as for jobs saved on the site. Only
+the current batch is held in memory, so memory use does not grow with the
+feed.
+
+The worker handles those messages one job at a time; after a very large
+import, ``rebuild_job_vectors`` and ``rebuild_similar_jobs`` catch up
+sooner.
+"""
+import csv
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from apps.outbox import events
+from . import caching, geo, search, signals, tagging
+from .models import Job
+from .serializers import JobImportSerializer
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+LIST_FIELDS = ('requirements', 'tags')
+DEFAULT_BATCH_SIZE = 1000
+
+FEED_FIELDS = [field for field in JobImportSerializer.Meta.fields if field != 'external_id']
+# Everything a row sets, plus what set_derived_fields() computes from it
+UPDATE_FIELDS = list(dict.fromkeys(FEED_FIELDS + ['employer', 'pay_bucket', *geo.POINT_FIELDS, 'updated_at']))
+
+
+def read_csv(stream):
+    """Yield ``(line, data, error)`` for each CSV record; ``error`` is a message or ``None``."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        data = {
+            name.strip(): value for name, value in row.items()
+            if name is not None and value not in (None, '')
+        }
+        error = None
+        for name in LIST_FIELDS:
+            if name in data:
+                try:
+                    data[name] = _csv_list(data[name])
+                except ValueError:
+                    error = f'{name}: not a JSON array or |-separated list.'
+        yield reader.line_num, data, error
+
+
+def _csv_list(value):
+    value = value.strip()
+    if value.startswith('['):
+        return json.loads(value)
+    return value.split('|')
+
+
+def read_jsonl(stream):
+    """Yield ``(line, data, error)`` for each non-blank JSON Lines record."""
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError as exc:
+            yield line, None, f'Invalid JSON: {exc}'
+            continue
+        if not isinstance(data, dict):
+            yield line, None, 'Expected a JSON object.'
+            continue
+        yield line, data, None
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+def validate(records):
+    """
+    Split a batch of ``(line, data, error)`` records into
+    ``[(line, validated_data), ...]`` and ``[(line, errors), ...]``.
+    """
+    serializer = JobImportSerializer()
+    valid = []
+    rejected = []
+    for line, data, error in records:
+        if error is not None:
+            rejected.append((line, {'non_field_errors': [error]}))
+            continue
+        try:
+            valid.append((line, serializer.run_validation(data)))
+        except ValidationError as exc:
+            rejected.append((line, exc.detail))
+    return valid, rejected
+
+
+def upsert(rows, source, employer):
+    """
+    Insert or update the validated rows of one batch and bring the job
+    indexes up to date. Later rows win over earlier ones with the same
+    ``external_id``. Returns ``(created, updated)``.
+    """
+    latest = {attrs['external_id']: attrs for _, attrs in rows}
+    places = geo.lookup_many({attrs.get('location', '') for attrs in latest.values()})
+    jobs = []
+    for attrs in latest.values():
+        job = Job(source=source, employer=employer, **attrs)
+        job.set_derived_fields(places)
+        jobs.append(job)
+    existing = Job.objects.filter(source=source, external_id__in=latest).count()
+    Job.objects.bulk_create(
+        jobs,
+        update_conflicts=True,
+        unique_fields=['source', 'external_id'],
+        update_fields=UPDATE_FIELDS,
+    )
+    # bulk_create skips post_save; do what the job signals would have done
+    search.index_jobs(Job.objects.filter(id__in=[job.pk for job in jobs]))
+    tagging.sync_jobs_tags(jobs)
+    events.publish_many(signals.JOB_CHANGED, [{'job_id': job.pk} for job in jobs])
+    transaction.on_commit(caching.invalidate)
+    return len(jobs) - existing, existing
+
+
+def import_feed(stream, feed_format, source, employer, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Import a feed batch by batch, one transaction each. Yields a stats
+    dict per batch: ``batch``, ``first_line``, ``last_line``, ``created``,
+    ``updated``, ``rejected`` (``[(line, errors), ...]``) and ``seconds``.
+    """
+    records = READERS[feed_format](stream)
+    number = 0
+    while True:
+        started = time.perf_counter()
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        number += 1
+        valid, rejected = validate(batch)
+        created = updated = 0
+        if valid:
+            with transaction.atomic():
+                created, updated = upsert(valid, source, employer)
+        yield {
+            'batch': number,
+            'first_line': batch[0][0],
+            'last_line': batch[-1][0],
+            'created': created,
+            'updated': updated,
+            'rejected': rejected,
+            'seconds': time.perf_counter() - started,
+        }
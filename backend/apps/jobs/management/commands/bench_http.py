@@ -0,0 +1,73 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import httpbench
+
+
+class Command(BaseCommand):
+    help = 'Load-test the main API endpoints in-process over WSGI and ASGI; --compare two saved results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interface', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument('--scenario', action='append', choices=list(httpbench.SCENARIOS),
+                            help='Run only this scenario (repeatable); default all')
+        parser.add_argument('--concurrency', type=int, default=httpbench.CONCURRENCY)
+        parser.add_argument('--requests', type=int, default=httpbench.REQUESTS, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=httpbench.WARMUP)
+        parser.add_argument('--seed', type=int, default=0, help='generate_dataset seed to load-test against')
+        parser.add_argument('--scale', type=float, default=0.1,
+                            help='Scale of the dataset generated when --seed is not loaded')
+        parser.add_argument('--output', help='Write the results here as JSON')
+        parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                            help='Compare two saved results instead of running')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            return self._compare(*options['compare'])
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('--concurrency and --requests must be positive.')
+        if settings.DEBUG:
+            self.stderr.write('DEBUG is on: every query is also logged, so timings run slow. Set DEBUG=False.')
+
+        interfaces = ['wsgi', 'asgi'] if options['interface'] == 'both' else [options['interface']]
+        self.stdout.write(
+            f"{'interface':<10}{'scenario':<14}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'queries':>9}{'errors':>8}"
+        )
+
+        def progress(interface, scenario, stats):
+            latency = stats['latency_ms']
+            self.stdout.write(
+                f"{interface:<10}{scenario:<14}{latency['p50']:>7.1f}ms{latency['p95']:>7.1f}ms{latency['p99']:>7.1f}ms"
+                f"{stats['throughput_rps']:>9.1f}{stats['queries_per_request']['mean']:>9.1f}{stats['errors']:>8}"
+            )
+
+        try:
+            result = httpbench.run(
+                interfaces, options['scenario'] or list(httpbench.SCENARIOS),
+                seed=options['seed'], scale=options['scale'], concurrency=options['concurrency'],
+                requests=options['requests'], warmup=options['warmup'], progress=progress,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(result, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _compare(self, before_path, after_path):
+        results = []
+        for path in (before_path, after_path):
+            try:
+                with open(path) as source:
+                    results.append(json.load(source))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'{path}: {exc}')
+        before, after = results
+        self.stdout.write(f"before: {before['meta']['commit']}  after: {after['meta']['commit']}")
+        self.stdout.write(f"{'interface':<10}{'scenario':<14}{'metric':<9}{'before':>10}{'after':>10}{'change':>9}")
+        for interface, scenario, metric, old, new in httpbench.compare(before, after):
+            change = f'{(new - old) / old * 100:+.0f}%' if old else '-'
+            self.stdout.write(f'{interface:<10}{scenario:<14}{metric:<9}{old:>10}{new:>10}{change:>9}')
@@ -0,0 +1,72 @@
+import math
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from apps.jobs import benchmarks, geo
+from apps.jobs.filters import JobNearFilter
+from apps.jobs.views import JobViewSet
+
+# (label, near, radius_km)
+DEFAULT_QUERIES = [
+    ('downtown Toronto 2km', '43.6532,-79.3832', 2),
+    ('downtown Toronto 10km', '43.6532,-79.3832', 10),
+    ('Scarborough 25km', '43.7764,-79.2318', 25),
+    ('Ottawa 50km', '45.4215,-75.6972', 50),
+    ('Lake Huron 25km', '44.5,-82.0', 25),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare the geo grid index against a full distance scan for ?near= queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        # Spread the jobs over every gazetteer place, not just the GTA
+        locations = [f"{place['name']}, {place['province']}" for place in geo.read_gazetteer()]
+        with benchmarks.rolled_back():
+            started = time.perf_counter()
+            benchmarks.create_jobs(options['jobs'], seed=options['seed'], locations=locations)
+            self.stdout.write(f"Inserted {options['jobs']} jobs in {time.perf_counter() - started:.1f}s")
+
+            self.stdout.write(f"{'query':<24}{'matches':>9}{'scan ms':>10}{'grid ms':>10}{'speedup':>9}")
+            for label, near, radius in DEFAULT_QUERIES:
+                scan = self._page(near, radius, grid=False)
+                grid = self._page(near, radius, grid=True)
+                matches = grid()
+                assert matches == scan(), f'{label}: grid and scan disagree'
+                slow = benchmarks.measure(scan, repeat=options['repeat'])
+                fast = benchmarks.measure(grid, repeat=options['repeat'])
+                self.stdout.write(
+                    f"{label:<24}{matches:>9}{slow['median_ms']:>10.2f}{fast['median_ms']:>10.2f}"
+                    f"{slow['median_ms'] / max(fast['median_ms'], 0.001):>8.1f}x"
+                )
+
+    def _page(self, near, radius, grid):
+        """Build a callable that runs one nearest-first list page (count + first 20 rows)."""
+        view = JobViewSet()
+        request = Request(RequestFactory().get('/api/jobs/jobs/', {'near': near, 'radius_km': radius}))
+        latitude, longitude = geo.parse_point(near)
+        x, y, z = geo.unit_vector(latitude, longitude)
+
+        def run():
+            queryset = JobViewSet.queryset.all()
+            if grid:
+                queryset = JobNearFilter().filter_queryset(request, queryset, view)
+            else:
+                queryset = queryset.alias(
+                    geo_proximity=F('geo_x') * x + F('geo_y') * y + F('geo_z') * z,
+                ).filter(geo_proximity__gte=math.cos(radius / geo.EARTH_RADIUS_KM))
+            queryset = queryset.order_by('-geo_proximity', '-id')
+            count = queryset.count()
+            list(queryset[:20])
+            return count
+
+        return run
@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import benchmarks, recommend
+from apps.jobs.models import Job, JobVector
+from apps.resume.models import Experience, Resume, Skill
+
+User = get_user_model()
+
+SKILLS = ['Customer Service', 'Swimming', 'First aid', 'Math tutoring', 'Leadership', 'Retail']
+
+
+class Command(BaseCommand):
+    help = 'Time resume-to-job recommendations against a synthetic job table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=recommend.DEFAULT_LIMIT)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        repeat, limit = options['repeat'], options['limit']
+        with benchmarks.rolled_back():
+            started = time.perf_counter()
+            benchmarks.create_jobs(options['jobs'], seed=options['seed'])
+            created = time.perf_counter() - started
+            started = time.perf_counter()
+            vectorized = recommend.rebuild()
+            self.stdout.write(
+                f'{vectorized} active jobs: created in {created:.1f}s, vectorized in {time.perf_counter() - started:.1f}s'
+            )
+
+            user = User.objects.create(username=f'bench-student-{options["seed"]}', email='student@example.com')
+            resume = Resume.objects.create(user=user)
+            Skill.objects.bulk_create(Skill(resume=resume, name=name) for name in SKILLS)
+            Experience.objects.create(
+                resume=resume, job_name='Camp Counselor',
+                description='Led outdoor activities for children and helped with pool safety.',
+            )
+
+            recommend.index = recommend.JobIndex()
+            started = time.perf_counter()
+            recommend.index.refresh()
+            self.stdout.write(f'index load: {(time.perf_counter() - started) * 1000:.0f} ms')
+
+            self._check(user, limit)
+            timings = benchmarks.measure(lambda: recommend.recommend(user, limit), repeat=repeat)
+            self.stdout.write(f"recommend(), warm: median {timings['median_ms']:.1f} ms, max {timings['max_ms']:.1f} ms")
+
+            # Incremental path: a handful of edited jobs scored from the side index
+            for job in Job.objects.filter(is_active=True).order_by('id')[:25]:
+                job.title = 'Lifeguard and Swim Instructor'
+                job.save()
+            started = time.perf_counter()
+            recommend.index.refresh()
+            self.stdout.write(f'refresh after 25 edits: {(time.perf_counter() - started) * 1000:.1f} ms')
+            self._check(user, limit)
+            timings = benchmarks.measure(lambda: recommend.recommend(user, limit), repeat=repeat)
+            self.stdout.write(f"recommend(), with edits: median {timings['median_ms']:.1f} ms, max {timings['max_ms']:.1f} ms")
+            recommend.index = recommend.JobIndex()
+
+    def _check(self, user, limit):
+        """Compare the index's ranking against a brute-force cosine over every stored vector."""
+        term_ids, weights = recommend.query_vector(recommend.resume_term_counts(user))
+        query = dict(zip(term_ids.tolist(), weights.tolist()))
+        expected = []
+        for job_id, ids, job_weights in JobVector.objects.values_list('job_id', 'term_ids', 'weights'):
+            ids, job_weights = recommend._unpack(ids, job_weights)
+            score = sum(query.get(term_id, 0.0) * weight for term_id, weight in zip(ids.tolist(), job_weights.tolist()))
+            if score > 0:
+                expected.append((-score, -job_id))
+        expected = [(-job_id, -score) for score, job_id in sorted(expected)[:limit]]
+        actual = recommend.recommend(user, limit)
+        mismatched = [
+            (want, got) for want, got in zip(expected, actual)
+            if abs(want[1] - got[1]) > 1e-4
+        ]
+        if len(actual) != len(expected) or mismatched:
+            raise CommandError(f'index ranking differs from brute force: {mismatched[:3]}')
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from apps.jobs import benchmarks
+from apps.jobs.models import Job
+from apps.jobs.serializers import JOB_CARD_FIELDS, JobSerializer
+from core import middleware, renderers
+from core.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = 'Measure JSON render time and bytes on the wire for a page of jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        size, repeat = options['rows'], options['repeat']
+        with benchmarks.rolled_back():
+            employer = benchmarks.create_jobs(size, seed=options['seed'])
+            jobs = Job.objects.filter(employer=employer)
+            pages = {}
+            for view, fields in (('full', None), ('card', JOB_CARD_FIELDS)):
+                columns = JobSerializer.value_columns(fields)
+                serializer = JobSerializer(jobs.values(*columns)[:size], many=True, fields=fields)
+                pages[view] = {'count': size, 'next': None, 'previous': None, 'results': serializer.data}
+
+        self.stdout.write(f'{size}-job page, JSON backend: {renderers.backend()}')
+        self.stdout.write(f"{'view':<6}{'bytes':>9}{'JSONRenderer':>14}{'FastJSON':>10}{'speedup':>9}")
+        bodies = {}
+        for view, page in pages.items():
+            slow, fast = JSONRenderer().render, FastJSONRenderer().render
+            bodies[view] = slow(page)
+            if fast(page) != bodies[view]:
+                raise CommandError(f'{view}: FastJSONRenderer output differs from JSONRenderer')
+            slow_ms = benchmarks.measure(lambda: slow(page), repeat=repeat)['median_ms']
+            fast_ms = benchmarks.measure(lambda: fast(page), repeat=repeat)['median_ms']
+            self.stdout.write(
+                f'{view:<6}{len(bodies[view]):>9}{slow_ms:>12.2f}ms{fast_ms:>8.2f}ms{slow_ms / max(fast_ms, 0.001):>8.1f}x'
+            )
+
+        self.stdout.write('')
+        self.stdout.write(f"{'view':<6}{'coding':<10}{'bytes':>9}{'ratio':>8}{'compress':>11}")
+        for view, body in bodies.items():
+            self.stdout.write(f"{view:<6}{'identity':<10}{len(body):>9}{1:>8.2f}{'-':>11}")
+            for coding in middleware.available_encodings():
+                compressed = middleware.compress(body, coding)
+                elapsed = benchmarks.measure(lambda: middleware.compress(body, coding), repeat=repeat)['median_ms']
+                self.stdout.write(
+                    f'{view:<6}{coding:<10}{len(compressed):>9}{len(compressed) / len(body):>8.2f}{elapsed:>9.2f}ms'
+                )
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from apps.jobs import benchmarks, search
+from apps.jobs.filters import JobSearchFilter
+from apps.jobs.models import Job
+from apps.jobs.views import JobViewSet
+
+DEFAULT_TERMS = ['lawn', 'math tutor', 'retail customer', 'summer camp children', 'sw']
+
+
+class Command(BaseCommand):
+    help = 'Compare FTS5 job search against icontains scans on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--term', action='append', dest='terms')
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('The full-text job index is only available on SQLite (FTS5).')
+
+        terms = options['terms'] or DEFAULT_TERMS
+        with benchmarks.rolled_back():
+            started = time.perf_counter()
+            employer = benchmarks.create_jobs(options['jobs'], seed=options['seed'])
+            search.index_jobs(Job.objects.filter(employer=employer))
+            self.stdout.write(
+                f"Inserted and indexed {options['jobs']} jobs in {time.perf_counter() - started:.1f}s"
+            )
+
+            self.stdout.write(f"{'term':<24}{'matches':>9}{'icontains ms':>15}{'fts5 ms':>10}{'speedup':>9}")
+            for term in terms:
+                legacy = self._page(term, fts=False)
+                ranked = self._page(term, fts=True)
+                slow = benchmarks.measure(legacy, repeat=options['repeat'])
+                fast = benchmarks.measure(ranked, repeat=options['repeat'])
+                self.stdout.write(
+                    f"{term:<24}{ranked():>9}{slow['median_ms']:>15.2f}{fast['median_ms']:>10.2f}"
+                    f"{slow['median_ms'] / max(fast['median_ms'], 0.001):>8.1f}x"
+                )
+
+    def _page(self, term, fts):
+        """Build a callable that runs one list page (count + first 20 rows)."""
+        view = JobViewSet()
+        request = Request(RequestFactory().get('/api/jobs/jobs/', {'search': term}))
+        backend = JobSearchFilter()
+
+        def run():
+            queryset = Job.objects.filter(is_active=True)
+            if fts:
+                queryset = backend.filter_queryset(request, queryset, view).order_by('search_rank', '-posted_date')
+            else:
+                queryset = super(JobSearchFilter, backend).filter_queryset(request, queryset, view)
+            count = queryset.count()
+            list(queryset[:20])
+            return count
+
+        return run
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.jobs import benchmarks
+from apps.jobs.models import Job, JobApplication
+from apps.jobs.serializers import (
+    APPLICATION_VALUE_FIELDS,
+    JOB_VALUE_FIELDS,
+    JobApplicationSerializer,
+    JobSerializer,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare the .values() serializer fast path against model instances'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[20, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        sizes = options['rows']
+        # Freeze "now" so both paths render identical posted_date_display
+        frozen = mock.patch('django.utils.timezone.now', return_value=timezone.now())
+        with benchmarks.rolled_back(), frozen:
+            employer = benchmarks.create_jobs(max(sizes), seed=options['seed'])
+            jobs = Job.objects.filter(employer=employer)
+            applicant = User.objects.create(
+                username=f'bench-applicant-{options["seed"]}', email='applicant@example.com',
+                first_name='Bench', last_name='Applicant',
+            )
+            JobApplication.objects.bulk_create(
+                JobApplication(
+                    job=job, applicant=applicant, cover_letter='Hello', availability=['Weekends'],
+                    why_interested='Interested', relevant_experience='Some',
+                )
+                for job in jobs
+            )
+            applications = JobApplication.objects.filter(applicant=applicant).order_by('-applied_date', '-id')
+
+            self.stdout.write(
+                f"{'':<26}{'':>6}{'serialize only':^30}{'fetch + serialize + render':^30}"
+            )
+            self.stdout.write(
+                f"{'serializer':<26}{'rows':>6}" + f"{'instances':>11}{'values':>10}{'speedup':>9}" * 2
+            )
+            for size in sizes:
+                self._compare(
+                    'JobSerializer', size, options['repeat'],
+                    lambda: list(jobs[:size]),
+                    lambda: list(jobs.values(*JOB_VALUE_FIELDS)[:size]),
+                    lambda rows: JobSerializer(rows, many=True).data,
+                )
+            for size in sizes:
+                self._compare(
+                    'JobApplicationSerializer', size, options['repeat'],
+                    lambda: list(applications.select_related('job', 'applicant')[:size]),
+                    lambda: list(applications.values(*APPLICATION_VALUE_FIELDS)[:size]),
+                    lambda rows: JobApplicationSerializer(rows, many=True).data,
+                )
+
+    def _compare(self, name, size, repeat, fetch_instances, fetch_values, serialize):
+        """Time ``size`` rows through the instance and the .values() paths, in ms."""
+        render = JSONRenderer().render
+        instances, rows = fetch_instances(), fetch_values()
+        if render(serialize(instances)) != render(serialize(rows)):
+            raise CommandError(f'{name}: the fast path output differs at {size} rows')
+
+        timings = []
+        for fetch, prefetched in ((fetch_instances, instances), (fetch_values, rows)):
+            timings.append(benchmarks.measure(lambda: serialize(prefetched), repeat=repeat)['median_ms'])
+            timings.append(benchmarks.measure(lambda: render(serialize(fetch())), repeat=repeat)['median_ms'])
+        slow_serialize, slow_total, fast_serialize, fast_total = timings
+        self.stdout.write(
+            f"{name:<26}{size:>6}"
+            f"{slow_serialize:>11.2f}{fast_serialize:>10.2f}{slow_serialize / max(fast_serialize, 0.001):>8.1f}x"
+            f"{slow_total:>11.2f}{fast_total:>10.2f}{slow_total / max(fast_total, 0.001):>8.1f}x"
+        )
@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from apps.jobs import benchmarks, recommend, similar
+from apps.jobs.models import Job, SimilarJob
+
+
+class Command(BaseCommand):
+    help = 'Time the similar-jobs table rebuild, incremental updates and endpoint against a synthetic job table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=20_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with benchmarks.rolled_back():
+            benchmarks.create_jobs(options['jobs'], seed=options['seed'])
+            recommend.rebuild()
+            recommend.index = recommend.JobIndex()
+
+            started = time.perf_counter()
+            written = similar.rebuild()
+            self.stdout.write(f'rebuild: {written} pairs in {time.perf_counter() - started:.1f}s')
+
+            job = Job.objects.filter(is_active=True).order_by('id').first()
+            self._check(job)
+            client = APIClient()
+            url = f'/api/jobs/jobs/{job.pk}/similar/'
+            # Counted with a wrapper: request_started clears connection.queries
+            queries = []
+            with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+                response = client.get(url)
+            if response.status_code != 200 or response.json()['count'] != similar.NEIGHBOURS:
+                raise CommandError(f'{url} returned {response.status_code}')
+            timings = benchmarks.measure(lambda: client.get(url), repeat=options['repeat'])
+            self.stdout.write(
+                f"GET {url}: {len(queries)} query, median {timings['median_ms']:.1f} ms, max {timings['max_ms']:.1f} ms"
+            )
+
+            # Incremental path: the save signal recomputes the edited job's list
+            timings = []
+            for job in Job.objects.filter(is_active=True).order_by('id')[:options['repeat']]:
+                job.title = 'Lifeguard and Swim Instructor'
+                started = time.perf_counter()
+                job.save()
+                timings.append((time.perf_counter() - started) * 1000)
+            self._check(job)
+            timings.sort()
+            self.stdout.write(
+                f'save() with index updates: median {timings[len(timings) // 2]:.1f} ms, max {timings[-1]:.1f} ms'
+            )
+            recommend.index = recommend.JobIndex()
+
+    def _check(self, job):
+        """Compare a job's stored neighbours against an exact score of every active job."""
+        index = recommend.JobIndex()
+        index.refresh()
+        attributes = similar.Attributes()
+        attributes.refresh()
+        row = int(index.base.rows_for([job.pk])[0])
+        text = index.base.score(*index.base.vector(row))
+        scores = similar.WEIGHTS['text'] * text + similar._attribute_scores(attributes.values[job.pk], attributes(index.base))
+        scores[text <= 0] = 0
+        scores[row] = 0
+        expected = np.sort(scores)[::-1][:similar.NEIGHBOURS]
+        stored = np.array(SimilarJob.objects.filter(job=job).order_by('-score').values_list('score', flat=True))
+        shortfall = (expected.sum() - stored.sum()) / len(expected)
+        self.stdout.write(f'job {job.pk}: best {stored[0]:.3f} (exact {expected[0]:.3f}), mean shortfall {shortfall:.4f}')
+        if len(stored) != len(expected) or shortfall > 0.01:
+            raise CommandError(f'neighbours of job {job.pk} fall short of an exact scan: {stored} vs {expected}')
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import dataset
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load a deterministic synthetic dataset for load testing (--scale 10 is about 1M applications)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help=f'Multiplier: 1 is {dataset.STUDENTS} students and {dataset.JOBS} jobs')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--skip-indexes', action='store_true',
+                            help='Do not rebuild the search, tag, recommendation and similar-job indexes')
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('--scale must be positive.')
+
+        def progress(phase, rows, seconds):
+            self.stdout.write(f'{phase}: {rows} rows in {seconds:.1f}s ({rows / max(seconds, 1e-6):.0f} rows/s)')
+
+        if dataset.is_loaded(options['seed']):
+            raise CommandError(
+                f"A dataset with seed {options['seed']} is already loaded; "
+                'pick another --seed or start from an empty database.'
+            )
+
+        started = time.perf_counter()
+        counts = dataset.generate(
+            options['scale'], seed=options['seed'], progress=progress, indexes=not options['skip_indexes'],
+        )
+
+        for model, rows in counts.items():
+            self.stdout.write(f'  {model:<16}{rows:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s '
+            f'(password for every account: {dataset.PASSWORD})'
+        ))
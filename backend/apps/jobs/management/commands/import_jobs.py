@@ -0,0 +1,74 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import ingest
+from apps.jobs.models import Job
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import or update jobs from a partner feed (CSV or JSON Lines), streaming in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Feed file, or - to read standard input')
+        parser.add_argument('--source', required=True, help='Name of the feed; external ids are unique per source')
+        parser.add_argument('--employer', required=True, help='Email of the user the imported jobs are posted under')
+        parser.add_argument('--format', choices=sorted(set(ingest.FORMATS.values())), help='Default: from the file extension')
+        parser.add_argument('--batch-size', type=int, default=ingest.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        feed_format = options['format'] or ingest.FORMATS.get(Path(path).suffix.lower())
+        if feed_format is None:
+            raise CommandError('Cannot tell the feed format from the file name; pass --format.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        max_length = Job._meta.get_field('source').max_length
+        if not 1 <= len(options['source']) <= max_length:
+            raise CommandError(f'--source must be 1 to {max_length} characters long.')
+        employer = User.objects.filter(email=options['employer']).first()
+        if employer is None:
+            raise CommandError(f'No user with email {options["employer"]}.')
+
+        if path == '-':
+            self._import(sys.stdin, feed_format, employer, options)
+        else:
+            try:
+                stream = open(path, newline='', encoding='utf-8-sig')
+            except OSError as exc:
+                raise CommandError(f'Cannot read {path}: {exc}')
+            with stream:
+                self._import(stream, feed_format, employer, options)
+
+    def _import(self, stream, feed_format, employer, options):
+        started = time.perf_counter()
+        created = updated = rejected = 0
+        batches = ingest.import_feed(
+            stream, feed_format, options['source'], employer, batch_size=options['batch_size'],
+        )
+        for stats in batches:
+            written = stats['created'] + stats['updated']
+            created += stats['created']
+            updated += stats['updated']
+            rejected += len(stats['rejected'])
+            self.stdout.write(
+                f"batch {stats['batch']} (lines {stats['first_line']}-{stats['last_line']}): "
+                f"{stats['created']} created, {stats['updated']} updated, {len(stats['rejected'])} rejected "
+                f"in {stats['seconds']:.2f}s ({written / max(stats['seconds'], 1e-6):.0f} rows/s)"
+            )
+            for line, errors in stats['rejected']:
+                self.stderr.write(f'line {line}: {json.dumps(errors)}')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {created + updated} jobs ({created} created, {updated} updated), '
+            f'rejected {rejected} rows in {elapsed:.2f}s'
+        ))
+        if created + updated:
+            self.stdout.write('run_worker updates their recommendation vectors and similar-job lists.')
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.jobs import caching, geo
+from apps.jobs.models import Job, Place
+
+
+class Command(BaseCommand):
+    help = 'Load the offline place gazetteer and re-geocode every job from it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=geo.GAZETTEER_PATH,
+            help='CSV with name,province,latitude,longitude columns (defaults to the bundled one)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        places = [Place(**fields) for fields in geo.read_gazetteer(options['path'])]
+        Place.objects.bulk_create(
+            places,
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=['name', 'province', 'latitude', 'longitude'],
+        )
+        located = 0
+        now = timezone.now()
+        # order_by(): the default ordering would make DISTINCT per job, not per location
+        locations = list(Job.objects.order_by().values_list('location', flat=True).distinct())
+        for location, point in geo.lookup_many(locations).items():
+            located += Job.objects.filter(location=location).update(
+                updated_at=now, **geo.point_fields(*point),
+            )
+        caching.invalidate()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'Loaded {len(places)} places and geocoded {located} jobs in {elapsed:.2f}s')
+        )
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs import recommend
+
+
+class Command(BaseCommand):
+    help = 'Recompute term document frequencies and the recommendation vector of every job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = recommend.rebuild(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Vectorized {total} active jobs in {elapsed:.2f}s')
+        )
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jobs import search
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for job listings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('The full-text job index is only available on SQLite (FTS5).')
+
+        started = time.perf_counter()
+        total = search.rebuild(Job.objects.all(), batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Indexed {total} jobs in {elapsed:.2f}s')
+        )
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs import similar
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed "similar jobs" neighbours of every active job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = similar.rebuild(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Wrote {total} similar-job pairs in {elapsed:.2f}s')
+        )
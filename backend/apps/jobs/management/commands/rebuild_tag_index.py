@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs import tagging
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Resync the normalized tag index from the tags/requirements JSON on every job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = tagging.sync_queryset(Job.objects.all(), batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Synced tags for {total} jobs in {elapsed:.2f}s')
+        )
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs import counters
+
+
+class Command(BaseCommand):
+    help = "Recount every job's application counters from its applications and fix any that drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=counters.RECONCILE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        checked, corrected = counters.reconcile(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} jobs, corrected {corrected} in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts USING fts5("
+    "title, company, description, tags, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+INSERT_SQL = (
+    "INSERT INTO jobs_job_fts (rowid, title, company, description, tags) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    Job = apps.get_model('jobs', 'Job')
+    rows = Job.objects.values_list('id', 'title', 'company', 'description', 'tags')
+    for job_id, title, company, description, tags in rows.iterator():
+        schema_editor.execute(
+            INSERT_SQL,
+            (job_id, title, company, description, ' '.join(str(tag) for tag in tags or [])),
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS jobs_job_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_tag_index(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Tag = apps.get_model('jobs', 'Tag')
+    JobTag = apps.get_model('jobs', 'JobTag')
+
+    tag_ids = {}
+    links = []
+    for job in Job.objects.only('id', 'tags', 'requirements').iterator():
+        for kind, values in (('tag', job.tags), ('requirement', job.requirements)):
+            for value in values or []:
+                name = ' '.join(str(value).split())
+                key = name.casefold()[:255]
+                if not key:
+                    continue
+                if key not in tag_ids:
+                    tag_ids[key] = Tag.objects.get_or_create(key=key, defaults={'name': name[:255]})[0].pk
+                links.append(JobTag(job_id=job.pk, tag_id=tag_ids[key], kind=kind))
+        if len(links) >= 5000:
+            JobTag.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    JobTag.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('tag', 'Tag'), ('requirement', 'Requirement')], default='tag', max_length=12)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='jobs.job')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_links', to='jobs.tag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='tag_index',
+            field=models.ManyToManyField(blank=True, related_name='jobs', through='jobs.JobTag', to='jobs.tag'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobtag',
+            constraint=models.UniqueConstraint(fields=('kind', 'tag', 'job'), name='jobtag_kind_tag_job_uniq'),
+        ),
+        migrations.RunPython(backfill_tag_index, migrations.RunPython.noop),
+    ]
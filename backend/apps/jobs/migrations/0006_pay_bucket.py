@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Q, Value, When
+
+
+def backfill_pay_bucket(apps, schema_editor):
+    # Bounds as of this migration; Job.PAY_BUCKETS owns them from here on
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.update(pay_bucket=Case(
+        When(Q(hourly_rate_min__gte=20), then=Value('20_plus')),
+        When(Q(hourly_rate_min__gte=15), then=Value('15_20')),
+        When(Q(hourly_rate_min__gte=10), then=Value('10_15')),
+        default=Value('under_10'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_listing_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='pay_bucket',
+            field=models.CharField(choices=[('under_10', 'Under $10'), ('10_15', '$10-15'), ('15_20', '$15-20'), ('20_plus', '$20+')], default='under_10', editable=False, max_length=20),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_pay_bucket, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_rate_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['hourly_rate_min', 'is_active'], name='job_active_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['pay_bucket', 'hourly_rate_min', 'is_active'], name='job_active_pay_idx'),
+        ),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:35
+
+import csv
+import math
+from pathlib import Path
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of apps.jobs.geo as of this migration, so later changes
+# there cannot change what it does
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / 'data' / 'places.csv'
+CELL_DEGREES = 0.1
+COLUMNS = 3600
+ROWS = 1800
+
+
+def place_key(location):
+    return ' '.join(str(location).split()).casefold()
+
+
+def point_fields(latitude, longitude):
+    phi, lam = math.radians(latitude), math.radians(longitude)
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'geo_row': min(int((latitude + 90) // CELL_DEGREES), ROWS - 1),
+        'geo_col': int((longitude + 180) // CELL_DEGREES) % COLUMNS,
+        'geo_x': math.cos(phi) * math.cos(lam),
+        'geo_y': math.cos(phi) * math.sin(lam),
+        'geo_z': math.sin(phi),
+    }
+
+
+def load_places(apps, schema_editor):
+    Place = apps.get_model('jobs', 'Place')
+    Job = apps.get_model('jobs', 'Job')
+
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as handle:
+        places = [
+            Place(
+                name=row['name'],
+                province=row['province'],
+                key=place_key(f"{row['name']}, {row['province']}"),
+                latitude=float(row['latitude']),
+                longitude=float(row['longitude']),
+            )
+            for row in csv.DictReader(handle)
+        ]
+    Place.objects.bulk_create(places, ignore_conflicts=True)
+
+    points = {place.key: (place.latitude, place.longitude) for place in places}
+    # order_by(): the default ordering would make DISTINCT per job, not per location
+    for location in Job.objects.order_by().values_list('location', flat=True).distinct():
+        point = points.get(place_key(location))
+        if point is not None:
+            Job.objects.filter(location=location).update(**point_fields(*point))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_pay_bucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Place',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('province', models.CharField(max_length=2)),
+                ('key', models.CharField(max_length=120, unique=True)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='geo_col',
+            field=models.SmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='geo_row',
+            field=models.SmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='geo_x',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='geo_y',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='geo_z',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['geo_row', 'geo_col', 'geo_x', 'geo_y', 'geo_z', 'is_active'], name='job_active_geo_idx'),
+        ),
+        migrations.RunPython(load_places, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:10
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing jobs have not changed since they were posted as far as we know
+    Job = apps.get_model('jobs', 'Job')
+    Job.objects.update(updated_at=F('posted_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_geo_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['updated_at', 'is_active'], name='job_active_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:07
+
+import math
+import re
+from collections import Counter
+
+import django.db.models.deletion
+import numpy as np
+from django.db import migrations, models
+from django.utils import timezone
+
+# Frozen copies of apps.jobs.recommend as of this migration, so later
+# changes there cannot change what it does
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset('''
+    a about after all also an and any are as at be been but by can do for from
+    get has have help how if in into is it its more must my no not of on or our
+    out over per so some such than that the their them then there these they
+    this to up us was we were what when which while who will with you your
+'''.split())
+JOB_FIELD_WEIGHTS = [('title', 2), ('tags', 2), ('requirements', 1), ('description', 1)]
+
+
+def tokens(text):
+    words = []
+    for word in TOKEN_RE.findall(str(text).casefold()):
+        if len(word) < 2 or word in STOP_WORDS or word.isdigit():
+            continue
+        if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.append(word[:64])
+    return words
+
+
+def job_term_counts(job):
+    counts = Counter()
+    for field, weight in JOB_FIELD_WEIGHTS:
+        value = getattr(job, field)
+        text = ' '.join(str(item) for item in value) if isinstance(value, list) else value
+        for word in tokens(text or ''):
+            counts[word] += weight
+    return counts
+
+
+def weigh(counts, term_ids, job_counts, total):
+    pairs = sorted(
+        (term_ids[text], (1 + math.log(tf)) * (math.log((1 + total) / (1 + job_counts.get(term_ids[text], 0))) + 1))
+        for text, tf in counts.items()
+    )
+    ids = np.array([term_id for term_id, _ in pairs], dtype=np.int32)
+    weights = np.array([weight for _, weight in pairs], dtype=np.float32)
+    norm = float(np.linalg.norm(weights)) if len(weights) else 0.0
+    if norm:
+        weights /= norm
+    return ids, weights
+
+
+def backfill_job_vectors(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Term = apps.get_model('jobs', 'Term')
+    JobVector = apps.get_model('jobs', 'JobVector')
+
+    jobs = list(Job.objects.only('id', 'is_active', 'title', 'tags', 'requirements', 'description'))
+    # Inactive jobs get an empty vector
+    counts = {job.pk: job_term_counts(job) if job.is_active else Counter() for job in jobs}
+    document_counts = Counter()
+    for job_counts in counts.values():
+        document_counts.update(job_counts.keys())
+    Term.objects.bulk_create([Term(text=text, job_count=count) for text, count in document_counts.items()], batch_size=500)
+    term_ids = dict(Term.objects.values_list('text', 'id'))
+    job_counts = {term_ids[text]: count for text, count in document_counts.items()}
+    active = sum(job.is_active for job in jobs)
+
+    now = timezone.now()
+    vectors = []
+    for job_id, job_counts_for_job in counts.items():
+        ids, weights = weigh(job_counts_for_job, term_ids, job_counts, active)
+        vectors.append(JobVector(job_id=job_id, term_ids=ids.tobytes(), weights=weights.tobytes(), updated_at=now))
+    JobVector.objects.bulk_create(vectors, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobVector',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vector', serialize=False, to='jobs.job')),
+                ('term_ids', models.BinaryField()),
+                ('weights', models.BinaryField()),
+                ('updated_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Term',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=64, unique=True)),
+                ('job_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_job_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:12
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    counts = {}
+    rows = JobApplication.objects.order_by().values_list('job_id', 'status').annotate(count=Count('id'))
+    for job_id, status, count in rows:
+        job = counts.setdefault(job_id, {'applications_total': 0})
+        job['applications_total'] += count
+        job[f'applications_{status}'] = count
+    for job_id, values in counts.items():
+        Job.objects.filter(pk=job_id).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_job_feed_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='applications_hired',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_interview_scheduled',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_interviewed',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_rejected',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_submitted',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_under_review',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
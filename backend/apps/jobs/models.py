@@ -1,6 +1,11 @@
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+from . import geo
 
 User = get_user_model()
 
@@ -22,11 +27,25 @@ class Job(models.Model):
         ('summer', 'Summer'),
     ]
     
+    # Pay buckets on hourly_rate_min: (key, label, lower bound). A bucket
+    # runs from its bound up to, but excluding, the next bucket's bound.
+    # This is the only definition; ?pay_range=, the facets, the histogram
+    # and the frontend's pay filter all read it.
+    PAY_BUCKETS = [
+        ('under_10', 'Under $10', None),
+        ('10_15', '$10-15', Decimal('10')),
+        ('15_20', '$15-20', Decimal('15')),
+        ('20_plus', '$20+', Decimal('20')),
+    ]
+    PAY_BUCKET_CHOICES = [(key, label) for key, label, lower in PAY_BUCKETS]
+    
     title = models.CharField(max_length=200)
     company = models.CharField(max_length=200)
     location = models.CharField(max_length=200)
     hourly_rate_min = models.DecimalField(max_digits=6, decimal_places=2)
     hourly_rate_max = models.DecimalField(max_digits=6, decimal_places=2)
+    # Derived from hourly_rate_min in save(); see PAY_BUCKETS
+    pay_bucket = models.CharField(max_length=20, choices=PAY_BUCKET_CHOICES, editable=False)
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
     schedule = models.CharField(max_length=20, choices=SCHEDULE_CHOICES)
     description = models.TextField()
@@ -41,46 +60,266 @@ class Job(models.Model):
     review_count = models.IntegerField(default=0)
     featured = models.BooleanField(default=False)
     posted_date = models.DateTimeField(auto_now_add=True)
+    # Bumped on every save; bulk .update() calls must set it themselves.
+    # Feeds the conditional GET validators (see conditional.py).
+    updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     employer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posted_jobs')
+    # Geocoded from location through the Place gazetteer in save(); the
+    # grid cell and unit vector back ?near= (see geo.py)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geo_row = models.SmallIntegerField(null=True, editable=False)
+    geo_col = models.SmallIntegerField(null=True, editable=False)
+    geo_x = models.FloatField(null=True, editable=False)
+    geo_y = models.FloatField(null=True, editable=False)
+    geo_z = models.FloatField(null=True, editable=False)
+    tag_index = models.ManyToManyField('Tag', through='JobTag', related_name='jobs', blank=True)
+    # Partner feed a job was imported from and its id there (see
+    # ingest.py); '' and NULL for jobs posted on the site
+    source = models.CharField(max_length=50, blank=True, default='')
+    external_id = models.CharField(max_length=100, null=True, blank=True)
+    # Application counts, in total and per JobApplication status. Kept in
+    # step by counters.py with F() updates; save() never writes them.
+    applications_total = models.IntegerField(default=0, editable=False)
+    applications_submitted = models.IntegerField(default=0, editable=False)
+    applications_under_review = models.IntegerField(default=0, editable=False)
+    applications_interview_scheduled = models.IntegerField(default=0, editable=False)
+    applications_interviewed = models.IntegerField(default=0, editable=False)
+    applications_hired = models.IntegerField(default=0, editable=False)
+    applications_rejected = models.IntegerField(default=0, editable=False)
     
     class Meta:
         ordering = ['-posted_date']
         verbose_name = 'Job'
         verbose_name_plural = 'Jobs'
+        constraints = [
+            # The upsert target of import_jobs; NULL external ids never conflict
+            models.UniqueConstraint(fields=['source', 'external_id'], name='job_source_external_id_uniq'),
+        ]
+        # Every listing filters is_active=True, which Django renders as a bare
+        # boolean term; SQLite can only use an index for it through a matching
+        # partial-index WHERE clause, so the listing indexes are all partial.
+        indexes = [
+            # Default order, recent feed and keyset pagination on (posted_date, id)
+            models.Index(fields=['posted_date', 'id'], condition=models.Q(is_active=True), name='job_active_posted_idx'),
+            # The featured feed: (is_active, featured, posted_date)
+            models.Index(fields=['posted_date'], condition=models.Q(is_active=True, featured=True), name='job_active_featured_idx'),
+            models.Index(fields=['job_type', 'posted_date'], condition=models.Q(is_active=True), name='job_active_type_idx'),
+            models.Index(fields=['schedule', 'posted_date'], condition=models.Q(is_active=True), name='job_active_schedule_idx'),
+            models.Index(fields=['location', 'posted_date'], condition=models.Q(is_active=True), name='job_active_location_idx'),
+            # ?ordering=hourly_rate_min and the histogram's min/median/max.
+            # SQLite only reads an index alone when the partial condition's
+            # column is part of the key too, hence the trailing is_active.
+            models.Index(fields=['hourly_rate_min', 'is_active'], condition=models.Q(is_active=True), name='job_active_rate_idx'),
+            # ?pay_range= filters and the per-bucket histogram counts
+            models.Index(fields=['pay_bucket', 'hourly_rate_min', 'is_active'], condition=models.Q(is_active=True), name='job_active_pay_idx'),
+            # ?near= seeks grid cells and checks the distance in the index
+            models.Index(fields=['geo_row', 'geo_col', 'geo_x', 'geo_y', 'geo_z', 'is_active'], condition=models.Q(is_active=True), name='job_active_geo_idx'),
+            models.Index(fields=['rating'], condition=models.Q(is_active=True), name='job_active_rating_idx'),
+            # MAX(updated_at) + COUNT(*) for the unfiltered listing's ETag
+            models.Index(fields=['updated_at', 'is_active'], condition=models.Q(is_active=True), name='job_active_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} at {self.company}"
     
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding and not kwargs.get('force_insert'):
+            # Counters read with this instance may be stale by now
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in APPLICATION_COUNTER_FIELDS
+            ]
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'updated_at'}
+            if 'hourly_rate_min' in update_fields:
+                update_fields.add('pay_bucket')
+            if update_fields & {'location', 'latitude', 'longitude'}:
+                update_fields.update(geo.POINT_FIELDS)
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the point was derived from, to tell a moved location from
+        # coordinates the caller set (see set_derived_fields)
+        if all(name in instance.__dict__ for name in ('location', 'latitude', 'longitude')):
+            instance._loaded_geo = (instance.location, instance.latitude, instance.longitude)
+        return instance
+    
+    def set_derived_fields(self, places=None):
+        """
+        Fill in the columns computed from others: pay_bucket and the geo
+        point. save() calls this; bulk writes must call it themselves,
+        passing ``geo.lookup_many()`` of their locations as ``places``.
+        
+        Coordinates the caller supplied are kept. The point is looked up
+        from the location only when there is none yet or the location
+        changed since the job was loaded; a location the gazetteer does
+        not know leaves the job with no point rather than the old one.
+        """
+        self.pay_bucket = self.pay_bucket_for(self.hourly_rate_min)
+        loaded = getattr(self, '_loaded_geo', None)
+        point = (self.latitude, self.longitude)
+        supplied = None not in point and (loaded is None or point != loaded[1:])
+        if not supplied and (None in point or self.location != loaded[0]):
+            found = geo.lookup(self.location) if places is None else places.get(self.location)
+            self.latitude, self.longitude = found or (None, None)
+        for name, value in geo.point_fields(self.latitude, self.longitude).items():
+            setattr(self, name, value)
+    
+    @classmethod
+    def pay_bucket_for(cls, rate):
+        """Return the PAY_BUCKETS key that ``rate`` falls into."""
+        rate = Decimal(str(rate))
+        bucket = cls.PAY_BUCKETS[0][0]
+        for key, label, lower in cls.PAY_BUCKETS[1:]:
+            if rate >= lower:
+                bucket = key
+        return bucket
+    
     @property
     def hourly_rate_display(self):
-        if self.hourly_rate_min == self.hourly_rate_max:
-            return f"${self.hourly_rate_min}"
-        return f"${self.hourly_rate_min}-{self.hourly_rate_max}"
+        return format_hourly_rate(self.hourly_rate_min, self.hourly_rate_max)
     
     @property
     def posted_date_display(self):
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        now = timezone.now()
-        diff = now - self.posted_date
-        
-        if diff.days == 0:
-            if diff.seconds < 3600:
-                return f"{diff.seconds // 60} minutes ago"
-            else:
-                return f"{diff.seconds // 3600} hours ago"
-        elif diff.days == 1:
-            return "1 day ago"
-        elif diff.days < 7:
-            return f"{diff.days} days ago"
-        elif diff.days < 30:
-            weeks = diff.days // 7
-            return f"{weeks} week{'s' if weeks > 1 else ''} ago"
+        return humanize_age(self.posted_date, timezone.now())
+
+def format_hourly_rate(rate_min, rate_max):
+    """Render a pay range the way job cards show it ("$15.00-20.00")."""
+    if rate_min == rate_max:
+        return f"${rate_min}"
+    return f"${rate_min}-{rate_max}"
+
+def humanize_age(posted_date, now):
+    """Render how long before ``now`` something was posted ("3 hours ago")."""
+    diff = now - posted_date
+    
+    if diff.days == 0:
+        if diff.seconds < 3600:
+            return f"{diff.seconds // 60} minutes ago"
         else:
-            months = diff.days // 30
-            return f"{months} month{'s' if months > 1 else ''} ago"
+            return f"{diff.seconds // 3600} hours ago"
+    elif diff.days == 1:
+        return "1 day ago"
+    elif diff.days < 7:
+        return f"{diff.days} days ago"
+    elif diff.days < 30:
+        weeks = diff.days // 7
+        return f"{weeks} week{'s' if weeks > 1 else ''} ago"
+    else:
+        months = diff.days // 30
+        return f"{months} month{'s' if months > 1 else ''} ago"
+
+class Tag(models.Model):
+    """
+    Normalized tag/requirement value shared by every job that uses it.
+    ``key`` is the case-folded name used for lookups.
+    """
+    name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, unique=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def normalize(name):
+        return ' '.join(str(name).split()).casefold()[:255]
+
+class JobTag(models.Model):
+    """
+    Indexed link between a job and the values in its ``tags`` and
+    ``requirements`` JSON lists. Kept in sync from ``Job.post_save``.
+    """
+    KIND_CHOICES = [
+        ('tag', 'Tag'),
+        ('requirement', 'Requirement'),
+    ]
+    
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='job_links')
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES, default='tag')
+    
+    class Meta:
+        constraints = [
+            # Leading (kind, tag) makes tag filters a covering index lookup
+            models.UniqueConstraint(fields=['kind', 'tag', 'job'], name='jobtag_kind_tag_job_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id} {self.kind}: {self.tag_id}"
+
+class Place(models.Model):
+    """
+    Offline gazetteer entry used to geocode ``Job.location``. Loaded from
+    ``data/places.csv`` by the migrations and the ``load_gazetteer`` command.
+    """
+    name = models.CharField(max_length=100)
+    province = models.CharField(max_length=2)
+    key = models.CharField(max_length=120, unique=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name}, {self.province}"
+
+class Term(models.Model):
+    """
+    Vocabulary of the job recommendation vectors (see recommend.py).
+    ``job_count`` is how many active jobs use the term, its document
+    frequency for IDF weighting.
+    """
+    text = models.CharField(max_length=64, unique=True)
+    job_count = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return self.text
+
+class JobVector(models.Model):
+    """
+    Precomputed, L2-normalized TF-IDF vector of a job's text as parallel
+    arrays of ``Term`` ids (int32) and weights (float32). Inactive jobs
+    keep an empty vector. Kept in sync by the outbox worker after each
+    save (see ``signals.reindex_job``).
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='vector')
+    term_ids = models.BinaryField()
+    weights = models.BinaryField()
+    # In-memory indexes catch up by reading rows changed since they loaded
+    updated_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return f"Vector of job {self.job_id}"
+
+class SimilarJob(models.Model):
+    """
+    Precomputed nearest neighbours: the top ``similar.NEIGHBOURS`` active
+    jobs most like ``job``, with their similarity score (see similar.py).
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='neighbours')
+    similar = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='neighbour_of')
+    score = models.FloatField()
+    
+    class Meta:
+        constraints = [
+            # /jobs/{id}/similar/ seeks on job_id; at most NEIGHBOURS rows each
+            models.UniqueConstraint(fields=['job', 'similar'], name='similarjob_job_similar_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.job_id} ~ {self.similar_id} ({self.score:.3f})"
 
 class JobApplication(models.Model):
     STATUS_CHOICES = [
@@ -91,6 +330,15 @@ class JobApplication(models.Model):
         ('hired', 'Hired'),
         ('rejected', 'Rejected'),
     ]
+    # The statuses an employer may move an application to from each status
+    STATUS_TRANSITIONS = {
+        'submitted': {'under_review', 'interview_scheduled', 'rejected'},
+        'under_review': {'interview_scheduled', 'hired', 'rejected'},
+        'interview_scheduled': {'interviewed', 'rejected'},
+        'interviewed': {'hired', 'rejected'},
+        'hired': set(),
+        'rejected': set(),
+    }
     
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='applications')
     applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_applications')
@@ -106,6 +354,15 @@ class JobApplication(models.Model):
     class Meta:
         ordering = ['-applied_date']
         unique_together = ['job', 'applicant']  # Prevent duplicate applications
+        indexes = [
+            # Keyset pagination of a user's applications seeks on (applied_date, id)
+            models.Index(fields=['applicant', 'applied_date', 'id'], name='application_applicant_date_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.applicant.email} - {self.job.title}" 
\ No newline at end of file
+        return f"{self.applicant.email} - {self.job.title}" 
+
+
+# Job's application counters: the total and one per status (see counters.py)
+APPLICATION_STATUS_COUNTERS = {status: f'applications_{status}' for status, _ in JobApplication.STATUS_CHOICES}
+APPLICATION_COUNTER_FIELDS = ['applications_total', *APPLICATION_STATUS_COUNTERS.values()]
@@ -0,0 +1,183 @@
+"""
+Pagination for job and application listings.
+
+Page-number pagination stays the default. Passing ``?cursor=`` (empty for
+the first page) switches a request to keyset pagination, which seeks past
+the last ``(timestamp, id)`` seen instead of counting and offsetting, so
+every page costs the same and rows inserted meanwhile never shift pages.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over a descending ``(ordering_field, id)`` pair.
+
+    The cursor is an opaque token holding the key of the boundary row and
+    the direction to read in. Results are ordered newest first; a request
+    the filters sort any other way (``?ordering=``, search relevance,
+    ``?near=`` distance) gets a 400 rather than pages in an order it did
+    not ask for.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    ordering_field = None
+    invalid_cursor_message = 'Invalid cursor'
+    invalid_ordering_message = 'Cursor pagination only supports the default ordering, {}.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request)
+        rows = list(self.window(queryset, position, reverse))
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return rows
+
+    def window(self, queryset, position, reverse):
+        """
+        The rows a page reads: ``queryset`` seeked past ``position`` and
+        cut to one more than the page size, the extra row telling whether
+        another page follows.
+        """
+        field = self.ordering_field
+        if tuple(queryset.query.order_by) not in ((), (f'-{field}',), (f'-{field}', '-id')):
+            raise ValidationError({self.cursor_query_param: [self.invalid_ordering_message.format(f'-{field}')]})
+
+        if reverse:
+            queryset = queryset.order_by(field, 'id')
+        else:
+            queryset = queryset.order_by(f'-{field}', '-id')
+
+        if position is not None:
+            # (field, id) < (value, pk), spelled so the leading range term
+            # lets the database seek into the (field, id) index.
+            value, pk = position
+            if reverse:
+                seek = Q(**{f'{field}__gte': value}) & (Q(**{f'{field}__gt': value}) | Q(id__gt=pk))
+            else:
+                seek = Q(**{f'{field}__lte': value}) & (Q(**{f'{field}__lt': value}) | Q(id__lt=pk))
+            queryset = queryset.filter(seek)
+        return queryset[:self.page_size + 1]
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return replace_query_param(self.base_url, self.cursor_query_param, '')
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def _key(self, row):
+        if isinstance(row, dict):
+            return row[self.ordering_field], row['id']
+        return getattr(row, self.ordering_field), row.pk
+
+    def encode_cursor(self, row, reverse):
+        value, pk = self._key(row)
+        token = json.dumps([value.isoformat(), pk, int(reverse)], separators=(',', ':'))
+        encoded = urlsafe_b64encode(token.encode('ascii')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """Return ``((value, id) or None, reverse)`` for the request's cursor."""
+        encoded = request.query_params.get(self.cursor_query_param, '')
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            value, pk, reverse = json.loads(urlsafe_b64decode(padded.encode('ascii')))
+            return (datetime.fromisoformat(value), int(pk)), bool(reverse)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class KeysetOrPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination that hands over to ``keyset_class`` whenever
+    the request carries a ``?cursor=`` parameter.
+    """
+    keyset_class = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def keyset_window(self, queryset, request):
+        """
+        For a ``?cursor=`` request, the sliced queryset of the rows its page
+        reads (see ``KeysetPagination.window``); otherwise ``None``.
+        """
+        keyset = self.keyset_class()
+        if keyset.cursor_query_param not in request.query_params:
+            return None
+        return keyset.window(queryset, *keyset.decode_cursor(request))
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return ''
+        return super().to_html()
+
+
+class JobKeysetPagination(KeysetPagination):
+    ordering_field = 'posted_date'
+
+
+class ApplicationKeysetPagination(KeysetPagination):
+    ordering_field = 'applied_date'
+
+
+class JobPagination(KeysetOrPageNumberPagination):
+    keyset_class = JobKeysetPagination
+
+
+class ApplicationPagination(KeysetOrPageNumberPagination):
+    keyset_class = ApplicationKeysetPagination
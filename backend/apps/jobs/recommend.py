@@ -0,0 +1,436 @@
+"""
+Resume-to-job recommendations.
+
+Jobs and resumes are compared as TF-IDF vectors over a shared ``Term``
+vocabulary. A job's vector (title, tags, requirements, description) is
+computed by the outbox worker after the job is saved (see signals.py) and
+stored in ``JobVector``; the resume vector
+(skills, experience, education) is built per request with the current
+document frequencies. Scores are cosine similarities.
+
+Each process holds every job vector in a ``JobIndex``: an inverted index
+of flat NumPy arrays (postings sorted by term). Scoring a resume gathers
+the postings of its terms and sums them per job with one ``bincount``,
+which takes a few milliseconds at 100k jobs. Vectors written after the
+index was loaded are read on the next request and scored as a small
+side index until there are enough of them to rebuild.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, JobVector, Term
+
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset('''
+    a about after all also an and any are as at be been but by can do for from
+    get has have help how if in into is it its more must my no not of on or our
+    out over per so some such than that the their them then there these they
+    this to up us was we were what when which while who will with you your
+'''.split())
+
+# How often a field's words count towards term frequency
+JOB_FIELD_WEIGHTS = [('title', 2), ('tags', 2), ('requirements', 1), ('description', 1)]
+SKILL_WEIGHT = 3
+EXPERIENCE_TITLE_WEIGHT = 2
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+# Rebuild the in-memory index once this share of jobs changed since loading
+REBUILD_FRACTION = 0.05
+# How long after stamping a vector its transaction may still commit;
+# vectors stamped within this window are re-checked on every refresh
+REFRESH_LAG = timedelta(seconds=2)
+# The IDF only needs a rough number of active jobs; recount this often
+ACTIVE_JOBS_KEY = 'jobs:active-count'
+ACTIVE_JOBS_TIMEOUT = 5 * 60
+
+
+def tokens(text):
+    """Lower-cased word tokens without stop words; trailing plural "s" dropped."""
+    words = []
+    for word in _TOKEN_RE.findall(str(text).casefold()):
+        if len(word) < 2 or word in STOP_WORDS or word.isdigit():
+            continue
+        if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.append(word[:64])
+    return words
+
+
+def job_term_counts(job):
+    """Weighted term frequencies of a job's text."""
+    counts = Counter()
+    for field, weight in JOB_FIELD_WEIGHTS:
+        value = getattr(job, field)
+        text = ' '.join(str(item) for item in value) if isinstance(value, list) else value
+        for word in tokens(text or ''):
+            counts[word] += weight
+    return counts
+
+
+def resume_term_counts(user):
+    """Weighted term frequencies of a user's resume (empty without one)."""
+    from apps.resume.models import Education, Experience, Skill
+
+    counts = Counter()
+    for name, in Skill.objects.filter(resume__user=user).values_list('name'):
+        for word in tokens(name):
+            counts[word] += SKILL_WEIGHT
+    for title, description in Experience.objects.filter(resume__user=user).values_list('job_name', 'description'):
+        for word in tokens(title):
+            counts[word] += EXPERIENCE_TITLE_WEIGHT
+        counts.update(tokens(description))
+    for degree, field in Education.objects.filter(resume__user=user).values_list('degree', 'field_of_study'):
+        counts.update(tokens(f'{degree} {field}'))
+    return counts
+
+
+def active_jobs():
+    """The number of active jobs, recounted at most every ``ACTIVE_JOBS_TIMEOUT`` seconds."""
+    return cache.get_or_set(
+        ACTIVE_JOBS_KEY, lambda: Job.objects.filter(is_active=True).count(), timeout=ACTIVE_JOBS_TIMEOUT,
+    )
+
+
+def idf(job_count, total):
+    """Smoothed inverse document frequency."""
+    return math.log((1 + total) / (1 + job_count)) + 1
+
+
+def weigh(counts, term_ids, job_counts, total):
+    """
+    Turn ``{text: tf}`` into sorted ``(term_ids, weights)`` arrays, L2
+    normalized. Terms missing from ``term_ids`` are dropped.
+    """
+    pairs = sorted(
+        (term_ids[text], (1 + math.log(tf)) * idf(job_counts.get(term_ids[text], 0), total))
+        for text, tf in counts.items() if text in term_ids
+    )
+    ids = np.array([term_id for term_id, _ in pairs], dtype=np.int32)
+    weights = np.array([weight for _, weight in pairs], dtype=np.float32)
+    norm = float(np.linalg.norm(weights)) if len(weights) else 0.0
+    if norm:
+        weights /= norm
+    return ids, weights
+
+
+def ensure_terms(texts):
+    """Return ``{text: term_id}``, creating terms that don't exist yet."""
+    texts = list(texts)
+    ids = {}
+    for start in range(0, len(texts), 500):
+        chunk = texts[start:start + 500]
+        ids.update(Term.objects.filter(text__in=chunk).values_list('text', 'id'))
+    missing = [Term(text=text) for text in texts if text not in ids]
+    if missing:
+        Term.objects.bulk_create(missing, ignore_conflicts=True)
+        for start in range(0, len(missing), 500):
+            chunk = [term.text for term in missing[start:start + 500]]
+            ids.update(Term.objects.filter(text__in=chunk).values_list('text', 'id'))
+    return ids
+
+
+def _unpack(term_ids, weights):
+    return np.frombuffer(term_ids, dtype='<i4'), np.frombuffer(weights, dtype='<f4')
+
+
+def _shift_job_counts(changes):
+    """Apply ``{term_id: delta}`` to ``Term.job_count`` with one UPDATE per delta."""
+    by_delta = {}
+    for term_id, delta in changes.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(term_id)
+    for delta, term_ids in by_delta.items():
+        Term.objects.filter(id__in=term_ids).update(job_count=F('job_count') + delta)
+
+
+def index_job(job):
+    """Recompute the vector of a single saved job."""
+    index_jobs([job])
+
+
+def index_jobs(jobs):
+    """
+    Recompute the vectors of several saved jobs at once, moving the
+    document frequencies of the terms they gained or lost.
+    """
+    counts = {job.pk: job_term_counts(job) if job.is_active else Counter() for job in jobs}
+    term_ids = ensure_terms({text for job_counts in counts.values() for text in job_counts})
+
+    old = {
+        job_id: set(_unpack(ids, weights)[0].tolist())
+        for job_id, ids, weights in JobVector.objects.filter(job_id__in=counts).values_list('job_id', 'term_ids', 'weights')
+    }
+    changes = Counter()
+    for job_id, job_counts in counts.items():
+        new = {term_ids[text] for text in job_counts}
+        previous = old.get(job_id, set())
+        changes.update({term_id: 1 for term_id in new - previous})
+        changes.subtract({term_id: 1 for term_id in previous - new})
+    _shift_job_counts(changes)
+
+    job_counts = dict(Term.objects.filter(id__in=set(term_ids.values())).values_list('id', 'job_count'))
+    total = active_jobs()
+    now = timezone.now()
+    vectors = []
+    for job_id, counts_for_job in counts.items():
+        ids, weights = weigh(counts_for_job, term_ids, job_counts, total)
+        vectors.append(JobVector(job_id=job_id, term_ids=ids.tobytes(), weights=weights.tobytes(), updated_at=now))
+    _write_vectors(vectors)
+
+
+def remove_job(job_id):
+    """Release the document frequencies held by a job about to be deleted."""
+    row = JobVector.objects.filter(job_id=job_id).values_list('term_ids', 'weights').first()
+    if row is not None:
+        _shift_job_counts({term_id: -1 for term_id in _unpack(*row)[0].tolist()})
+
+
+def rebuild(batch_size=2000):
+    """
+    Recompute every document frequency and job vector from scratch.
+    Needed after bulk writes that bypass ``post_save``. Returns the
+    number of active jobs vectorized.
+    """
+    fields = ['id', 'is_active'] + [field for field, _ in JOB_FIELD_WEIGHTS]
+    jobs = Job.objects.order_by().only(*fields)
+
+    document_counts = Counter()
+    for job in jobs.filter(is_active=True).iterator(chunk_size=batch_size):
+        document_counts.update(job_term_counts(job).keys())
+    term_ids = ensure_terms(document_counts)
+    Term.objects.update(job_count=0)
+    Term.objects.bulk_update(
+        [Term(id=term_ids[text], job_count=count) for text, count in document_counts.items()],
+        ['job_count'], batch_size=batch_size,
+    )
+
+    job_counts = {term_ids[text]: count for text, count in document_counts.items()}
+    total = Job.objects.filter(is_active=True).count()
+    cache.set(ACTIVE_JOBS_KEY, total, timeout=ACTIVE_JOBS_TIMEOUT)
+    now = timezone.now()
+    written = 0
+    batch = []
+    for job in jobs.iterator(chunk_size=batch_size):
+        counts = job_term_counts(job) if job.is_active else Counter()
+        ids, weights = weigh(counts, term_ids, job_counts, total)
+        batch.append(JobVector(job_id=job.pk, term_ids=ids.tobytes(), weights=weights.tobytes(), updated_at=now))
+        written += job.is_active
+        if len(batch) >= batch_size:
+            _write_vectors(batch)
+            batch = []
+    if batch:
+        _write_vectors(batch)
+    return written
+
+
+def _write_vectors(vectors):
+    JobVector.objects.bulk_create(
+        vectors,
+        update_conflicts=True,
+        unique_fields=['job'],
+        update_fields=['term_ids', 'weights', 'updated_at'],
+    )
+
+
+class Postings:
+    """Inverted index over a fixed set of job vectors."""
+
+    def __init__(self, vectors):
+        """``vectors`` is a list of ``(job_id, term_ids, weights)``, sorted by job id."""
+        self.job_ids = np.array([job_id for job_id, _, _ in vectors], dtype=np.int64)
+        lengths = np.array([len(ids) for _, ids, _ in vectors], dtype=np.int64)
+        terms = np.concatenate([ids for _, ids, _ in vectors]) if vectors else np.empty(0, np.int32)
+        weights = np.concatenate([w for _, _, w in vectors]) if vectors else np.empty(0, np.float32)
+        rows = np.repeat(np.arange(len(vectors), dtype=np.int32), lengths)
+        order = np.argsort(terms, kind='stable')
+        self.terms = terms[order]
+        self.rows = rows[order]
+        self.weights = weights[order]
+        self.live = np.ones(len(vectors), dtype=bool)
+        # Built on first use by vector() and dot(); see _by_row
+        self._row_positions = None
+        self._row_starts = None
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def rows_for(self, job_ids):
+        """Row positions of the given job ids that are in this index."""
+        job_ids = np.asarray(list(job_ids), dtype=np.int64)
+        positions = np.searchsorted(self.job_ids, job_ids)
+        positions = positions[positions < len(self.job_ids)]
+        return positions[np.isin(self.job_ids[positions], job_ids)]
+
+    def _by_row(self):
+        """Postings positions grouped by row (terms in order), and where each row starts."""
+        if self._row_positions is None:
+            self._row_starts = np.concatenate(([0], np.cumsum(np.bincount(self.rows, minlength=len(self)))))
+            self._row_positions = np.argsort(self.rows, kind='stable').astype(np.int32)
+        return self._row_positions, self._row_starts
+
+    def vector(self, row):
+        """The ``(term_ids, weights)`` of the job at ``row``."""
+        positions, starts = self._by_row()
+        positions = positions[starts[row]:starts[row + 1]]
+        return self.terms[positions], self.weights[positions]
+
+    def dot(self, rows, term_ids, weights):
+        """Exact dot product of the query with the vectors at ``rows`` only."""
+        positions, starts = self._by_row()
+        lengths = starts[rows + 1] - starts[rows]
+        total = int(lengths.sum())
+        if not total or not len(term_ids):
+            return np.zeros(len(rows), dtype=np.float64)
+        offsets = np.cumsum(lengths) - lengths
+        gathered = positions[np.arange(total) + np.repeat(starts[rows] - offsets, lengths)]
+        terms = self.terms[gathered]
+        # Query term ids are sorted: match each gathered term by binary search
+        at = np.minimum(np.searchsorted(term_ids, terms), len(term_ids) - 1)
+        contributions = np.where(term_ids[at] == terms, self.weights[gathered] * weights[at], 0)
+        return np.bincount(np.repeat(np.arange(len(rows)), lengths), weights=contributions, minlength=len(rows))
+
+    def score(self, term_ids, weights):
+        """Dot product of the query with every job, as one array."""
+        starts = np.searchsorted(self.terms, term_ids, side='left')
+        lengths = np.searchsorted(self.terms, term_ids, side='right') - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(len(self), dtype=np.float64)
+        # Concatenated posting ranges of every query term, in one gather
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(total) + np.repeat(starts - offsets, lengths)
+        contributions = self.weights[positions] * np.repeat(weights, lengths)
+        scores = np.bincount(self.rows[positions], weights=contributions, minlength=len(self))
+        scores[~self.live] = 0
+        return scores
+
+
+def _load(queryset):
+    """
+    Read ``(job_id, term_ids, weights)`` vectors sorted by job id, plus
+    ``{job_id: updated_at}``.
+    """
+    vectors = []
+    stamps = {}
+    for job_id, ids, weights, updated_at in queryset.values_list('job_id', 'term_ids', 'weights', 'updated_at'):
+        vectors.append((job_id, *_unpack(ids, weights)))
+        stamps[job_id] = updated_at
+    vectors.sort(key=lambda vector: vector[0])
+    return vectors, stamps
+
+
+class JobIndex:
+    """
+    Every job vector held in memory. ``refresh()`` reads the vectors
+    written since the last call; changed jobs are masked out of the base
+    postings and scored from a small side index instead.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.base = None
+        self.delta = Postings([])
+        self.changed = {}
+        # Every vector stamped up to here has been read; later ones are
+        # tracked in ``recent`` as {job_id: updated_at}
+        self.settled_until = None
+        self.recent = {}
+
+    def rebuild(self):
+        checked_at = timezone.now()
+        vectors, stamps = _load(JobVector.objects.order_by())
+        self.base = Postings([vector for vector in vectors if len(vector[1])])
+        self.delta = Postings([])
+        self.changed = {}
+        self.settled_until = None
+        self.recent = {}
+        self._advance(stamps, checked_at)
+
+    def _advance(self, stamps, checked_at):
+        # Anything stamped more than REFRESH_LAG before this check has
+        # committed by now, so it was part of what we just read
+        settled = checked_at - REFRESH_LAG
+        self.settled_until = max(self.settled_until or settled, settled)
+        self.recent.update(stamps)
+        self.recent = {job_id: stamp for job_id, stamp in self.recent.items() if stamp > self.settled_until}
+
+    def refresh(self):
+        with self.lock:
+            if self.base is None:
+                self.rebuild()
+                return
+            checked_at = timezone.now()
+            # Only ids and stamps first, straight from the updated_at index
+            stamps = JobVector.objects.filter(updated_at__gt=self.settled_until).values_list('job_id', 'updated_at')
+            unseen = [job_id for job_id, stamp in stamps if self.recent.get(job_id) != stamp]
+            if not unseen:
+                self._advance({}, checked_at)
+                return
+            if len(self.changed) + len(unseen) > max(1000, REBUILD_FRACTION * len(self.base)):
+                self.rebuild()
+                return
+            vectors, stamps = _load(JobVector.objects.filter(job_id__in=unseen))
+            self.changed.update((job_id, (ids, weights)) for job_id, ids, weights in vectors)
+            self.base.live[:] = True
+            self.base.live[self.base.rows_for(self.changed)] = False
+            self.delta = Postings(sorted(
+                (job_id, ids, weights) for job_id, (ids, weights) in self.changed.items() if len(ids)
+            ))
+            self._advance(stamps, checked_at)
+
+    def top(self, term_ids, weights, limit, exclude=()):
+        """Return ``[(job_id, score), ...]``, best first, skipping ``exclude``."""
+        candidates = []
+        for postings in (self.base, self.delta):
+            if not len(postings):
+                continue
+            scores = postings.score(term_ids, weights)
+            scores[postings.rows_for(exclude)] = 0
+            count = min(limit, len(scores))
+            best = np.argpartition(-scores, count - 1)[:count]
+            candidates.extend(
+                (int(postings.job_ids[row]), float(scores[row])) for row in best if scores[row] > 0
+            )
+        candidates.sort(key=lambda candidate: (-candidate[1], -candidate[0]))
+        return candidates[:limit]
+
+
+index = JobIndex()
+
+
+def query_vector(counts):
+    """Resume term counts -> ``(term_ids, weights)`` with current document frequencies."""
+    term_ids = {}
+    job_counts = {}
+    texts = list(counts)
+    for start in range(0, len(texts), 500):
+        for term_id, text, job_count in Term.objects.filter(text__in=texts[start:start + 500]).values_list('id', 'text', 'job_count'):
+            term_ids[text] = term_id
+            job_counts[term_id] = job_count
+    total = active_jobs()
+    return weigh(counts, term_ids, job_counts, total)
+
+
+def recommend(user, limit=DEFAULT_LIMIT, exclude=()):
+    """
+    Return ``[(job_id, score), ...]`` for ``user``'s resume, best first.
+    Ids may include jobs deactivated or deleted since they were scored;
+    callers load the jobs with ``is_active=True`` and ask for a margin.
+    """
+    counts = resume_term_counts(user)
+    if not counts:
+        return []
+    term_ids, weights = query_vector(counts)
+    if not len(term_ids):
+        return []
+    index.refresh()
+    return index.top(term_ids, weights, limit, exclude=exclude)
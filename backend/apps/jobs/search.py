@@ -0,0 +1,122 @@
+"""
+Full-text search over job postings.
+
+On SQLite the ``jobs_job_fts`` FTS5 table mirrors the searchable text of
+every job (title, company, description and tags), keyed by the job's
+primary key as its rowid. Other databases fall back to DRF's
+``icontains`` search, so every helper here is a no-op off SQLite.
+"""
+import re
+
+from django.db import connection
+
+FTS_TABLE = 'jobs_job_fts'
+
+_TOKEN_RE = re.compile(r'\w+')
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, company, description, tags, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+_INSERT_SQL = (
+    f"INSERT INTO {FTS_TABLE} (rowid, title, company, description, tags) "
+    "VALUES (%s, %s, %s, %s, %s)"
+)
+_DELETE_SQL = f"DELETE FROM {FTS_TABLE} WHERE rowid = %s"
+
+
+def is_supported(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Turn free text from the search box into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix query and all of them must match,
+    so "lawn mow" finds "Lawn Mowing" while the user is still typing.
+    Returns an empty string when the text has no searchable words.
+    """
+    tokens = _TOKEN_RE.findall((text or '').lower())
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _row(job_id, title, company, description, tags):
+    return (job_id, title, company, description, ' '.join(str(tag) for tag in tags or []))
+
+
+def index_job(job):
+    """Insert or refresh the index entry for a single job."""
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(_DELETE_SQL, [job.pk])
+        cursor.execute(_INSERT_SQL, _row(job.pk, job.title, job.company, job.description, job.tags))
+
+
+def remove_job(job_id):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(_DELETE_SQL, [job_id])
+
+
+def index_jobs(queryset, batch_size=2000):
+    """
+    (Re)index every job in ``queryset`` in batches.
+
+    Used after bulk writes that bypass ``post_save`` and by the rebuild
+    command. Returns the number of indexed jobs.
+    """
+    if not is_supported():
+        return 0
+    rows = queryset.order_by().values_list('id', 'title', 'company', 'description', 'tags')
+    total = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(_row(*row))
+            if len(batch) >= batch_size:
+                total += _write_batch(cursor, batch)
+                batch = []
+        if batch:
+            total += _write_batch(cursor, batch)
+    return total
+
+
+def _write_batch(cursor, batch):
+    cursor.executemany(_DELETE_SQL, [[row[0]] for row in batch])
+    cursor.executemany(_INSERT_SQL, batch)
+    return len(batch)
+
+
+def rebuild(queryset, batch_size=2000):
+    """Drop every index entry and reindex ``queryset`` from scratch."""
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(DROP_SQL)
+        cursor.execute(CREATE_SQL)
+    total = index_jobs(queryset, batch_size=batch_size)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def filter_ranked(queryset, match):
+    """
+    Restrict a ``Job`` queryset to FTS matches and annotate ``search_rank``.
+
+    The index is joined on rowid so SQLite drives the query from the FTS
+    match instead of scanning ``jobs_job``. Lower ranks are better (bm25).
+    """
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        select={'search_rank': f'{FTS_TABLE}.rank'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = "{table}"."id"', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    )
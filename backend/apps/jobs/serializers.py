@@ -1,24 +1,166 @@
+from decimal import Decimal
+
+from django.db.models.manager import BaseManager
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Job, JobApplication
+from .models import Job, JobApplication, format_hourly_rate, humanize_age
+
+CENTS = Decimal('0.01')
+TENTHS = Decimal('0.1')
+
+
+def _decimal(value, exponent):
+    # DecimalField.to_representation for a non-null, in-range value
+    return f'{value.quantize(exponent):f}'
+
+
+def _datetime(value, tz):
+    # DateTimeField.to_representation with the default ISO 8601 format
+    if value is None:
+        return None
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _float(value):
+    return None if value is None else float(value)
+
+
+def _rows(data):
+    """Return ``data`` as a list of ``.values()`` dicts, or ``None`` for model instances."""
+    rows = list(data.all() if isinstance(data, BaseManager) else data)
+    if rows and isinstance(rows[0], dict):
+        return rows
+    return None
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin taking ``fields=[...]`` (output fields to keep) and
+    ``nested={'job': [...]}`` (the same for nested serializers).
+    ``source_columns`` maps output fields to the model columns they are
+    built from where the two differ.
+    """
+    source_columns = {}
+    
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        nested = kwargs.pop('nested', None) or {}
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in [name for name in self.fields if name not in fields]:
+                self.fields.pop(name)
+        for name, subfields in nested.items():
+            if name in self.fields:
+                self.fields[name] = type(self.fields[name])(read_only=True, fields=subfields)
+    
+    @classmethod
+    def value_columns(cls, fields=None, extra=()):
+        """The ``.values()`` columns needed to render ``fields`` (default: all)."""
+        columns = dict.fromkeys(extra)
+        for name in cls.Meta.fields if fields is None else fields:
+            columns.update(dict.fromkeys(cls.source_columns.get(name, [name])))
+        return list(columns)
+
 
-class JobSerializer(serializers.ModelSerializer):
+class JobListSerializer(serializers.ListSerializer):
+    """
+    Read-only fast path for many jobs. Given ``.values(*JOB_VALUE_FIELDS)``
+    rows it builds the same output as ``JobSerializer`` without running the
+    per-field machinery, and computes "now" once for the whole list. Model
+    instances still go through the regular path.
+    """
+
+    def to_representation(self, data):
+        rows = _rows(data)
+        if rows is None:
+            return super().to_representation(data.all() if isinstance(data, BaseManager) else data)
+        return represent_job_rows(rows, list(self.child.fields))
+
+
+class JobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     hourly_rate_display = serializers.ReadOnlyField()
     posted_date_display = serializers.ReadOnlyField()
     
+    source_columns = {
+        'hourly_rate_display': ['hourly_rate_min', 'hourly_rate_max'],
+        'posted_date_display': ['posted_date'],
+    }
+    
     class Meta:
         model = Job
         fields = [
             'id', 'title', 'company', 'location', 'hourly_rate_min', 
-            'hourly_rate_max', 'hourly_rate_display', 'job_type', 'schedule',
+            'hourly_rate_max', 'hourly_rate_display', 'pay_bucket', 'job_type', 'schedule',
             'description', 'requirements', 'tags', 'rating', 'review_count',
-            'featured', 'posted_date', 'posted_date_display', 'is_active'
+            'featured', 'posted_date', 'posted_date_display', 'is_active',
+            'latitude', 'longitude'
         ]
-        read_only_fields = ['posted_date', 'rating', 'review_count', 'featured']
+        read_only_fields = ['posted_date', 'rating', 'review_count', 'featured', 'latitude', 'longitude']
+        list_serializer_class = JobListSerializer
+
+# Columns JobListSerializer needs from .values()
+JOB_VALUE_FIELDS = JobSerializer.value_columns()
+
+# What a job card shows (?view=card)
+JOB_CARD_FIELDS = [
+    'id', 'title', 'company', 'location', 'hourly_rate_display', 'job_type',
+    'tags', 'featured', 'posted_date', 'posted_date_display',
+]
+
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+def represent_job_rows(rows, fields=None, now=None):
+    """
+    Render ``Job`` ``.values()`` rows exactly as ``JobSerializer`` renders
+    the corresponding instances, limited to ``fields`` when given.
+    """
+    now = now or timezone.now()
+    tz = timezone.get_current_timezone()
+    # Fields whose value is not the column as-is
+    rendered = {
+        'hourly_rate_min': lambda row: _decimal(row['hourly_rate_min'], CENTS),
+        'hourly_rate_max': lambda row: _decimal(row['hourly_rate_max'], CENTS),
+        'hourly_rate_display': lambda row: format_hourly_rate(row['hourly_rate_min'], row['hourly_rate_max']),
+        'rating': lambda row: _decimal(row['rating'], TENTHS),
+        'posted_date': lambda row: _datetime(row['posted_date'], tz),
+        'posted_date_display': lambda row: humanize_age(row['posted_date'], now),
+        'latitude': lambda row: _float(row['latitude']),
+        'longitude': lambda row: _float(row['longitude']),
+    }
+    columns = [(name, rendered.get(name)) for name in fields or JobSerializer.Meta.fields]
+    return [
+        {name: row[name] if render is None else render(row) for name, render in columns}
+        for row in rows
+    ]
+
+
+class JobApplicationListSerializer(serializers.ListSerializer):
+    """
+    Read-only fast path for many applications, the counterpart of
+    ``JobListSerializer``. Takes ``.values(*APPLICATION_VALUE_FIELDS)``
+    rows; see ``represent_application_rows`` for the nested jobs.
+    """
+
+    def to_representation(self, data):
+        rows = _rows(data)
+        if rows is None:
+            return super().to_representation(data.all() if isinstance(data, BaseManager) else data)
+        fields = list(self.child.fields)
+        job_fields = list(self.child.fields['job'].fields) if 'job' in fields else None
+        return represent_application_rows(rows, fields, job_fields)
+
+
+class JobApplicationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     job = JobSerializer(read_only=True)
     applicant_name = serializers.SerializerMethodField()
     
+    source_columns = {
+        'job': ['job_id'],
+        'applicant_name': ['applicant__first_name', 'applicant__last_name', 'applicant__email'],
+    }
+    
     class Meta:
         model = JobApplication
         fields = [
@@ -26,7 +168,10 @@ class JobApplicationSerializer(serializers.ModelSerializer):
             'relevant_experience', 'questions', 'status', 'applied_date',
             'last_updated', 'applicant_name'
         ]
-        read_only_fields = ['applied_date', 'last_updated', 'applicant_name']
+        # Status only moves through update_status and bulk-status, which
+        # check the employer and JobApplication.STATUS_TRANSITIONS
+        read_only_fields = ['status', 'applied_date', 'last_updated', 'applicant_name']
+        list_serializer_class = JobApplicationListSerializer
     
     def get_applicant_name(self, obj):
         return f"{obj.applicant.first_name} {obj.applicant.last_name}".strip() or obj.applicant.email
@@ -36,6 +181,64 @@ class JobApplicationSerializer(serializers.ModelSerializer):
         validated_data['applicant'] = self.context['request'].user
         return super().create(validated_data)
 
+# Columns JobApplicationListSerializer needs from .values()
+APPLICATION_VALUE_FIELDS = JobApplicationSerializer.value_columns()
+
+# An application in a compact list (?view=card); its job uses JOB_CARD_FIELDS
+APPLICATION_CARD_FIELDS = ['id', 'job', 'status', 'applied_date', 'last_updated']
+
+# The smallest useful listing (?view=compact), for students and employers
+# alike; its job is reduced to JOB_COMPACT_FIELDS
+APPLICATION_COMPACT_FIELDS = ['id', 'job', 'status', 'applied_date', 'last_updated', 'applicant_name']
+JOB_COMPACT_FIELDS = ['id', 'title', 'company']
+
+
+def represent_application_rows(rows, fields=None, job_fields=None, now=None):
+    """
+    Render ``JobApplication`` ``.values()`` rows exactly as
+    ``JobApplicationSerializer`` renders the corresponding instances,
+    limited to ``fields`` (and ``job_fields`` for the nested job).
+    
+    Rows that carry ``job__<column>`` values (read through the join, see
+    ``SparseFieldsetMixin.get_value_columns``) render their jobs from
+    those. Otherwise every nested job is loaded with one extra
+    ``.values()`` query.
+    """
+    now = now or timezone.now()
+    tz = timezone.get_current_timezone()
+    fields = fields or JobApplicationSerializer.Meta.fields
+    
+    jobs = {}
+    if 'job' in fields and rows:
+        columns = JobSerializer.value_columns(job_fields, extra=['id'])
+        if 'job__id' in rows[0]:
+            job_rows = {
+                row['job_id']: {column: row[f'job__{column}'] for column in columns}
+                for row in rows
+            }
+        else:
+            job_rows = {
+                row['id']: row
+                for row in Job.objects.filter(id__in={row['job_id'] for row in rows}).values(*columns)
+            }
+        rendered_jobs = represent_job_rows(list(job_rows.values()), job_fields, now)
+        jobs = dict(zip(job_rows, rendered_jobs))
+    
+    rendered = {
+        'job': lambda row: jobs[row['job_id']],
+        'applied_date': lambda row: _datetime(row['applied_date'], tz),
+        'last_updated': lambda row: _datetime(row['last_updated'], tz),
+        'applicant_name': lambda row: (
+            f"{row['applicant__first_name']} {row['applicant__last_name']}".strip()
+            or row['applicant__email']
+        ),
+    }
+    columns = [(name, rendered.get(name)) for name in fields]
+    return [
+        {name: row[name] if render is None else render(row) for name, render in columns}
+        for row in rows
+    ]
+
 class JobApplicationCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobApplication
@@ -47,4 +250,81 @@ class JobApplicationCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Set the applicant to the current user
         validated_data['applicant'] = self.context['request'].user
-        return super().create(validated_data) 
\ No newline at end of file
+        return super().create(validated_data)
+
+# Most jobs one batch apply request may name
+BATCH_APPLY_LIMIT = 50
+
+
+class JobApplicationBatchSerializer(JobApplicationCreateSerializer):
+    """One application body to send to each of ``jobs``; validated once for all of them."""
+    jobs = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=BATCH_APPLY_LIMIT,
+    )
+    
+    class Meta(JobApplicationCreateSerializer.Meta):
+        fields = ['jobs', *JobApplicationCreateSerializer.Meta.fields]
+
+# Most applications one bulk status request may list by id
+BULK_STATUS_LIMIT = 1000
+
+
+class ApplicationFilterSerializer(serializers.Serializer):
+    job = serializers.IntegerField(min_value=1, required=False)
+    status = serializers.ChoiceField(choices=JobApplication.STATUS_CHOICES, required=False)
+    
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('Filter on at least one of "job" and "status".')
+        return attrs
+
+
+class ApplicationBulkStatusSerializer(serializers.Serializer):
+    """A target status and the applications to move to it: ``ids`` or a ``filter``."""
+    status = serializers.ChoiceField(choices=JobApplication.STATUS_CHOICES)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=BULK_STATUS_LIMIT,
+        required=False,
+    )
+    filter = ApplicationFilterSerializer(required=False)
+    
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Send either "ids" or "filter".')
+        return attrs
+
+class JobImportSerializer(serializers.ModelSerializer):
+    """
+    One row of a partner job feed (see ingest.py). Rows are matched to
+    existing jobs on ``(source, external_id)``; the upsert itself enforces
+    that, so the per-row uniqueness queries DRF would add are turned off.
+    Feeds cannot set what site users cannot: ``featured``, ``rating`` and
+    ``review_count`` are left out.
+    """
+    external_id = serializers.CharField(max_length=100)
+    
+    class Meta:
+        model = Job
+        fields = [
+            'external_id', 'title', 'company', 'location', 'hourly_rate_min',
+            'hourly_rate_max', 'job_type', 'schedule', 'description',
+            'requirements', 'tags', 'is_active', 'latitude', 'longitude',
+        ]
+        validators = []
+    
+    def validate_requirements(self, value):
+        return self._string_list(value)
+    
+    def validate_tags(self, value):
+        return self._string_list(value)
+    
+    def validate(self, attrs):
+        if attrs['hourly_rate_max'] < attrs['hourly_rate_min']:
+            raise serializers.ValidationError({'hourly_rate_max': ['Must not be below hourly_rate_min.']})
+        return attrs
+    
+    @staticmethod
+    def _string_list(value):
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise serializers.ValidationError('Must be a list of strings.')
+        return [item.strip() for item in value if item.strip()]
@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import Signal, receiver
+from django.utils.dateparse import parse_datetime
+
+from apps.outbox import events
+from . import caching, recommend, search, similar, tagging
+from .models import Job, JobApplication
+
+# Application side effects (notifications, mirrors, analytics) listen to
+# these instead of post_save: batch apply and bulk status updates skip
+# save(). The views queue each event in the outbox in the same transaction
+# as the change, and `run_worker` sends it, at least once, after the
+# commit. Receivers run outside the request and may see an event twice.
+#
+# application_id, job_id, applicant_id, status, applied_date
+application_submitted = Signal()
+# application_id, job_id, applicant_id, old_status, new_status, changed_at
+application_status_changed = Signal()
+
+SUBMITTED = 'jobs.application_submitted'
+STATUS_CHANGED = 'jobs.application_status_changed'
+# job_id: recompute the job's recommendation vector and similar jobs
+JOB_CHANGED = 'jobs.job_changed'
+
+
+def submitted(applications):
+    """Queue ``application_submitted`` for each of the new ``applications``."""
+    events.publish_many(SUBMITTED, [
+        {
+            'application_id': application.pk,
+            'job_id': application.job_id,
+            'applicant_id': application.applicant_id,
+            'status': application.status,
+            'applied_date': application.applied_date,
+        }
+        for application in applications
+    ])
+
+
+def status_changed(changes, new_status, changed_at):
+    """
+    Queue ``application_status_changed`` for each ``(application_id, job_id,
+    applicant_id, old_status)`` in ``changes``.
+    """
+    events.publish_many(STATUS_CHANGED, [
+        {
+            'application_id': application_id,
+            'job_id': job_id,
+            'applicant_id': applicant_id,
+            'old_status': old_status,
+            'new_status': new_status,
+            'changed_at': changed_at,
+        }
+        for application_id, job_id, applicant_id, old_status in changes
+    ])
+
+
+@events.handler(SUBMITTED)
+def deliver_submitted(payload):
+    application_submitted.send(
+        sender=JobApplication, **{**payload, 'applied_date': parse_datetime(payload['applied_date'])},
+    )
+
+
+@events.handler(STATUS_CHANGED)
+def deliver_status_changed(payload):
+    application_status_changed.send(
+        sender=JobApplication, **{**payload, 'changed_at': parse_datetime(payload['changed_at'])},
+    )
+
+
+@events.handler(JOB_CHANGED)
+def reindex_job(payload):
+    job = Job.objects.filter(pk=payload['job_id']).first()
+    if job is None:
+        # Deleted since: job_deleting released its terms, the cascade its rows
+        return
+    recommend.index_job(job)
+    similar.update_job(job)
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, **kwargs):
+    # Search and tag filters must match the job as soon as it commits; the
+    # vector and neighbour upkeep is slower and can trail it
+    search.index_job(instance)
+    tagging.sync_job_tags(instance)
+    events.publish(JOB_CHANGED, {'job_id': instance.pk})
+    transaction.on_commit(caching.invalidate)
+
+@receiver(pre_delete, sender=Job)
+def job_deleting(sender, instance, **kwargs):
+    # Before the cascade removes the vector that holds its term counts
+    recommend.remove_job(instance.pk)
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    search.remove_job(instance.pk)
+    transaction.on_commit(caching.invalidate)
@@ -0,0 +1,207 @@
+"""
+"Similar jobs": a precomputed nearest-neighbour table.
+
+Each active job keeps its ``NEIGHBOURS`` most similar active jobs in
+``SimilarJob``, so ``/jobs/{id}/similar/`` is one indexed read. Similarity
+is symmetric. It adds the cosine of the TF-IDF vectors from recommend.py
+(title, tags, requirements, description) to matches on job type and
+schedule and to how close the pay is, weighted by ``WEIGHTS``.
+
+Neighbours are searched in the in-memory ``recommend.index``, with the
+job type, schedule and rate of every job held alongside it as arrays
+(``Attributes``). A search scores every job on the query's
+``QUERY_TERMS`` heaviest terms plus the attributes, all as vector
+operations. It then re-ranks the best ``CANDIDATES`` on their full
+vectors. The heaviest terms carry most of a cosine, so what this misses
+is at most a near tie. If those terms are unique to the job, the search
+falls back to every term.
+
+After a job is saved, the outbox worker recomputes its own list and
+offers the job to the lists of the jobs it found (``update_job``). Lists that lose a job (deactivated, or
+no longer similar) stay one short until ``rebuild_similar_jobs`` runs.
+"""
+import threading
+import weakref
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import recommend
+from .models import Job, JobVector, SimilarJob
+
+NEIGHBOURS = 10
+CANDIDATES = 100
+QUERY_TERMS = 5
+
+WEIGHTS = {'text': 0.6, 'job_type': 0.15, 'schedule': 0.1, 'pay': 0.15}
+# Hourly rates this many dollars apart share no pay similarity
+PAY_SCALE = 10.0
+
+JOB_TYPE_CODES = {value: code for code, (value, _) in enumerate(Job.JOB_TYPE_CHOICES)}
+SCHEDULE_CODES = {value: code for code, (value, _) in enumerate(Job.SCHEDULE_CHOICES)}
+# Jobs not loaded yet match nothing
+UNKNOWN = (-1, -1, np.inf)
+
+
+class Attributes:
+    """
+    ``(job_type, schedule, hourly_rate)`` of every active job, as arrays aligned
+    with the rows of a ``recommend.Postings``. ``refresh()`` reads the jobs
+    saved since the last call, the same way ``JobIndex.refresh()`` does.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = None
+        self.settled_until = None
+        self.aligned = weakref.WeakKeyDictionary()
+
+    def refresh(self):
+        with self.lock:
+            checked_at = timezone.now()
+            # Only active jobs have vectors; this also keeps the read on
+            # the partial job_active_updated_idx
+            jobs = Job.objects.filter(is_active=True).order_by()
+            if self.values is None:
+                self.values = {}
+            else:
+                jobs = jobs.filter(updated_at__gt=self.settled_until)
+            changed = {
+                job_id: (JOB_TYPE_CODES.get(job_type, -1), SCHEDULE_CODES.get(schedule, -1), float(rate))
+                for job_id, job_type, schedule, rate in jobs.values_list('id', 'job_type', 'schedule', 'hourly_rate_min')
+            }
+            self.values.update(changed)
+            for postings, arrays in self.aligned.items():
+                rows = postings.rows_for(changed)
+                for array, column in zip(arrays, zip(*(changed[job_id] for job_id in postings.job_ids[rows].tolist()))):
+                    array[rows] = column
+            # Anything saved more than REFRESH_LAG ago has committed by now
+            self.settled_until = checked_at - recommend.REFRESH_LAG
+
+    def __call__(self, postings):
+        """``(job_types, schedules, rates)`` arrays for the rows of ``postings``."""
+        arrays = self.aligned.get(postings)
+        if arrays is None:
+            values = [self.values.get(job_id, UNKNOWN) for job_id in postings.job_ids.tolist()]
+            job_types, schedules, rates = zip(*values) if values else ((), (), ())
+            arrays = (
+                np.array(job_types, dtype=np.int16),
+                np.array(schedules, dtype=np.int16),
+                np.array(rates, dtype=np.float64),
+            )
+            self.aligned[postings] = arrays
+        return arrays
+
+
+attributes = Attributes()
+
+
+def _attribute_scores(job, arrays):
+    job_type, schedule, rate = job
+    job_types, schedules, rates = arrays
+    return (
+        WEIGHTS['job_type'] * (job_types == job_type)
+        + WEIGHTS['schedule'] * (schedules == schedule)
+        + WEIGHTS['pay'] * np.maximum(0.0, 1 - np.abs(rates - rate) / PAY_SCALE)
+    )
+
+
+def search(index, attributes, job_id, term_ids, weights):
+    """
+    Return ``[(job_id, score), ...]``, best first, for up to ``CANDIDATES``
+    jobs sharing one of the query's heaviest terms, or any of its terms
+    when those are too rare to find ``NEIGHBOURS``. Scores are exact.
+    """
+    if not len(term_ids):
+        return []
+    job = attributes.values.get(job_id, UNKNOWN)
+    heaviest = np.sort(np.argsort(-weights, kind='stable')[:QUERY_TERMS])
+    found = _search(index, attributes, job, job_id, term_ids, weights, heaviest)
+    if len(found) < NEIGHBOURS and len(heaviest) < len(term_ids):
+        found = _search(index, attributes, job, job_id, term_ids, weights, slice(None))
+    found.sort(key=lambda pair: (-pair[1], pair[0]))
+    return found[:CANDIDATES]
+
+
+def _search(index, attributes, job, job_id, term_ids, weights, query_terms):
+    found = []
+    for postings in (index.base, index.delta):
+        if not len(postings):
+            continue
+        arrays = attributes(postings)
+        partial = postings.score(term_ids[query_terms], weights[query_terms])
+        estimate = WEIGHTS['text'] * partial + _attribute_scores(job, arrays)
+        # Dead and excluded rows score nothing on text; drop them with the rest
+        estimate[partial <= 0] = -1
+        estimate[postings.rows_for([job_id])] = -1
+        count = min(CANDIDATES, int((estimate > 0).sum()))
+        if not count:
+            continue
+        rows = np.argpartition(-estimate, count - 1)[:count]
+        scores = (
+            WEIGHTS['text'] * postings.dot(rows, term_ids, weights)
+            + _attribute_scores(job, tuple(array[rows] for array in arrays))
+        )
+        found.extend(zip(postings.job_ids[rows].tolist(), scores.tolist()))
+    return found
+
+
+def update_job(job):
+    """Recompute a saved job's neighbours and offer it to the lists of the jobs it found."""
+    SimilarJob.objects.filter(Q(job=job) | Q(similar=job)).delete()
+    if not job.is_active:
+        return
+    vector = JobVector.objects.filter(job=job).values_list('term_ids', 'weights').first()
+    if vector is None:
+        return
+    recommend.index.refresh()
+    attributes.refresh()
+    found = search(recommend.index, attributes, job.pk, *recommend._unpack(*vector))
+
+    rows = [SimilarJob(job_id=job.pk, similar_id=other, score=score) for other, score in found[:NEIGHBOURS]]
+    # Similarity is symmetric: the job belongs in another job's list when
+    # it beats that list's weakest entry, which it then replaces
+    lists = {}
+    others = SimilarJob.objects.filter(job_id__in=[other for other, _ in found])
+    for row_id, owner, score in others.values_list('id', 'job_id', 'score'):
+        lists.setdefault(owner, []).append((score, row_id))
+    evicted = []
+    for other, score in found:
+        entries = lists.get(other, [])
+        if len(entries) >= NEIGHBOURS:
+            weakest = min(entries)
+            if score <= weakest[0]:
+                continue
+            evicted.append(weakest[1])
+        rows.append(SimilarJob(job_id=other, similar_id=job.pk, score=score))
+    if evicted:
+        SimilarJob.objects.filter(id__in=evicted).delete()
+    SimilarJob.objects.bulk_create(rows)
+
+
+def rebuild(batch_size=5000):
+    """
+    Recompute every job's neighbours from a freshly loaded index. Needed
+    after bulk writes that bypass ``post_save``, and to refill lists left
+    short by incremental updates. Returns the number of rows written.
+    """
+    index = recommend.JobIndex()
+    index.refresh()
+    job_attributes = Attributes()
+    job_attributes.refresh()
+    written = 0
+    with transaction.atomic():
+        SimilarJob.objects.all().delete()
+        batch = []
+        for row, job_id in enumerate(index.base.job_ids.tolist()):
+            found = search(index, job_attributes, job_id, *index.base.vector(row))
+            batch.extend(SimilarJob(job_id=job_id, similar_id=other, score=score) for other, score in found[:NEIGHBOURS])
+            if len(batch) >= batch_size:
+                SimilarJob.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        SimilarJob.objects.bulk_create(batch)
+        written += len(batch)
+    return written
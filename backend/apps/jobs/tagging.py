@@ -0,0 +1,112 @@
+"""
+Keep the normalized ``Tag``/``JobTag`` index in step with the ``tags`` and
+``requirements`` JSON lists on ``Job``.
+"""
+from django.db.models import Count
+
+from .models import JobTag, Tag
+
+# JSON list field on Job -> JobTag.kind
+KIND_FIELDS = [
+    ('tag', 'tags'),
+    ('requirement', 'requirements'),
+]
+
+
+def wanted_links(job):
+    """Return ``{(kind, key): display_name}`` for the values on ``job``."""
+    links = {}
+    for kind, field in KIND_FIELDS:
+        for name in getattr(job, field) or []:
+            key = Tag.normalize(name)
+            if key:
+                links.setdefault((kind, key), ' '.join(str(name).split())[:255])
+    return links
+
+
+def ensure_tags(names_by_key):
+    """Return ``{key: tag_id}``, creating any tags that don't exist yet."""
+    keys = list(names_by_key)
+    ids = dict(Tag.objects.filter(key__in=keys).values_list('key', 'id'))
+    missing = [Tag(key=key, name=names_by_key[key]) for key in keys if key not in ids]
+    if missing:
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        ids.update(Tag.objects.filter(key__in=[tag.key for tag in missing]).values_list('key', 'id'))
+    return ids
+
+
+def sync_job_tags(job):
+    """Bring the ``JobTag`` rows of a single saved job up to date."""
+    sync_jobs_tags([job])
+
+
+def sync_jobs_tags(jobs):
+    """Bring the ``JobTag`` rows of several saved jobs up to date at once."""
+    wanted = {job.pk: wanted_links(job) for job in jobs}
+    names_by_key = {}
+    for links in wanted.values():
+        for (kind, key), name in links.items():
+            names_by_key.setdefault(key, name)
+    tag_ids = ensure_tags(names_by_key) if names_by_key else {}
+
+    existing = {}
+    rows = JobTag.objects.filter(job_id__in=wanted).values_list('id', 'job_id', 'kind', 'tag_id')
+    for link_id, job_id, kind, tag_id in rows:
+        existing.setdefault(job_id, {})[(kind, tag_id)] = link_id
+
+    stale = []
+    fresh = []
+    for job_id, links in wanted.items():
+        desired = {(kind, tag_ids[key]) for kind, key in links}
+        current = existing.get(job_id, {})
+        stale.extend(link_id for pair, link_id in current.items() if pair not in desired)
+        fresh.extend(JobTag(job_id=job_id, kind=kind, tag_id=tag_id) for kind, tag_id in desired - current.keys())
+
+    if stale:
+        JobTag.objects.filter(id__in=stale).delete()
+    if fresh:
+        JobTag.objects.bulk_create(fresh, ignore_conflicts=True)
+
+
+def sync_queryset(queryset, batch_size=500):
+    """Resync the tag index for every job in ``queryset``. Returns the count."""
+    total = 0
+    batch = []
+    for job in queryset.order_by().only('id', 'tags', 'requirements').iterator(chunk_size=batch_size):
+        batch.append(job)
+        if len(batch) >= batch_size:
+            sync_jobs_tags(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        sync_jobs_tags(batch)
+        total += len(batch)
+    return total
+
+
+def parse_names(value):
+    """Split a ``?tags=Outdoors,Flexible`` value into unique lookup keys."""
+    keys = []
+    for name in (value or '').split(','):
+        key = Tag.normalize(name)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def matching_job_ids(keys, kind='tag', match_all=True):
+    """
+    Subquery of job ids carrying the given tag keys.
+
+    ``match_all`` requires every key (AND); otherwise any one of them (OR).
+    Both forms are answered from the ``(kind, tag, job)`` unique index.
+    """
+    links = JobTag.objects.filter(kind=kind, tag__in=Tag.objects.filter(key__in=keys).values('id'))
+    if not match_all:
+        return links.values('job_id')
+    return (
+        links.values('job_id')
+        .annotate(matched=Count('tag_id'))
+        .filter(matched=len(keys))
+        .values('job_id')
+    )
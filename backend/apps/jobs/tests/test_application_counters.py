@@ -0,0 +1,103 @@
+"""
+The per-job application counters (apps/jobs/counters.py) stay equal to a
+fresh count of the job's applications through every write the API makes,
+and ``reconcile()`` puts back the ones that writes around the API left off.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs import counters
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import APPLICATION_COUNTER_FIELDS, Job, JobApplication
+
+User = get_user_model()
+
+APPLICATION = {
+    'cover_letter': 'I love working outdoors.',
+    'why_interested': 'Close to home.',
+    'relevant_experience': 'Two summers of yard work.',
+    'availability': ['Weekends'],
+}
+
+
+class ApplicationCounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.students = [
+            User.objects.create(username=f'student{number}@example.com', email=f'student{number}@example.com')
+            for number in range(3)
+        ]
+        Job.objects.bulk_create(make_jobs(2, cls.employer))
+        cls.job, cls.other_job = Job.objects.order_by('id')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assertCountersMatch(self, job, **expected):
+        stored = Job.objects.values(*APPLICATION_COUNTER_FIELDS).get(pk=job.pk)
+        self.assertEqual(stored, counters.recount([job.pk])[job.pk])
+        for field, value in expected.items():
+            self.assertEqual(stored[field], value, field)
+
+    def apply(self, student, job):
+        self.client.force_authenticate(student)
+        response = self.client.post(f'/api/jobs/jobs/{job.pk}/apply/', APPLICATION, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['application_id']
+
+    def test_api_writes_keep_counters(self):
+        first, second, third = (self.apply(student, self.job) for student in self.students)
+        self.apply(self.students[0], self.other_job)
+        self.assertCountersMatch(self.job, applications_total=3, applications_submitted=3)
+
+        self.client.force_authenticate(self.employer)
+        for application_id, new_status in ((second, 'under_review'), (second, 'hired'), (third, 'rejected')):
+            response = self.client.patch(
+                f'/api/jobs/applications/{application_id}/update_status/', {'status': new_status}, format='json',
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+        self.client.force_authenticate(self.students[2])
+        # Status is read-only here; only the cover letter changes
+        self.client.patch(f'/api/jobs/applications/{third}/', {'status': 'submitted'}, format='json')
+        self.client.patch(f'/api/jobs/applications/{third}/', {'cover_letter': 'Updated.'}, format='json')
+        self.assertCountersMatch(
+            self.job, applications_total=3, applications_submitted=1, applications_hired=1, applications_rejected=1,
+        )
+
+        self.client.force_authenticate(self.students[0])
+        self.client.delete(f'/api/jobs/applications/{first}/')
+        self.assertCountersMatch(self.job, applications_total=2, applications_submitted=0)
+        self.assertCountersMatch(self.other_job, applications_total=1, applications_submitted=1)
+
+    def test_job_save_leaves_counters_alone(self):
+        self.apply(self.students[0], self.job)
+        stale = Job.objects.get(pk=self.job.pk)
+        self.apply(self.students[1], self.job)
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertCountersMatch(self.job, applications_total=2)
+
+    def test_reconcile_fixes_drift(self):
+        JobApplication.objects.bulk_create(
+            JobApplication(job=self.job, applicant=student, status=status, **APPLICATION)
+            for student, status in zip(self.students, ['submitted', 'interviewed', 'interviewed'])
+        )
+        Job.objects.filter(pk=self.other_job.pk).update(applications_total=5, applications_rejected=5)
+
+        self.assertEqual(counters.reconcile(batch_size=1), (2, 2))
+        self.assertCountersMatch(self.job, applications_total=3, applications_interviewed=2)
+        self.assertCountersMatch(self.other_job, applications_total=0, applications_rejected=0)
+        self.assertEqual(counters.reconcile(), (2, 0))
+
+    def test_posted_lists_counts(self):
+        self.apply(self.students[0], self.job)
+        self.client.force_authenticate(self.employer)
+        response = self.client.get('/api/jobs/jobs/posted/')
+        self.assertEqual(response.json()['count'], 2)
+        counts = {job['id']: job['applications'] for job in response.json()['results']}
+        self.assertEqual(counts[self.job.pk]['total'], 1)
+        self.assertEqual(counts[self.job.pk]['submitted'], 1)
+        self.assertEqual(counts[self.other_job.pk]['total'], 0)
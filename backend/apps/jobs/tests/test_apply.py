@@ -0,0 +1,153 @@
+"""
+Applying to a job: duplicates and missing jobs come back as clean errors
+from the single insert, and ``Idempotency-Key`` retries replay the first
+response instead of applying again. Batch apply reports each job.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job, JobApplication
+from apps.jobs.views import JobApplicationViewSet
+
+User = get_user_model()
+
+APPLICATION = {
+    'cover_letter': 'I love working outdoors.',
+    'why_interested': 'Close to home.',
+    'relevant_experience': 'Two summers of yard work.',
+    'availability': ['Weekends'],
+}
+
+
+class ApplyTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.student = User.objects.create(username='student@example.com', email='student@example.com')
+        Job.objects.bulk_create(make_jobs(3, cls.employer))
+        cls.job, cls.closed_job, cls.other_job = Job.objects.order_by('id')
+        Job.objects.filter(pk=cls.closed_job.pk).update(is_active=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def apply(self, job_id, data=APPLICATION, **headers):
+        return self.client.post(f'/api/jobs/jobs/{job_id}/apply/', data, format='json', headers=headers)
+
+    def test_duplicate_is_a_conflict(self):
+        self.assertEqual(self.apply(self.job.pk).status_code, 201)
+        response = self.apply(self.job.pk)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {'error': 'You have already applied to this job.'})
+        self.assertEqual(JobApplication.objects.count(), 1)
+        self.assertEqual(Job.objects.get(pk=self.job.pk).applications_total, 1)
+
+    def test_missing_or_inactive_job(self):
+        for job_id in (self.closed_job.pk, 0, 'abc'):
+            with self.subTest(job_id=job_id):
+                self.assertEqual(self.apply(job_id).status_code, 404)
+        self.assertFalse(JobApplication.objects.exists())
+        self.assertEqual(Job.objects.get(pk=self.closed_job.pk).applications_total, 0)
+
+    def test_invalid_application(self):
+        response = self.apply(self.job.pk, {**APPLICATION, 'cover_letter': ''})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cover_letter', response.json())
+
+    def test_idempotency_key_replays_the_first_response(self):
+        first = self.apply(self.job.pk, **{'Idempotency-Key': 'retry-1'})
+        retry = self.apply(self.job.pk, **{'Idempotency-Key': 'retry-1'})
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(JobApplication.objects.count(), 1)
+        # A new key is a new request
+        self.assertEqual(self.apply(self.job.pk, **{'Idempotency-Key': 'retry-2'}).status_code, 409)
+
+    def test_idempotency_key_reused_with_another_body(self):
+        headers = {'Idempotency-Key': 'reused'}
+        self.assertEqual(self.apply(self.job.pk, **headers).status_code, 201)
+        response = self.apply(self.job.pk, {**APPLICATION, 'cover_letter': 'Something else.'}, **headers)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            response.json(), {'error': 'This Idempotency-Key was already used with a different request body.'},
+        )
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+        self.assertEqual(JobApplication.objects.get().cover_letter, APPLICATION['cover_letter'])
+
+    def test_failed_requests_are_not_saved(self):
+        headers = {'Idempotency-Key': 'fix-and-retry'}
+        self.assertEqual(self.apply(self.job.pk, {**APPLICATION, 'cover_letter': ''}, **headers).status_code, 400)
+        self.assertEqual(self.apply(self.job.pk, **headers).status_code, 201)
+
+    def test_batch(self):
+        self.apply(self.job.pk)
+        job_ids = [self.job.pk, self.other_job.pk, self.closed_job.pk, 999, self.other_job.pk]
+        response = self.client.post('/api/jobs/applications/batch/', {'jobs': job_ids, **APPLICATION}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(body['applied'], 1)
+        self.assertEqual([(result['job'], result['result']) for result in body['results']], [
+            (self.job.pk, 'already_applied'),
+            (self.other_job.pk, 'applied'),
+            (self.closed_job.pk, 'not_found'),
+            (999, 'not_found'),
+        ])
+        application = JobApplication.objects.get(pk=body['results'][1]['application_id'])
+        self.assertEqual((application.job_id, application.applicant, application.cover_letter),
+                         (self.other_job.pk, self.student, APPLICATION['cover_letter']))
+        self.assertEqual(Job.objects.get(pk=self.other_job.pk).applications_submitted, 1)
+
+    def test_batch_validates_the_body_once(self):
+        for body in ({'jobs': [], **APPLICATION}, {'jobs': [self.job.pk], **APPLICATION, 'cover_letter': ''}):
+            with self.subTest(body=body):
+                response = self.client.post('/api/jobs/applications/batch/', body, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(JobApplication.objects.exists())
+
+    def race(self, times):
+        """
+        Patch ``apply_to_each`` so its first ``times`` calls lose a race: another
+        request applies to the next job after the check (while there is one),
+        and the insert fails.
+        """
+        apply_to_each = JobApplicationViewSet.apply_to_each
+        calls = []
+
+        def racing(view, job_ids, application):
+            calls.append(job_ids)
+            if len(calls) <= times:
+                if len(calls) <= len(job_ids):
+                    JobApplication.objects.create(job_id=job_ids[len(calls) - 1], applicant=self.student, **APPLICATION)
+                raise IntegrityError('UNIQUE constraint failed')
+            return apply_to_each(view, job_ids, application)
+        patcher = mock.patch.object(JobApplicationViewSet, 'apply_to_each', autospec=True, side_effect=racing)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+    def test_batch_loses_repeated_races(self):
+        calls = self.race(2)
+        job_ids = [self.job.pk, self.other_job.pk]
+        response = self.client.post('/api/jobs/applications/batch/', {'jobs': job_ids, **APPLICATION}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(response.json()['applied'], 0)
+        self.assertEqual([result['result'] for result in response.json()['results']], ['already_applied'] * 2)
+
+    def test_batch_gives_up_with_a_conflict(self):
+        calls = self.race(99)
+        response = self.client.post('/api/jobs/applications/batch/', {'jobs': [self.job.pk], **APPLICATION}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {'error': 'You have already applied to one of these jobs.'})
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,159 @@
+"""
+Bulk and single status transitions: only the employer's own applications
+move, only along ``JobApplication.STATUS_TRANSITIONS``, the counters
+follow, and every moved application queues an
+``application_status_changed``.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs import counters
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import APPLICATION_COUNTER_FIELDS, Job, JobApplication
+from apps.jobs.signals import application_status_changed
+from apps.outbox.worker import Worker
+
+User = get_user_model()
+
+APPLICATION = {
+    'cover_letter': 'I love working outdoors.',
+    'why_interested': 'Close to home.',
+    'relevant_experience': 'Two summers of yard work.',
+    'availability': ['Weekends'],
+}
+URL = '/api/jobs/applications/bulk-status/'
+
+
+class BulkStatusTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.other_employer = User.objects.create(username='other@example.com', email='other@example.com')
+        Job.objects.bulk_create(make_jobs(2, cls.employer) + make_jobs(1, cls.other_employer, seed=1))
+        cls.job, cls.second_job, cls.other_job = Job.objects.order_by('id')
+        students = [
+            User.objects.create(username=f'student{number}@example.com', email=f'student{number}@example.com')
+            for number in range(4)
+        ]
+        statuses = ['submitted', 'under_review', 'hired', 'submitted']
+        JobApplication.objects.bulk_create(
+            [JobApplication(job=cls.job, applicant=student, status=status, **APPLICATION)
+             for student, status in zip(students, statuses)]
+            + [JobApplication(job=cls.second_job, applicant=students[0], **APPLICATION),
+               JobApplication(job=cls.other_job, applicant=students[0], **APPLICATION)]
+        )
+        counters.reconcile()
+        cls.applications = list(JobApplication.objects.order_by('id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+        self.events = []
+        application_status_changed.connect(self.record_event)
+        self.addCleanup(application_status_changed.disconnect, self.record_event)
+
+    def record_event(self, sender, **event):
+        self.events.append((event['application_id'], event['old_status'], event['new_status']))
+
+    def bulk_status(self, body):
+        response = self.client.post(URL, body, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        Worker().run_once()
+        return response.json()
+
+    def assertCountersMatch(self):
+        for job in (self.job, self.second_job, self.other_job):
+            stored = Job.objects.values(*APPLICATION_COUNTER_FIELDS).get(pk=job.pk)
+            self.assertEqual(stored, counters.recount([job.pk])[job.pk])
+
+    def test_ids(self):
+        first, second, hired, fourth, on_second_job, not_mine = self.applications
+        body = self.bulk_status({'status': 'rejected', 'ids': [first, hired, on_second_job, not_mine, 999]})
+        self.assertEqual(body['updated'], [first, on_second_job])
+        self.assertEqual(body['skipped'], [{'id': hired, 'status': 'hired'}])
+        self.assertEqual(body['not_found'], [not_mine, 999])
+        self.assertEqual(
+            dict(JobApplication.objects.values_list('id', 'status')),
+            {first: 'rejected', second: 'under_review', hired: 'hired', fourth: 'submitted',
+             on_second_job: 'rejected', not_mine: 'submitted'},
+        )
+        self.assertEqual(self.events, [(first, 'submitted', 'rejected'), (on_second_job, 'submitted', 'rejected')])
+        self.assertCountersMatch()
+
+    def test_filter(self):
+        first, second, hired, fourth = self.applications[:4]
+        body = self.bulk_status({'status': 'interview_scheduled', 'filter': {'job': self.job.pk}})
+        self.assertEqual(body['updated'], [first, second, fourth])
+        self.assertEqual(body['skipped'], [{'id': hired, 'status': 'hired'}])
+        self.assertNotIn('not_found', body)
+        self.assertEqual(len(self.events), 3)
+        self.assertCountersMatch()
+
+        body = self.bulk_status({'status': 'interviewed', 'filter': {'status': 'interview_scheduled'}})
+        self.assertEqual(body['updated'], [first, second, fourth])
+        self.assertEqual(Job.objects.get(pk=self.job.pk).applications_interviewed, 3)
+        self.assertCountersMatch()
+
+    def test_invalid(self):
+        for body in (
+            {'status': 'rejected'},
+            {'status': 'rejected', 'ids': [1], 'filter': {'job': 1}},
+            {'status': 'rejected', 'filter': {}},
+            {'status': 'archived', 'ids': [1]},
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.client.post(URL, body, format='json').status_code, 400)
+        self.assertFalse(JobApplication.objects.exclude(status__in=['submitted', 'under_review', 'hired']).exists())
+
+    def update_status(self, application_id, new_status):
+        response = self.client.patch(
+            f'/api/jobs/applications/{application_id}/update_status/', {'status': new_status}, format='json',
+        )
+        Worker().run_once()
+        return response
+
+    def test_update_status(self):
+        first, second, hired, fourth, on_second_job, not_mine = self.applications
+        self.assertEqual(self.update_status(second, 'hired').status_code, 200)
+        self.assertEqual(self.events, [(second, 'under_review', 'hired')])
+        self.assertCountersMatch()
+
+        response = self.update_status(hired, 'rejected')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Cannot move an application from hired to rejected.'})
+        self.assertEqual(self.update_status(first, 'interviewed').status_code, 400)
+        self.assertEqual(self.update_status(first, 'archived').status_code, 400)
+        # Not a move: nothing to send
+        self.assertEqual(self.update_status(fourth, 'submitted').status_code, 200)
+        # Another employer's posting
+        self.assertEqual(self.update_status(not_mine, 'rejected').status_code, 404)
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(
+            dict(JobApplication.objects.filter(pk__in=[first, hired, fourth, not_mine]).values_list('id', 'status')),
+            {first: 'submitted', hired: 'hired', fourth: 'submitted', not_mine: 'submitted'},
+        )
+
+    def test_applicants_cannot_update_status(self):
+        application = JobApplication.objects.select_related('applicant').get(pk=self.applications[0])
+        self.client.force_authenticate(application.applicant)
+        self.assertEqual(self.update_status(application.pk, 'hired').status_code, 404)
+        self.assertEqual(JobApplication.objects.get(pk=application.pk).status, 'submitted')
+
+    def test_applicants_cannot_patch_status(self):
+        application = JobApplication.objects.select_related('applicant').get(pk=self.applications[0])
+        self.client.force_authenticate(application.applicant)
+        response = self.client.patch(
+            f'/api/jobs/applications/{application.pk}/', {'status': 'hired', 'questions': 'When?'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        # The rest of the edit applies; the status is ignored
+        self.assertEqual(response.json()['status'], 'submitted')
+        application.refresh_from_db()
+        self.assertEqual((application.status, application.questions), ('submitted', 'When?'))
+        self.assertEqual(self.events, [])
+        self.assertCountersMatch()
+        # And the employer can still move it
+        self.client.force_authenticate(self.employer)
+        self.assertEqual(self.update_status(application.pk, 'rejected').status_code, 200)
@@ -0,0 +1,88 @@
+"""
+The featured/recent feed cache: a job write replaces the cache generation
+after commit, so the next request rebuilds and sees the change, while
+requests arriving during that rebuild are served the previous payload.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs import caching
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job
+
+User = get_user_model()
+
+
+class FeedCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        jobs = make_jobs(3, cls.employer)
+        for job in jobs:
+            job.featured = True
+        Job.objects.bulk_create(jobs)
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def feed(self, name='featured', **params):
+        response = self.client.get(f'/api/jobs/jobs/{name}/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [job['id'] for job in response.json()], response['X-Cache']
+
+    def save(self, job):
+        # The generation moves once the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+
+    def test_write_starts_a_new_generation(self):
+        ids, outcome = self.feed()
+        self.assertEqual((len(ids), outcome), (3, 'MISS'))
+        self.assertEqual(self.feed(), (ids, 'HIT'))
+
+        generation = caching.current_generation()
+        job = make_jobs(1, self.employer, seed=1)[0]
+        job.featured = True
+        self.save(job)
+        self.assertNotEqual(caching.current_generation(), generation)
+        self.assertEqual(self.feed(), ([job.pk, *ids], 'MISS'))
+        self.assertEqual(self.feed(), ([job.pk, *ids], 'HIT'))
+
+        job.is_active = False
+        self.save(job)
+        self.assertEqual(self.feed(), (ids, 'MISS'))
+
+        generation = caching.current_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.get(pk=ids[0]).delete()
+        self.assertNotEqual(caching.current_generation(), generation)
+        self.assertEqual(self.feed(), (ids[1:], 'MISS'))
+
+    def test_nothing_moves_before_commit(self):
+        self.feed()
+        generation = caching.current_generation()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Job.objects.first().save()
+            self.assertEqual(caching.current_generation(), generation)
+            self.assertEqual(self.feed()[1], 'HIT')
+        self.assertIn(caching.invalidate, callbacks)
+
+    def test_stale_while_rebuilding(self):
+        ids, _ = self.feed('recent')
+        caching.invalidate()
+        # Another request holds the rebuild lock
+        cache.add('jobs:payload:feed:recent:lock', 1)
+        self.assertEqual(self.feed('recent'), (ids, 'STALE'))
+        cache.delete('jobs:payload:feed:recent:lock')
+        self.assertEqual(self.feed('recent'), (ids, 'MISS'))
+        self.assertEqual(caching.stats(), {'hit': 0, 'miss': 2, 'stale': 1})
+
+    def test_views_cached_separately_and_other_params_bypass(self):
+        self.feed()
+        self.assertEqual(self.feed(view='card')[1], 'MISS')
+        self.assertEqual(self.feed(view='card')[1], 'HIT')
+        self.assertEqual(self.feed(fields='id')[1], 'BYPASS')
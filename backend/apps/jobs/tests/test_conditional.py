@@ -0,0 +1,76 @@
+"""
+Conditional GET on the job lists: a repeat request gets a 304 until the
+list changes or the relative ages in the body ("5 minutes ago") move on.
+"""
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job
+
+User = get_user_model()
+
+NOW = 1_800_000_000.0
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        Job.objects.bulk_create(make_jobs(3, cls.employer))
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, url, etag=None, now=NOW):
+        with mock.patch('apps.jobs.conditional.time.time', return_value=now):
+            return self.client.get(url, headers={'If-None-Match': etag} if etag else {})
+
+    def test_revalidation(self):
+        for url in ('/api/jobs/jobs/', '/api/jobs/jobs/recent/'):
+            with self.subTest(url=url):
+                etag = self.get(url)['ETag']
+                self.assertEqual(self.get(url, etag).status_code, 304)
+                # Within the same window the ages have not moved
+                self.assertEqual(self.get(url, etag, NOW + 1).status_code, 304)
+
+                later = self.get(url, etag, NOW + settings.JOB_FEED_CACHE_TIMEOUT)
+                self.assertEqual(later.status_code, 200)
+                self.assertNotEqual(later['ETag'], etag)
+
+    def test_changed_list(self):
+        etag = self.get('/api/jobs/jobs/')['ETag']
+        job = Job.objects.first()
+        job.title = 'Renamed'
+        job.save()
+        self.assertEqual(self.get('/api/jobs/jobs/', etag).status_code, 200)
+
+    def test_cursor_page(self):
+        url = '/api/jobs/jobs/?cursor='
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        # The page's own rows make the validator; the list is never counted
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get(url, etag).status_code, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT(', queries[0]['sql'].upper())
+
+        job = Job.objects.first()
+        job.title = 'Renamed'
+        job.save()
+        self.assertEqual(self.get(url, etag).status_code, 200)
+        etag = self.get(url)['ETag']
+        Job.objects.filter(pk=job.pk).delete()
+        self.assertEqual(self.get(url, etag).status_code, 200)
@@ -0,0 +1,56 @@
+"""
+``generate_dataset`` at a tiny scale: rows keep their generated timestamps,
+the model fields' auto_now flags are never touched, and a seed loads only
+once.
+"""
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+
+from apps.jobs import dataset, recommend, similar
+from apps.jobs.models import Job, JobApplication, SimilarJob
+
+# One employer, 20 jobs, 20 students
+SCALE = 0.002
+
+
+class GenerateDatasetTests(TestCase):
+
+    def setUp(self):
+        # Each process keeps its own in-memory indexes; start from this test's data
+        recommend.index = recommend.JobIndex()
+        similar.attributes = similar.Attributes()
+
+    def assertAutoTimestamps(self):
+        self.assertTrue(Job._meta.get_field('posted_date').auto_now_add)
+        self.assertTrue(Job._meta.get_field('updated_at').auto_now)
+        self.assertTrue(JobApplication._meta.get_field('applied_date').auto_now_add)
+        self.assertTrue(JobApplication._meta.get_field('last_updated').auto_now)
+
+    def test_generate(self):
+        output = StringIO()
+        call_command('generate_dataset', scale=SCALE, seed=3, stdout=output)
+        self.assertIn('Generated', output.getvalue())
+        self.assertEqual(Job.objects.count(), 20)
+        self.assertTrue(JobApplication.objects.exists())
+        self.assertTrue(SimilarJob.objects.exists())
+        # Spread over the history rather than stamped with the run time
+        self.assertGreater(Job.objects.values('posted_date').distinct().count(), 1)
+        self.assertGreater(JobApplication.objects.values('applied_date').distinct().count(), 1)
+        self.assertFalse(JobApplication.objects.filter(last_updated__lt=F('applied_date')).exists())
+        self.assertFalse(JobApplication.objects.filter(applied_date__lt=F('job__posted_date')).exists())
+        self.assertAutoTimestamps()
+
+        with self.assertRaisesMessage(CommandError, 'A dataset with seed 3 is already loaded'):
+            call_command('generate_dataset', scale=SCALE, seed=3, stdout=StringIO())
+        self.assertEqual(Job.objects.count(), 20)
+
+    def test_other_errors_are_not_reported_as_a_loaded_seed(self):
+        with mock.patch.object(dataset.Dataset, '_applications', side_effect=ValueError('bad row')):
+            with self.assertRaisesMessage(ValueError, 'bad row'):
+                call_command('generate_dataset', scale=SCALE, seed=4, stdout=StringIO())
+        # Failed while writing applications
+        self.assertAutoTimestamps()
@@ -0,0 +1,79 @@
+"""
+Facet counts agree with the job list: the count next to each value is the
+list's count with that value picked and every other filter kept.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs import search, tagging
+from apps.jobs.benchmarks import LOCATIONS, make_jobs
+from apps.jobs.models import Job
+
+User = get_user_model()
+
+# Facet name -> list query parameter
+PARAMS = {'job_type': 'job_type', 'schedule': 'schedule', 'featured': 'featured',
+          'pay_range': 'pay_range', 'location': 'location'}
+FILTERS = [
+    {},
+    {'job_type': 'gig'},
+    {'job_type': 'part-time', 'schedule': 'flexible'},
+    {'location': LOCATIONS[0]},
+    {'pay_range': '15_20', 'featured': 'false'},
+    {'tags': 'Outdoors,Flexible', 'tag_match': 'any'},
+    {'tags': 'Outdoors', 'location': LOCATIONS[1], 'job_type': 'seasonal'},
+    {'search': 'lawn'},
+]
+
+
+class FacetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        jobs = make_jobs(80, employer, locations=LOCATIONS[:4])
+        for number, job in enumerate(jobs):
+            job.is_active = number % 7 != 0
+            job.featured = number % 3 == 0
+        Job.objects.bulk_create(jobs)
+        search.index_jobs(Job.objects.all())
+        tagging.sync_queryset(Job.objects.all())
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def get(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def listed(self, params):
+        return self.get('/api/jobs/jobs/', params)['count']
+
+    @staticmethod
+    def param(value):
+        return str(value).lower() if isinstance(value, bool) else value
+
+    def test_counts_match_the_list(self):
+        for filters in FILTERS:
+            with self.subTest(**filters):
+                data = self.get('/api/jobs/jobs/facets/', filters)
+                self.assertEqual(data['count'], self.listed(filters))
+                for facet, items in data['facets'].items():
+                    for item in items:
+                        picked = {**filters, PARAMS[facet]: self.param(item['value'])}
+                        self.assertEqual(item['count'], self.listed(picked), f'{facet}={item["value"]}')
+                # Every location with matches is listed
+                locations = {item['value'] for item in data['facets']['location']}
+                others = {name: value for name, value in filters.items() if name != 'location'}
+                for location in LOCATIONS[:4]:
+                    if location not in locations:
+                        self.assertEqual(self.listed({**others, 'location': location}), 0)
+
+    def test_inactive_jobs_not_counted(self):
+        data = self.get('/api/jobs/jobs/facets/', {})
+        self.assertEqual(data['count'], Job.objects.filter(is_active=True).count())
+        self.assertLess(data['count'], Job.objects.count())
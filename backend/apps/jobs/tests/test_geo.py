@@ -0,0 +1,86 @@
+"""
+Offline geocoding: jobs take their point from the gazetteer unless the
+caller supplied one, and ``load_gazetteer`` re-geocodes once per location.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.jobs import geo, recommend, similar
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job, Place
+
+User = get_user_model()
+
+TORONTO = (43.6532, -79.3832)
+SCARBOROUGH = (43.7764, -79.2318)
+
+
+class GeocodingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+
+    def setUp(self):
+        # Each process keeps its own in-memory indexes; start from this test's data
+        recommend.index = recommend.JobIndex()
+        similar.attributes = similar.Attributes()
+
+    def job(self, location, latitude=None, longitude=None):
+        job = make_jobs(1, self.employer)[0]
+        job.location, job.latitude, job.longitude = location, latitude, longitude
+        job.save()
+        return Job.objects.get(pk=job.pk)
+
+    def test_point_from_location(self):
+        job = self.job('Toronto,  ON')
+        self.assertEqual((job.latitude, job.longitude), TORONTO)
+        self.assertEqual(job.geo_row, geo.cell_for(*TORONTO)[0])
+
+    def test_supplied_point_is_kept(self):
+        job = self.job('Toronto, ON', 43.7, -79.4)
+        self.assertEqual((job.latitude, job.longitude), (43.7, -79.4))
+        job.title = 'Renamed'
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual((job.latitude, job.longitude), (43.7, -79.4))
+
+        job = Job.objects.get(pk=job.pk)
+        job.latitude, job.longitude = 43.8, -79.5
+        job.save()
+        self.assertEqual(Job.objects.values_list('latitude', 'longitude').get(pk=job.pk), (43.8, -79.5))
+
+    def test_moved_location_is_geocoded_again(self):
+        job = self.job('Toronto, ON')
+        job.location = 'Scarborough, ON'
+        job.save()
+        self.assertEqual(Job.objects.values_list('latitude', 'longitude').get(pk=job.pk), SCARBOROUGH)
+
+    def test_moved_to_unknown_location_loses_its_point(self):
+        job = self.job('Toronto, ON')
+        job.location = 'Nowhere Town, XX'
+        job.save()
+        job = Job.objects.get(pk=job.pk)
+        self.assertEqual((job.latitude, job.longitude, job.geo_row, job.geo_col), (None, None, None, None))
+        response = self.client.get('/api/jobs/jobs/', {'near': '%s,%s' % TORONTO, 'radius_km': 5})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_lookup_does_not_remember_misses(self):
+        self.assertIsNone(geo.lookup('Nowhere, ON'))
+        Place.objects.create(name='Nowhere', province='ON', key='nowhere, on', latitude=45.0, longitude=-80.0)
+        self.assertEqual(geo.lookup('Nowhere, ON'), (45.0, -80.0))
+
+    def test_load_gazetteer_counts_jobs_once(self):
+        jobs = make_jobs(12, self.employer)
+        for job in jobs:
+            job.location = 'Toronto, ON' if len(job.title) % 2 else 'Scarborough, ON'
+        Job.objects.bulk_create(jobs)
+        output = StringIO()
+        call_command('load_gazetteer', stdout=output)
+        self.assertIn('geocoded 12 jobs', output.getvalue())
+        points = set(Job.objects.values_list('location', 'latitude', 'longitude'))
+        self.assertLessEqual(points, {('Toronto, ON', *TORONTO), ('Scarborough, ON', *SCARBOROUGH)})
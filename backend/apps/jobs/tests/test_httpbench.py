@@ -0,0 +1,118 @@
+"""
+``bench_http``: a tiny run through the in-process WSGI and ASGI drivers,
+the summary it reports, and ``--compare`` on two saved results.
+"""
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from apps.jobs import httpbench
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job, JobApplication
+
+User = get_user_model()
+
+
+class SummaryTests(SimpleTestCase):
+
+    def test_percentile(self):
+        ordered = list(range(1, 101))
+        self.assertEqual(
+            [httpbench.percentile(ordered, fraction) for fraction in (0.5, 0.95, 0.99, 1.0)], [50, 95, 99, 100],
+        )
+        self.assertEqual(httpbench.percentile([7], 0.99), 7)
+        self.assertIsNone(httpbench.percentile([], 0.5))
+
+    def test_summarize(self):
+        samples = [(float(ms), 200, 2) for ms in range(1, 10)] + [(100.0, 404, 1)]
+        self.assertEqual(httpbench.summarize(samples, 2.0), {
+            'requests': 10,
+            'errors': 1,
+            'statuses': {'200': 9, '404': 1},
+            'seconds': 2.0,
+            'throughput_rps': 5.0,
+            'latency_ms': {'p50': 5.0, 'p95': 100.0, 'p99': 100.0, 'mean': 14.5, 'max': 100.0},
+            'queries_per_request': {'mean': 1.9, 'max': 2},
+        })
+
+    def test_shares(self):
+        self.assertEqual(httpbench._shares(10, 3), [4, 3, 3])
+        self.assertEqual(sum(httpbench._shares(5, 8)), 5)
+
+
+class RunTests(TransactionTestCase):
+    # The drivers' threads open their own connections, which only see committed rows
+
+    def setUp(self):
+        employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        Job.objects.bulk_create(make_jobs(6, employer))
+        job_ids = list(Job.objects.values_list('id', flat=True))
+        self.clients = [
+            httpbench.Client(User.objects.create(username=email, email=email), job_ids[number::2])
+            for number, email in enumerate(['one@example.com', 'two@example.com'])
+        ]
+
+    def run_scenario(self, runner, name, requests=4, warmup=2, clients=None):
+        with httpbench.counting_queries():
+            return runner(clients or self.clients, name, requests, warmup)
+
+    def assertSummary(self, stats, requests, status):
+        self.assertEqual(stats['requests'], requests)
+        self.assertEqual((stats['errors'], stats['statuses']), (0, {str(status): requests}))
+        latency = stats['latency_ms']
+        self.assertLessEqual(latency['p50'], latency['p95'])
+        self.assertLessEqual(latency['p95'], latency['p99'])
+        self.assertLessEqual(latency['p99'], latency['max'])
+        self.assertGreater(stats['throughput_rps'], 0)
+        self.assertGreater(stats['queries_per_request']['mean'], 0)
+
+    def test_wsgi(self):
+        self.assertSummary(self.run_scenario(httpbench.run_wsgi, 'job_list'), 4, 200)
+        # Each apply goes to a job the client has not applied to yet. One
+        # client: the shared in-memory test database locks concurrent writers
+        client = self.clients[0]
+        self.assertSummary(self.run_scenario(httpbench.run_wsgi, 'apply', 2, 1, [client]), 2, 201)
+        self.assertEqual(JobApplication.objects.filter(applicant__email=client.email).count(), 3)
+
+    def test_asgi(self):
+        self.assertSummary(self.run_scenario(httpbench.run_asgi, 'featured'), 4, 200)
+
+    def test_rotated_refresh_tokens_are_kept(self):
+        first = [client.refresh for client in self.clients]
+        self.assertSummary(self.run_scenario(httpbench.run_wsgi, 'refresh'), 4, 200)
+        self.assertTrue(all(client.refresh != token for client, token in zip(self.clients, first)))
+
+
+class CompareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def result(self, name, commit, p50, rps, queries):
+        stats = {
+            'latency_ms': {'p50': p50, 'p95': p50 * 2, 'p99': p50 * 3},
+            'throughput_rps': rps,
+            'queries_per_request': {'mean': queries},
+        }
+        path = self.directory / name
+        path.write_text(json.dumps({'meta': {'commit': commit}, 'results': {'wsgi': {'job_list': stats}}}))
+        return str(path)
+
+    def test_compare(self):
+        before = self.result('before.json', 'abc', 10.0, 100.0, 3.0)
+        after = self.result('after.json', 'def', 5.0, 200.0, 3.0)
+        output = StringIO()
+        call_command('bench_http', compare=[before, after], stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], 'before: abc  after: def')
+        rows = [line.split() for line in lines[2:]]
+        self.assertEqual(rows[0], ['wsgi', 'job_list', 'p50', '10.0', '5.0', '-50%'])
+        self.assertEqual(rows[3], ['wsgi', 'job_list', 'rps', '100.0', '200.0', '+100%'])
+        self.assertEqual(rows[4], ['wsgi', 'job_list', 'queries', '3.0', '3.0', '+0%'])
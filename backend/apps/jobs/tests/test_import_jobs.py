@@ -0,0 +1,136 @@
+"""
+``import_jobs``: CSV and JSON Lines feeds are upserted on
+``(source, external_id)``, bad rows are reported and skipped, and
+imported jobs come out searchable, tagged, geocoded and pay-bucketed.
+"""
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs import recommend, similar
+from apps.jobs.models import Job, JobVector
+from apps.jobs.signals import JOB_CHANGED
+from apps.outbox.models import Message
+from apps.outbox.worker import Worker
+
+User = get_user_model()
+
+TORONTO = (43.6532, -79.3832)
+SCARBOROUGH = (43.7764, -79.2318)
+
+CSV_FEED = '''external_id,title,company,location,hourly_rate_min,hourly_rate_max,job_type,schedule,description,requirements,tags
+A1,Lawn Mowing Helper,Green Co,"Toronto, ON",16.50,18.00,gig,flexible,Trim hedges in backyards.,"[""Must be 16+ years old""]",Outdoors|Garden
+A2,Cashier,Corner Store,"Toronto, ON",15.00,15.00,bogus,flexible,Run the register.,,Retail
+A3,Dog Walker,Paws,"Toronto, ON",15.00,16.00,gig,flexible,Walk dogs.,[not json,Pets
+A4,Tutor,Learn Inc,"Toronto, ON",20.00,18.00,part-time,evenings,Help with math.,,Education
+'''
+UPDATE = {
+    'external_id': 'A1', 'title': 'Snow Shovelling Helper', 'company': 'Green Co', 'location': 'Scarborough, ON',
+    'hourly_rate_min': '21.00', 'hourly_rate_max': '24.00', 'job_type': 'seasonal', 'schedule': 'weekends',
+    'description': 'Clear driveways after storms.', 'requirements': [], 'tags': ['Winter'],
+}
+
+
+class ImportJobsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='partner@example.com', email='partner@example.com')
+
+    def setUp(self):
+        self.client = APIClient()
+        # Each process keeps its own in-memory indexes; start from this test's data
+        recommend.index = recommend.JobIndex()
+        similar.attributes = similar.Attributes()
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def feed(self, name, text):
+        path = self.directory / name
+        path.write_text(text, encoding='utf-8')
+        return str(path)
+
+    def run_import(self, path, source='partner', **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_jobs', path, source=source, employer=self.employer.email,
+                     stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def listed(self, **params):
+        response = self.client.get('/api/jobs/jobs/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [job['id'] for job in response.json()['results']]
+
+    def test_csv(self):
+        out, err = self.run_import(self.feed('feed.csv', CSV_FEED))
+        self.assertIn('Imported 1 jobs (1 created, 0 updated), rejected 3 rows', out)
+        self.assertIn('line 3: {"job_type"', err)
+        self.assertIn('line 4: {"non_field_errors": ["requirements: not a JSON array', err)
+        self.assertIn('line 5: {"hourly_rate_max"', err)
+
+        job = Job.objects.get()
+        self.assertEqual((job.source, job.external_id, job.employer), ('partner', 'A1', self.employer))
+        self.assertEqual(job.requirements, ['Must be 16+ years old'])
+        self.assertEqual(job.tags, ['Outdoors', 'Garden'])
+        self.assertEqual(job.pay_bucket, Job.pay_bucket_for('16.50'))
+        self.assertEqual((job.latitude, job.longitude), TORONTO)
+        # Vectors are left to the worker, as for jobs saved on the site
+        self.assertEqual(list(Message.objects.values_list('topic', 'payload')), [(JOB_CHANGED, {'job_id': job.pk})])
+        self.assertFalse(JobVector.objects.exists())
+        while any(Worker().run_once()):
+            pass
+        self.assertTrue(JobVector.objects.filter(job=job).exists())
+        self.assertEqual(self.listed(tags='Garden'), [job.pk])
+        self.assertEqual(self.listed(search='hedges'), [job.pk])
+
+    def test_jsonl_upsert(self):
+        self.run_import(self.feed('feed.csv', CSV_FEED))
+        job = Job.objects.get()
+        lines = [json.dumps(UPDATE), '', '{"external_id": ', '[1, 2]', json.dumps({**UPDATE, 'external_id': 'B1'})]
+        out, err = self.run_import(self.feed('feed.jsonl', '\n'.join(lines) + '\n'), batch_size=2)
+        self.assertIn('Imported 2 jobs (1 created, 1 updated), rejected 2 rows', out)
+        self.assertIn('line 3: {"non_field_errors": ["Invalid JSON', err)
+        self.assertIn('line 4: {"non_field_errors": ["Expected a JSON object.', err)
+
+        self.assertEqual(Job.objects.count(), 2)
+        job.refresh_from_db()
+        self.assertEqual(job.title, 'Snow Shovelling Helper')
+        self.assertEqual(job.pay_bucket, Job.pay_bucket_for('21.00'))
+        self.assertEqual((job.latitude, job.longitude), SCARBOROUGH)
+        # The tag and search indexes follow the update
+        self.assertEqual(self.listed(tags='Garden'), [])
+        self.assertIn(job.pk, self.listed(tags='Winter'))
+        self.assertEqual(self.listed(search='hedges'), [])
+        self.assertIn(job.pk, self.listed(search='driveways'))
+
+        # External ids are only unique per source
+        self.run_import(self.feed('other.jsonl', json.dumps(UPDATE)), source='other')
+        self.assertEqual(Job.objects.filter(external_id='A1').count(), 2)
+
+    def test_site_only_fields_ignored(self):
+        row = {**UPDATE, 'featured': True, 'rating': '5.0', 'review_count': 999}
+        self.run_import(self.feed('feed.jsonl', json.dumps(row)))
+        job = Job.objects.get()
+        self.assertEqual((job.featured, job.review_count), (False, 0))
+        Job.objects.filter(pk=job.pk).update(featured=True, review_count=3)
+        # An update from the feed leaves the site's values alone
+        self.run_import(self.feed('feed.jsonl', json.dumps({**row, 'featured': False, 'review_count': 0})))
+        job.refresh_from_db()
+        self.assertEqual((job.featured, job.review_count), (True, 3))
+
+    def test_source_length(self):
+        path = self.feed('feed.jsonl', json.dumps(UPDATE))
+        for source in ('', 'x' * 51):
+            with self.subTest(length=len(source)):
+                with self.assertRaisesMessage(CommandError, '--source must be 1 to 50 characters long.'):
+                    self.run_import(path, source=source)
+        self.assertFalse(Job.objects.exists())
+        self.run_import(path, source='x' * 50)
+        self.assertEqual(Job.objects.get().source, 'x' * 50)
@@ -0,0 +1,119 @@
+"""
+Keyset (``?cursor=``) pagination on the job and application listings:
+every row is returned exactly once however the response is trimmed with
+``?fields=``, ``?omit=`` or ``?view=``, and whatever is inserted between
+pages. Orders other than newest first are refused.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job, JobApplication
+
+User = get_user_model()
+
+# More than one page of 20
+ROWS = 45
+APPLICATION = {
+    'cover_letter': 'I love working outdoors.',
+    'why_interested': 'Close to home.',
+    'relevant_experience': 'Two summers of yard work.',
+    'availability': ['Weekends'],
+}
+
+
+class CursorTestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def walk(self, url, params, between_pages=None):
+        """
+        Follow ``next`` links from the first cursor page, calling
+        ``between_pages`` before each; return the ids seen and the pages' fields.
+        """
+        ids, fields = [], set()
+        response = self.client.get(url, {**params, 'cursor': ''})
+        while True:
+            self.assertEqual(response.status_code, 200, response.content[:500])
+            body = response.json()
+            ids += [row['id'] for row in body['results']]
+            for row in body['results']:
+                fields.update(row)
+            if not body['next']:
+                return ids, fields
+            if between_pages:
+                between_pages()
+            response = self.client.get(body['next'])
+
+    def assertOrderingRefused(self, url, params):
+        response = self.client.get(url, {**params, 'cursor': ''})
+        self.assertEqual(response.status_code, 400, response.content[:500])
+        self.assertIn('cursor', response.json())
+
+
+class JobCursorTests(CursorTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        Job.objects.bulk_create(make_jobs(ROWS, cls.employer))
+        cls.expected = list(Job.objects.order_by('-posted_date', '-id').values_list('id', flat=True))
+
+    def test_cursor_with_fieldsets(self):
+        for params in ({'fields': 'id,title'}, {'omit': 'posted_date'}, {'view': 'card', 'omit': 'posted_date'},
+                       {'view': 'card'}):
+            with self.subTest(**params):
+                ids, fields = self.walk('/api/jobs/jobs/', params)
+                self.assertEqual(ids, self.expected)
+                if 'posted_date' in params.get('omit', '') or 'fields' in params:
+                    self.assertNotIn('posted_date', fields)
+
+    def test_inserts_between_pages(self):
+        seed = iter(range(1, 100))
+
+        def insert():
+            # Newer than every page read so far: belongs before them
+            Job.objects.bulk_create(make_jobs(3, self.employer, seed=next(seed)))
+        ids, _ = self.walk('/api/jobs/jobs/', {}, insert)
+        self.assertEqual(ids, self.expected)
+
+    def test_other_orderings_refused(self):
+        for params in ({'ordering': 'hourly_rate_min'}, {'ordering': 'posted_date'}, {'search': 'lawn'},
+                       {'near': '43.65,-79.38'}):
+            with self.subTest(**params):
+                self.assertOrderingRefused('/api/jobs/jobs/', params)
+        ids, _ = self.walk('/api/jobs/jobs/', {'ordering': '-posted_date'})
+        self.assertEqual(ids, self.expected)
+
+
+class ApplicationCursorTests(CursorTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.student = User.objects.create(username='student@example.com', email='student@example.com')
+        Job.objects.bulk_create(make_jobs(ROWS, cls.employer))
+        JobApplication.objects.bulk_create(
+            JobApplication(job=job, applicant=cls.student, **APPLICATION) for job in Job.objects.all()
+        )
+        cls.expected = list(JobApplication.objects.order_by('-applied_date', '-id').values_list('id', flat=True))
+
+    def test_cursor_with_fieldsets(self):
+        for user, url in ((self.student, '/api/jobs/applications/'),
+                          (self.employer, '/api/jobs/applications/received/')):
+            self.client.force_authenticate(user)
+            for params in ({'fields': 'id,status'}, {'omit': 'applied_date'}, {'view': 'compact', 'omit': 'applied_date'},
+                           {'view': 'card'}):
+                with self.subTest(url=url, **params):
+                    ids, fields = self.walk(url, params)
+                    self.assertEqual(ids, self.expected)
+                    if 'applied_date' in params.get('omit', '') or 'fields' in params:
+                        self.assertNotIn('applied_date', fields)
+
+    def test_other_orderings_refused(self):
+        self.client.force_authenticate(self.student)
+        self.assertOrderingRefused('/api/jobs/applications/', {'ordering': 'last_updated'})
+        self.client.force_authenticate(self.employer)
+        self.assertOrderingRefused('/api/jobs/applications/received/', {'ordering': 'applied_date'})
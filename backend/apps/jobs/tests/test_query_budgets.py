@@ -0,0 +1,319 @@
+"""
+Query budgets for every endpoint in apps/jobs/urls.py and apps/accounts/urls.py.
+
+Each endpoint is called twice. The first call is made with ``SIZES[0]``
+rows of the data it reads and the second with ``SIZES[1]``. Both calls
+must run the same number of queries, at most the endpoint's budget. The
+same count at both sizes is what rules out per-row (N+1) queries. Both
+sizes fit on one page, so the larger page really renders more rows.
+"""
+import itertools
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.jobs import recommend, similar
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job, JobApplication
+from apps.outbox.worker import Worker
+from apps.resume.models import Resume, Skill
+
+User = get_user_model()
+
+SIZES = (3, 15)
+APPLICATION = {
+    'cover_letter': 'I love working outdoors.',
+    'why_interested': 'Close to home.',
+    'relevant_experience': 'Two summers of yard work.',
+    'availability': ['Weekends'],
+}
+
+
+class QueryBudgetTestCase(TestCase):
+
+    def assertQueryBudget(self, budget, request, grow):
+        """
+        Call ``grow(size)`` and then ``request()`` for each of ``SIZES`` and
+        check that every call runs the same number of queries, at most ``budget``.
+        """
+        counts = []
+        for size in SIZES:
+            grow(size)
+            # Feeds and facets are cached; count the queries that build them
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                response = request()
+            self.assertLess(response.status_code, 400, response.content[:500])
+            counts.append(len(ctx.captured_queries))
+        queries = '\n'.join(query['sql'] for query in ctx.captured_queries)
+        self.assertEqual(counts[0], counts[1], f'query count grows with rows {SIZES}: {counts}\n{queries}')
+        self.assertLessEqual(counts[-1], budget, f'{counts[-1]} queries, budget {budget}\n{queries}')
+
+
+class JobEndpointBudgetTests(QueryBudgetTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.student = User.objects.create(username='student@example.com', email='student@example.com')
+        resume = Resume.objects.create(user=cls.student)
+        Skill.objects.create(resume=resume, name='Lawn care and gardening')
+        cls.admin = User.objects.create(username='admin@example.com', email='admin@example.com', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.seed = itertools.count()
+        # Each process keeps its own in-memory indexes; start from this test's data
+        recommend.index = recommend.JobIndex()
+        similar.attributes = similar.Attributes()
+
+    def add_jobs(self, size):
+        """Save jobs one by one, as the API would, until there are ``size`` active jobs."""
+        missing = size - Job.objects.filter(is_active=True).count()
+        if missing <= 0:
+            return
+        for job in make_jobs(missing, self.employer, seed=next(self.seed)):
+            # Every job matches every filter the tests use, so pages fill up
+            job.title = 'Lawn Mowing & Yard Work'
+            job.featured = True
+            job.job_type, job.schedule = 'gig', 'flexible'
+            job.hourly_rate_min = job.hourly_rate_max = Decimal('17.50')
+            job.tags = ['Outdoors', 'Garden']
+            job.requirements = ['Must be 16+ years old']
+            job.save()
+        # Index the new jobs for recommended and similar
+        while any(Worker().run_once()):
+            pass
+
+    def assertJobsBudget(self, budget, url, params=None, user=None):
+        self.client.force_authenticate(user)
+        self.assertQueryBudget(budget, lambda: self.client.get(url, params or {}), self.add_jobs)
+
+    def test_list(self):
+        self.assertJobsBudget(3, '/api/jobs/jobs/')
+
+    def test_list_filtered(self):
+        params = {'job_type': 'gig', 'schedule': 'flexible', 'pay_range': '15_20', 'ordering': '-rating'}
+        self.assertJobsBudget(3, '/api/jobs/jobs/', params)
+
+    def test_list_tags(self):
+        self.assertJobsBudget(3, '/api/jobs/jobs/', {'tags': 'Outdoors', 'requirements': 'Must be 16+ years old'})
+
+    def test_list_search(self):
+        self.assertJobsBudget(3, '/api/jobs/jobs/', {'search': 'lawn'})
+
+    def test_list_near(self):
+        self.assertJobsBudget(3, '/api/jobs/jobs/', {'near': '43.6532,-79.3832', 'radius_km': 50})
+
+    def test_list_cursor(self):
+        self.assertJobsBudget(2, '/api/jobs/jobs/', {'cursor': ''})
+
+    def test_list_card_view(self):
+        self.assertJobsBudget(3, '/api/jobs/jobs/', {'view': 'card'})
+
+    def test_retrieve(self):
+        self.add_jobs(1)
+        job_id = Job.objects.values_list('id', flat=True).first()
+        self.assertJobsBudget(1, f'/api/jobs/jobs/{job_id}/')
+
+    def test_featured(self):
+        self.assertJobsBudget(2, '/api/jobs/jobs/featured/')
+
+    def test_recent(self):
+        self.assertJobsBudget(2, '/api/jobs/jobs/recent/')
+
+    def test_facets(self):
+        self.assertJobsBudget(1, '/api/jobs/jobs/facets/')
+
+    def test_pay_histogram(self):
+        self.assertJobsBudget(2, '/api/jobs/jobs/pay-histogram/')
+
+    def test_recommended(self):
+        self.assertJobsBudget(8, '/api/jobs/jobs/recommended/', user=self.student)
+
+    def test_similar(self):
+        self.add_jobs(1)
+        job_id = Job.objects.order_by('id').values_list('id', flat=True).first()
+        self.assertJobsBudget(1, f'/api/jobs/jobs/{job_id}/similar/')
+
+    def test_posted(self):
+        self.assertJobsBudget(1, '/api/jobs/jobs/posted/', user=self.employer)
+
+    def test_feed_stats(self):
+        self.assertJobsBudget(0, '/api/jobs/jobs/feed-stats/', user=self.admin)
+
+    def test_apply(self):
+        # The insert, the counter update and the outbox message, plus the
+        # SAVEPOINT/RELEASE of their transaction (TestCase already holds one open)
+        self.client.force_authenticate(self.student)
+        self.add_jobs(SIZES[-1] + len(SIZES))
+        jobs = iter(Job.objects.values_list('id', flat=True))
+        self.assertQueryBudget(
+            5,
+            lambda: self.client.post(f'/api/jobs/jobs/{next(jobs)}/apply/', APPLICATION, format='json'),
+            lambda size: JobApplication.objects.bulk_create(
+                JobApplication(job_id=next(jobs), applicant=self.student, **APPLICATION)
+                for _ in range(size - self.student.job_applications.count())
+            ),
+        )
+
+
+class ApplicationEndpointBudgetTests(QueryBudgetTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.student = User.objects.create(
+            username='student@example.com', email='student@example.com', first_name='Sam', last_name='Lee',
+        )
+        Job.objects.bulk_create(make_jobs(SIZES[-1], cls.employer))
+        cls.jobs = list(Job.objects.order_by('id'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def add_applications(self, size):
+        applied = set(self.student.job_applications.values_list('job_id', flat=True))
+        JobApplication.objects.bulk_create(
+            JobApplication(job=job, applicant=self.student, **APPLICATION)
+            for job in self.jobs[:size] if job.pk not in applied
+        )
+
+    def assertApplicationsBudget(self, budget, method, url=None, data=None, action=''):
+        def grow(size):
+            self.add_applications(size)
+            application_id = self.student.job_applications.order_by('id').values_list('id', flat=True).first()
+            # Status changes only update the job's counters when there is a change
+            JobApplication.objects.filter(pk=application_id).update(status='submitted')
+            self.url = url or f'/api/jobs/applications/{application_id}/{action}'
+        self.assertQueryBudget(budget, lambda: getattr(self.client, method)(self.url, data, format='json'), grow)
+
+    def test_list(self):
+        self.assertApplicationsBudget(3, 'get', '/api/jobs/applications/')
+
+    def test_list_filtered(self):
+        self.assertApplicationsBudget(3, 'get', '/api/jobs/applications/?status=submitted&ordering=last_updated')
+
+    def test_list_cursor(self):
+        self.assertApplicationsBudget(2, 'get', '/api/jobs/applications/?cursor=')
+
+    def test_list_card_view(self):
+        self.assertApplicationsBudget(3, 'get', '/api/jobs/applications/?view=card')
+
+    def test_list_compact_view(self):
+        self.assertApplicationsBudget(3, 'get', '/api/jobs/applications/?view=compact')
+        job = self.client.get('/api/jobs/applications/?view=compact').json()['results'][0]['job']
+        self.assertEqual(list(job), ['id', 'title', 'company'])
+
+    def add_received(self, size):
+        """One application from a different student to each of the first ``size`` jobs."""
+        received = JobApplication.objects.filter(job__employer=self.employer).count()
+        for number in range(received, size):
+            email = f'applicant{number}@example.com'
+            applicant, _ = User.objects.get_or_create(username=email, email=email, first_name=f'Applicant {number}')
+            JobApplication.objects.create(job=self.jobs[number], applicant=applicant, **APPLICATION)
+
+    def test_received(self):
+        self.client.force_authenticate(self.employer)
+        for params in ({}, {'view': 'compact'}, {'status': 'submitted', 'ordering': 'last_updated'}):
+            with self.subTest(**params):
+                JobApplication.objects.all().delete()
+                self.assertQueryBudget(
+                    3, lambda: self.client.get('/api/jobs/applications/received/', params), self.add_received,
+                )
+        self.assertEqual(self.client.get('/api/jobs/applications/received/').json()['count'], SIZES[-1])
+
+    def test_received_cursor(self):
+        self.client.force_authenticate(self.employer)
+        self.assertQueryBudget(
+            2, lambda: self.client.get('/api/jobs/applications/received/', {'cursor': ''}), self.add_received,
+        )
+
+    def test_batch_apply(self):
+        def grow(size):
+            self.student.job_applications.all().delete()
+            self.batch = [job.pk for job in self.jobs[:size]]
+        # One check, one insert, one counter update, one outbox insert, and the savepoint pair
+        self.assertQueryBudget(6, lambda: self.client.post(
+            '/api/jobs/applications/batch/', {'jobs': self.batch, **APPLICATION}, format='json',
+        ), grow)
+        self.assertEqual(self.student.job_applications.count(), SIZES[-1])
+
+    def test_bulk_status(self):
+        self.client.force_authenticate(self.employer)
+        body = {'status': 'rejected', 'filter': {'status': 'submitted'}}
+        # One read, the application and counter UPDATEs, the outbox insert, and the savepoint pair
+        self.assertQueryBudget(6, lambda: self.client.post(
+            '/api/jobs/applications/bulk-status/', body, format='json',
+        ), self.add_received)
+
+    def test_retrieve_nests_the_full_job(self):
+        self.assertApplicationsBudget(1, 'get')
+
+    def test_retrieve_card_view(self):
+        self.assertApplicationsBudget(1, 'get', data={'view': 'card'})
+
+    def test_update(self):
+        self.assertApplicationsBudget(4, 'patch', data={'cover_letter': 'Updated.'})
+
+    def test_update_ignores_status(self):
+        # Status is read-only on the generic update; no counter or outbox writes
+        self.assertApplicationsBudget(4, 'patch', data={'status': 'under_review', 'cover_letter': 'Updated.'})
+        self.assertEqual(self.client.get(self.url).json()['status'], 'submitted')
+
+    def test_update_status(self):
+        # Employers move the applications to their postings
+        self.client.force_authenticate(self.employer)
+        self.assertApplicationsBudget(6, 'patch', data={'status': 'under_review'}, action='update_status/')
+
+    def test_destroy(self):
+        self.assertApplicationsBudget(5, 'delete')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AccountEndpointBudgetTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def add_users(self, size):
+        for number in range(User.objects.count(), size):
+            email = f'user{number}@example.com'
+            User.objects.create_user(username=email, email=email, password='pass-1234-word')
+
+    def test_register(self):
+        emails = (f'new{number}@example.com' for number in itertools.count())
+
+        def register():
+            email = next(emails)
+            return self.client.post('/api/accounts/register/', {
+                'email': email, 'password': 'pass-1234-word', 'password_confirm': 'pass-1234-word',
+            }, format='json')
+        self.assertQueryBudget(2, register, self.add_users)
+
+    def test_login(self):
+        self.assertQueryBudget(1, lambda: self.client.post('/api/accounts/login/', {
+            'email': 'user0@example.com', 'password': 'pass-1234-word',
+        }, format='json'), self.add_users)
+
+    def add_users_and_log_in(self, size):
+        self.add_users(size)
+        self.token = RefreshToken.for_user(User.objects.get(email='user0@example.com'))
+
+    def test_me(self):
+        def me():
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token.access_token}')
+            return self.client.get('/api/accounts/me/')
+        self.assertQueryBudget(1, me, self.add_users_and_log_in)
+
+    def test_token_refresh(self):
+        self.assertQueryBudget(1, lambda: self.client.post(
+            '/api/accounts/token/refresh/', {'refresh': str(self.token)}, format='json',
+        ), self.add_users_and_log_in)
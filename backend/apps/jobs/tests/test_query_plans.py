@@ -0,0 +1,166 @@
+"""
+Query-plan regression checks for the JobViewSet access paths.
+
+Every list query is captured while hitting the real endpoints, then run
+through SQLite's ``EXPLAIN QUERY PLAN``. A plain ``SCAN jobs_job`` is a
+full table scan and always fails. When the request filters on a column
+with its own index, walking an unrelated index end to end is just as bad,
+so those requests must ``SEARCH`` jobs_job.
+"""
+import itertools
+import re
+import unittest
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.jobs import recommend, similar
+from apps.jobs.benchmarks import create_jobs
+from apps.jobs.models import SimilarJob
+
+FILTERS = {
+    'job_type': 'gig',
+    'schedule': 'flexible',
+    'location': 'Toronto, ON',
+    'featured': 'true',
+    'pay_range': '15_20',
+    'tags': 'Outdoors',
+    'search': 'lawn',
+}
+ORDERINGS = [
+    None,
+    'posted_date', '-posted_date',
+    'hourly_rate_min', '-hourly_rate_min',
+    'rating', '-rating',
+]
+# Filters expected to narrow the query through an index seek
+SELECTIVE = {'job_type', 'schedule', 'location', 'pay_range', 'tags', 'search'}
+FULL_SCAN = re.compile(r'^SCAN jobs_job$')
+INDEX_WALK = re.compile(r'^SCAN jobs_job USING (COVERING )?INDEX')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class JobQueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_jobs(60)
+
+    def setUp(self):
+        self.client = APIClient()
+        # The homepage feeds are cached; make sure their queries run
+        cache.clear()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def job_queries(self, url, params=None, validators=False):
+        """
+        The job SELECTs a request runs; the conditional GET validator query
+        comes first and is left out unless ``validators`` is set.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, response.content)
+        queries = [
+            query['sql'] for query in ctx.captured_queries
+            if query['sql'].startswith('SELECT') and '"jobs_job"' in query['sql']
+        ]
+        if response.has_header('ETag') and not validators:
+            queries = queries[1:]
+        return queries
+
+    def assertNoFullScan(self, url, params=None):
+        params = params or {}
+        selective = SELECTIVE & set(params)
+        queries = self.job_queries(url, params, validators=True)
+        self.assertTrue(queries, f'no job queries captured for {url} {params}')
+        for sql in queries:
+            plan = self.explain(sql)
+            scans = [
+                line for line in plan
+                if FULL_SCAN.match(line) or (selective and INDEX_WALK.match(line))
+            ]
+            self.assertFalse(scans, f'{url} {params} falls back to a full scan:\n{sql}\n{plan}')
+
+    def test_filter_and_ordering_combinations(self):
+        for size in range(len(FILTERS) + 1):
+            for names in itertools.combinations(FILTERS, size):
+                for ordering in ORDERINGS:
+                    params = {name: FILTERS[name] for name in names}
+                    if ordering:
+                        params['ordering'] = ordering
+                    with self.subTest(**params):
+                        self.assertNoFullScan('/api/jobs/jobs/', params)
+
+    def test_featured_feed(self):
+        queries = self.job_queries('/api/jobs/jobs/featured/')
+        self.assertIn('SCAN jobs_job USING INDEX job_active_featured_idx', self.explain(queries[0]))
+
+    def test_recent_feed(self):
+        self.assertNoFullScan('/api/jobs/jobs/recent/')
+
+    def test_pay_histogram_is_index_only(self):
+        queries = self.job_queries('/api/jobs/jobs/pay-histogram/')
+        self.assertEqual(len(queries), 2)
+        for sql in queries:
+            plan = self.explain(sql)
+            self.assertTrue(all('COVERING INDEX' in line for line in plan), f'{sql}\n{plan}')
+
+    def test_pay_range_count_is_index_only(self):
+        count_sql = self.job_queries('/api/jobs/jobs/', {'pay_range': '15_20'})[0]
+        self.assertEqual(
+            self.explain(count_sql),
+            ['SEARCH jobs_job USING COVERING INDEX job_active_pay_idx (pay_bucket=?)'],
+        )
+
+    def test_near_seeks_grid_cells_in_the_geo_index(self):
+        queries = self.job_queries('/api/jobs/jobs/', {'near': '43.6532,-79.3832', 'radius_km': 15})
+        self.assertEqual(
+            self.explain(queries[0]),
+            ['SEARCH jobs_job USING COVERING INDEX job_active_geo_idx (geo_row=? AND geo_col>? AND geo_col<?)'],
+        )
+        self.assertTrue(self.explain(queries[1])[0].startswith('SEARCH jobs_job USING INDEX job_active_geo_idx'))
+
+    def test_keyset_pages_seek_into_the_index(self):
+        first = self.client.get('/api/jobs/jobs/', {'cursor': ''}).json()
+        cursor = first['next'].split('cursor=')[1]
+        queries = self.job_queries('/api/jobs/jobs/', {'cursor': cursor})
+        plan = self.explain(queries[0])
+        self.assertTrue(
+            any(line.startswith('SEARCH jobs_job USING INDEX job_active_posted_idx') for line in plan),
+            plan,
+        )
+
+    def test_unchanged_list_is_not_modified_after_one_index_only_query(self):
+        etag = self.client.get('/api/jobs/jobs/')['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/jobs/jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(
+            self.explain(ctx.captured_queries[0]['sql']),
+            ['SCAN jobs_job USING COVERING INDEX job_active_updated_idx'],
+        )
+
+    def test_feed_validators_read_the_feed_index(self):
+        queries = self.job_queries('/api/jobs/jobs/featured/', validators=True)
+        self.assertIn('SCAN jobs_job USING INDEX job_active_featured_idx', self.explain(queries[0]))
+
+    def test_similar_jobs_are_one_seek_into_the_neighbour_table(self):
+        recommend.rebuild()
+        similar.rebuild()
+        job_id = SimilarJob.objects.values_list('job_id', flat=True).first()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/jobs/jobs/{job_id}/similar/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], similar.NEIGHBOURS)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        plan = self.explain(ctx.captured_queries[0]['sql'])
+        self.assertTrue(plan[0].startswith('SEARCH jobs_similarjob USING INDEX'), plan)
+        self.assertTrue(all(FULL_SCAN.match(line) is None for line in plan), plan)
@@ -0,0 +1,152 @@
+"""
+Recommendations and similar jobs are kept up by the outbox worker: saving
+a job queues the work, and once the worker has run the job is ranked
+against resumes and listed among its neighbours. Deleting or deactivating
+a job drops it from both.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs import recommend, similar
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import JobVector, SimilarJob, Term
+from apps.jobs.signals import JOB_CHANGED
+from apps.outbox.models import Message
+from apps.outbox.worker import Worker
+from apps.resume.models import Resume, Skill
+
+User = get_user_model()
+
+LAWN = {
+    'title': 'Lawn Mowing Helper',
+    'description': 'Mow lawns, trim hedges and rake leaves in backyard gardens.',
+    'tags': ['Outdoors', 'Garden'],
+}
+YARD = {
+    'title': 'Yard Work and Lawn Care',
+    'description': 'Mow lawns and weed gardens for neighbours on weekends.',
+    'tags': ['Outdoors', 'Garden'],
+}
+CASHIER = {
+    'title': 'Cashier',
+    'description': 'Run the register, greet customers and stock shelves at the store.',
+    'tags': ['Retail', 'Customer Service'],
+}
+
+
+class RecommendationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.student = User.objects.create(username='student@example.com', email='student@example.com')
+        resume = Resume.objects.create(user=cls.student)
+        Skill.objects.create(resume=resume, name='Lawn mowing and garden care')
+
+    def setUp(self):
+        self.client = APIClient()
+        # Each process keeps its own in-memory indexes; start from this test's data
+        recommend.index = recommend.JobIndex()
+        similar.attributes = similar.Attributes()
+        cache.delete(recommend.ACTIVE_JOBS_KEY)
+
+    def job(self, text, **fields):
+        job = make_jobs(1, self.employer)[0]
+        job.requirements = []
+        job.job_type, job.schedule = 'gig', 'flexible'
+        for field, value in {**text, **fields}.items():
+            setattr(job, field, value)
+        job.save()
+        return job
+
+    def drain(self):
+        while any(Worker().run_once()):
+            pass
+
+    def recommended(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/api/jobs/jobs/recommended/')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [job['id'] for job in response.json()['results']]
+
+    def neighbours(self, job):
+        response = self.client.get(f'/api/jobs/jobs/{job.pk}/similar/')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [other['id'] for other in response.json()['results']]
+
+    def test_save_queues_the_indexing(self):
+        job = self.job(LAWN)
+        # The save itself leaves the vector to the worker
+        self.assertFalse(JobVector.objects.exists())
+        self.assertEqual(list(Message.objects.values_list('topic', 'payload')), [(JOB_CHANGED, {'job_id': job.pk})])
+        self.assertEqual(self.recommended(), [])
+        self.drain()
+        self.assertTrue(JobVector.objects.filter(job=job).exists())
+        self.assertEqual(self.recommended(), [job.pk])
+
+    def test_ranked_by_resume_match(self):
+        cashier = self.job(CASHIER)
+        yard = self.job(YARD)
+        lawn = self.job(LAWN)
+        self.drain()
+        # The cashier job shares no terms with the resume
+        self.assertCountEqual(self.recommended(), [lawn.pk, yard.pk])
+
+        # Rewritten as exactly what the resume asks for
+        cashier.title = cashier.description = 'Lawn mowing and garden care'
+        cashier.tags = ['Garden']
+        cashier.save()
+        self.drain()
+        self.assertEqual(self.recommended()[0], cashier.pk)
+
+        lawn.is_active = False
+        lawn.save()
+        self.drain()
+        self.assertNotIn(lawn.pk, self.recommended())
+
+    def test_neighbours_after_save(self):
+        lawn = self.job(LAWN)
+        cashier = self.job(CASHIER, job_type='part-time', schedule='evenings')
+        self.drain()
+        self.assertNotIn(cashier.pk, self.neighbours(lawn))
+
+        # A new job is offered to the lists of the jobs it resembles
+        yard = self.job(YARD)
+        self.drain()
+        self.assertEqual(self.neighbours(lawn)[0], yard.pk)
+        self.assertEqual(self.neighbours(yard)[0], lawn.pk)
+
+        # Edited to look like the cashier job, it moves to that job's list
+        for field, value in {**CASHIER, 'job_type': 'part-time', 'schedule': 'evenings'}.items():
+            setattr(yard, field, value)
+        yard.save()
+        self.drain()
+        self.assertNotIn(yard.pk, self.neighbours(lawn))
+        self.assertEqual(self.neighbours(cashier)[0], yard.pk)
+
+        yard.is_active = False
+        yard.save()
+        self.drain()
+        self.assertFalse(SimilarJob.objects.filter(similar=yard).exists())
+        self.assertNotIn(yard.pk, self.neighbours(cashier))
+
+    def test_neighbours_and_terms_after_delete(self):
+        lawn = self.job(LAWN)
+        yard = self.job(YARD)
+        self.drain()
+        self.assertEqual(Term.objects.get(text='mow').job_count, 2)
+        self.assertEqual(self.neighbours(lawn), [yard.pk])
+
+        yard.delete()
+        self.assertEqual(Term.objects.get(text='mow').job_count, 1)
+        self.assertEqual(self.neighbours(lawn), [])
+        self.assertEqual(self.recommended(), [lawn.pk])
+
+    def test_deleted_before_the_worker_ran(self):
+        lawn = self.job(LAWN)
+        lawn.delete()
+        self.drain()
+        self.assertFalse(Message.objects.exists())
+        self.assertFalse(JobVector.objects.exists())
@@ -0,0 +1,84 @@
+"""
+``?search=`` over the FTS5 job index: results are ranked by relevance and
+the index follows jobs as they are saved and deleted.
+"""
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs import search
+from apps.jobs.benchmarks import make_jobs
+
+User = get_user_model()
+
+
+@unittest.skipUnless(search.is_supported(), 'FTS5 search needs SQLite')
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.lawn = cls.job('Lawn Mowing Helper', 'Mow the lawn, edge the lawn and bag the lawn clippings.')
+        cls.yard = cls.job('Yard Helper', 'Rake leaves, weed beds and sometimes mow a lawn.', company='Café Verde')
+        cls.cashier = cls.job('Cashier', 'Run the register and greet customers.')
+
+    @classmethod
+    def job(cls, title, description, **fields):
+        job = make_jobs(1, cls.employer)[0]
+        job.title, job.description, job.tags = title, description, ['Outdoors']
+        for field, value in fields.items():
+            setattr(job, field, value)
+        job.save()
+        return job
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def search(self, text, **params):
+        response = self.client.get('/api/jobs/jobs/', {'search': text, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [job['id'] for job in response.json()['results']]
+
+    def indexed(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {search.FTS_TABLE} ORDER BY rowid')
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_ranked_by_relevance(self):
+        self.assertEqual(self.search('lawn'), [self.lawn.pk, self.yard.pk])
+        # Prefixes, every word required, accents ignored
+        self.assertEqual(self.search('mow'), [self.lawn.pk, self.yard.pk])
+        self.assertEqual(self.search('rake lawn'), [self.yard.pk])
+        self.assertEqual(self.search('cafe'), [self.yard.pk])
+        self.assertEqual(self.search('lawn register'), [])
+        # An explicit ordering wins over relevance
+        self.assertEqual(self.search('lawn', ordering='posted_date'), [self.lawn.pk, self.yard.pk])
+        self.assertEqual(self.search('lawn', ordering='-posted_date'), [self.yard.pk, self.lawn.pk])
+
+    def test_build_match_query(self):
+        self.assertEqual(search.build_match_query('Lawn  "mow'), '"lawn"* "mow"*')
+        self.assertEqual(search.build_match_query(' -* '), '')
+        # Nothing to match: every job
+        self.assertEqual(len(self.search('"')), 3)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.indexed(), sorted([self.lawn.pk, self.yard.pk, self.cashier.pk]))
+
+        self.cashier.title = 'Snow Shovelling'
+        self.cashier.description = 'Clear driveways after storms.'
+        self.cashier.save()
+        self.assertEqual(self.search('driveways'), [self.cashier.pk])
+        self.assertEqual(self.search('register'), [])
+
+        job_id = self.lawn.pk
+        self.lawn.delete()
+        self.assertEqual(self.search('lawn'), [self.yard.pk])
+        self.assertNotIn(job_id, self.indexed())
+
+        # Inactive jobs stay indexed but are not listed
+        self.yard.is_active = False
+        self.yard.save()
+        self.assertEqual(self.search('lawn'), [])
@@ -0,0 +1,88 @@
+"""
+The list fast paths render ``.values()`` rows exactly as the model
+serializers render the instances, for every field set the API offers.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job, JobApplication
+from apps.jobs.serializers import (
+    APPLICATION_CARD_FIELDS, APPLICATION_COMPACT_FIELDS, JOB_CARD_FIELDS, JOB_COMPACT_FIELDS,
+    JobApplicationSerializer, JobSerializer, represent_application_rows, represent_job_rows,
+)
+
+User = get_user_model()
+
+NOW = timezone.now()
+JOB_FIELDSETS = {'full': None, 'card': JOB_CARD_FIELDS, 'compact': JOB_COMPACT_FIELDS}
+APPLICATION_FIELDSETS = {
+    'full': (None, None),
+    'card': (APPLICATION_CARD_FIELDS, JOB_CARD_FIELDS),
+    'compact': (APPLICATION_COMPACT_FIELDS, JOB_COMPACT_FIELDS),
+}
+
+
+@mock.patch('django.utils.timezone.now', return_value=NOW)
+class FastPathParityTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        jobs = make_jobs(4, cls.employer)
+        # Not geocoded
+        jobs[0].latitude = jobs[0].longitude = None
+        jobs[1].hourly_rate_min = jobs[1].hourly_rate_max = Decimal('17.5')
+        jobs[2].rating = Decimal('4')
+        Job.objects.bulk_create(jobs)
+        # Ages across the "posted N ago" wording
+        ages = [timedelta(minutes=5), timedelta(hours=3), timedelta(days=2), timedelta(days=40)]
+        for job_id, age in zip(Job.objects.order_by('id').values_list('id', flat=True), ages):
+            Job.objects.filter(pk=job_id).update(posted_date=NOW - age)
+
+        students = [
+            User.objects.create(username='student@example.com', email='student@example.com',
+                                first_name='Sam', last_name='Lee'),
+            # No name: shown by email
+            User.objects.create(username='anon@example.com', email='anon@example.com'),
+        ]
+        JobApplication.objects.bulk_create(
+            JobApplication(job=job, applicant=student, cover_letter='Hi.', why_interested='Close.',
+                           relevant_experience='Some.', availability=['Weekends'], questions='')
+            for job in Job.objects.all() for student in students
+        )
+
+    def test_job_rows(self, now):
+        jobs = Job.objects.order_by('id')
+        for name, fields in JOB_FIELDSETS.items():
+            with self.subTest(name):
+                expected = JobSerializer(list(jobs), many=True, fields=fields).data
+                rows = list(jobs.values(*JobSerializer.value_columns(fields)))
+                self.assertEqual(represent_job_rows(rows, fields), expected)
+                # And through the list serializer, as the views call it
+                self.assertEqual(JobSerializer(rows, many=True, fields=fields).data, expected)
+
+    def test_application_rows(self, now):
+        applications = JobApplication.objects.order_by('id')
+        for name, (fields, job_fields) in APPLICATION_FIELDSETS.items():
+            with self.subTest(name):
+                nested = {'job': job_fields} if job_fields else None
+                expected = JobApplicationSerializer(
+                    list(applications.select_related('job', 'applicant')), many=True, fields=fields, nested=nested,
+                ).data
+                columns = JobApplicationSerializer.value_columns(fields)
+                # Nested jobs loaded by a second query
+                rows = list(applications.values(*columns))
+                self.assertEqual(represent_application_rows(rows, fields, job_fields), expected)
+                # Nested jobs read through the join
+                joined = [f'job__{column}' for column in JobSerializer.value_columns(job_fields, extra=['id'])]
+                rows = list(applications.values(*columns, *joined))
+                self.assertEqual(represent_application_rows(rows, fields, job_fields), expected)
+                self.assertEqual(
+                    JobApplicationSerializer(rows, many=True, fields=fields, nested=nested).data, expected,
+                )
@@ -0,0 +1,74 @@
+"""
+``?tags=`` and ``?requirements=`` filters: every listed value by default,
+any of them with ``?tag_match=any``, answered from the ``JobTag`` index
+that follows each job's lists as it is saved.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import JobTag
+
+User = get_user_model()
+
+
+class TagFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        cls.garden = cls.job(['Outdoors', 'Garden'], ['Must be 16+ years old'])
+        cls.flexible = cls.job(['Outdoors', 'Flexible Hours'], [])
+        cls.retail = cls.job(['Retail'], ['Must be 16+ years old', 'Bilingual'])
+
+    @classmethod
+    def job(cls, tags, requirements):
+        job = make_jobs(1, cls.employer)[0]
+        job.tags, job.requirements = tags, requirements
+        job.save()
+        return job
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def listed(self, **params):
+        response = self.client.get('/api/jobs/jobs/', {'ordering': 'posted_date', **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [job['id'] for job in response.json()['results']]
+
+    def test_all_by_default(self):
+        self.assertEqual(self.listed(tags='Outdoors'), [self.garden.pk, self.flexible.pk])
+        self.assertEqual(self.listed(tags='Outdoors,Garden'), [self.garden.pk])
+        self.assertEqual(self.listed(tags='Garden,Retail'), [])
+        # Unknown values match nothing
+        self.assertEqual(self.listed(tags='Outdoors,Snow'), [])
+        # Case, spacing and repeats do not matter
+        self.assertEqual(self.listed(tags=' outdoors ,GARDEN,Garden'), [self.garden.pk])
+        self.assertEqual(self.listed(tags='flexible   hours'), [self.flexible.pk])
+
+    def test_any(self):
+        self.assertEqual(self.listed(tags='Garden,Retail', tag_match='any'), [self.garden.pk, self.retail.pk])
+        self.assertEqual(self.listed(tags='Snow,Retail', tag_match='any'), [self.retail.pk])
+        self.assertEqual(self.listed(tags='Snow', tag_match='any'), [])
+
+    def test_requirements(self):
+        self.assertEqual(self.listed(requirements='Must be 16+ years old'), [self.garden.pk, self.retail.pk])
+        self.assertEqual(self.listed(requirements='Must be 16+ years old,Bilingual'), [self.retail.pk])
+        # Tags and requirements are separate lists, and both must match
+        self.assertEqual(self.listed(tags='Bilingual'), [])
+        self.assertEqual(self.listed(tags='Outdoors', requirements='Must be 16+ years old'), [self.garden.pk])
+
+    def test_index_follows_saves(self):
+        self.garden.tags = ['Outdoors', 'Snow']
+        self.garden.save()
+        self.assertEqual(self.listed(tags='Garden'), [])
+        self.assertEqual(self.listed(tags='Snow,Outdoors'), [self.garden.pk])
+        self.assertEqual(
+            set(JobTag.objects.filter(job=self.garden).values_list('kind', 'tag__key')),
+            {('tag', 'outdoors'), ('tag', 'snow'), ('requirement', 'must be 16+ years old')},
+        )
+        job_id = self.garden.pk
+        self.garden.delete()
+        self.assertEqual(self.listed(tags='Snow'), [])
+        self.assertFalse(JobTag.objects.filter(job_id=job_id).exists())
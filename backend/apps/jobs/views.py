@@ -1,68 +1,121 @@
 from rest_framework import viewsets, status, filters
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from .models import Job, JobApplication
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from core.renderers import FastJSONRenderer
+from . import caching, conditional, counters, facets, fieldsets, idempotency, recommend, signals
+from .fieldsets import SparseFieldsetMixin
+from .filters import JobSearchFilter, JobOrderingFilter, JobTagFilter, JobNearFilter
+from .models import APPLICATION_COUNTER_FIELDS, Job, JobApplication
+from .pagination import JobPagination, ApplicationPagination
 from .serializers import (
     JobSerializer, 
     JobApplicationSerializer, 
-    JobApplicationCreateSerializer
+    JobApplicationCreateSerializer,
+    JobApplicationBatchSerializer,
+    ApplicationBulkStatusSerializer,
+    JOB_CARD_FIELDS,
+    JOB_COMPACT_FIELDS,
+    APPLICATION_CARD_FIELDS,
+    APPLICATION_COMPACT_FIELDS,
 )
 
-class JobViewSet(viewsets.ReadOnlyModelViewSet):
+def list_values(view, queryset):
+    """
+    ``ListModelMixin.list`` for a ``.values()`` queryset, which the list
+    serializers render without building model instances.
+    """
+    page = view.paginate_queryset(queryset)
+    if page is not None:
+        serializer = view.get_serializer(page, many=True)
+        return view.get_paginated_response(serializer.data)
+    
+    serializer = view.get_serializer(queryset, many=True)
+    return Response(serializer.data)
+
+def validated_rows(view, queryset):
+    """
+    The rows a list's ETag covers: just the page's for a ``?cursor=``
+    request, so revalidating a keyset page costs no more than reading it,
+    otherwise all of ``queryset``.
+    """
+    window = view.paginator.keyset_window(queryset, view.request)
+    return queryset if window is None else window
+
+class JobViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for job listings
     """
     queryset = Job.objects.filter(is_active=True)
     serializer_class = JobSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = JobPagination
+    filter_backends = [DjangoFilterBackend, JobTagFilter, JobSearchFilter, JobNearFilter, JobOrderingFilter]
     filterset_fields = ['job_type', 'schedule', 'location', 'featured']
     search_fields = ['title', 'company', 'description', 'tags']
     ordering_fields = ['posted_date', 'hourly_rate_min', 'rating']
     ordering = ['-posted_date']
+    field_views = {'card': JOB_CARD_FIELDS}
     
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self.action == 'retrieve' and self.get_only_columns() is not None:
+            queryset = queryset.only(*self.get_only_columns())
         
         # Filter by pay range if provided
         pay_range = self.request.query_params.get('pay_range', None)
-        if pay_range:
-            if pay_range == 'under_10':
-                queryset = queryset.filter(hourly_rate_min__lt=10)
-            elif pay_range == '10_15':
-                queryset = queryset.filter(hourly_rate_min__gte=10, hourly_rate_min__lte=15)
-            elif pay_range == '15_20':
-                queryset = queryset.filter(hourly_rate_min__gte=15, hourly_rate_min__lte=20)
-            elif pay_range == '20_plus':
-                queryset = queryset.filter(hourly_rate_min__gte=20)
+        if pay_range in dict(Job.PAY_BUCKET_CHOICES):
+            queryset = queryset.filter(pay_bucket=pay_range)
         
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Rows go to the serializer as .values() dicts (see JobListSerializer)
+        return conditional.respond(
+            request, validated_rows(self, queryset), ['updated_at'],
+            lambda: list_values(self, queryset.values(*self.get_value_columns())),
+        )
+    
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    @idempotency.idempotent
     def apply(self, request, pk=None):
         """
         Apply to a job
+        
+        No lookups up front: the insert, the job's counter update and the
+        outbox message are the whole request. The ``(job, applicant)`` unique constraint catches a
+        repeat application, and the counter update, which only matches an
+        active job, stands in for ``get_object()``.
         """
-        job = self.get_object()
+        try:
+            job_id = int(pk)
+        except ValueError:
+            raise Http404
         serializer = JobApplicationCreateSerializer(
             data=request.data,
             context={'request': request}
         )
         
         if serializer.is_valid():
-            # Check if user has already applied
-            if JobApplication.objects.filter(job=job, applicant=request.user).exists():
+            try:
+                with transaction.atomic():
+                    application = serializer.save(job_id=job_id)
+                    if not counters.added(job_id, application.status, jobs=self.queryset):
+                        raise Http404
+                    signals.submitted([application])
+            except IntegrityError:
                 return Response(
                     {'error': 'You have already applied to this job.'},
-                    status=status.HTTP_400_BAD_REQUEST
+                    status=status.HTTP_409_CONFLICT
                 )
             
-            # Create the application
-            application = serializer.save(job=job)
-            
             return Response({
                 'message': 'Application submitted successfully!',
                 'application_id': application.id
@@ -75,33 +128,264 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Get featured jobs
         """
-        featured_jobs = self.get_queryset().filter(featured=True)[:5]
-        serializer = self.get_serializer(featured_jobs, many=True)
-        return Response(serializer.data)
+        return self.cached_feed('featured', self.get_queryset().filter(featured=True), 5)
     
     @action(detail=False, methods=['get'])
     def recent(self, request):
         """
         Get recently posted jobs
         """
-        recent_jobs = self.get_queryset()[:10]
-        serializer = self.get_serializer(recent_jobs, many=True)
-        return Response(serializer.data)
+        return self.cached_feed('recent', self.get_queryset(), 10)
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Per-value job counts for every sidebar filter
+        """
+        queryset = self.queryset.all()
+        for backend in (JobTagFilter, JobSearchFilter, JobNearFilter):
+            queryset = backend().filter_queryset(request, queryset, self)
+        
+        filterset = DjangoFilterBackend().get_filterset(request, queryset, self)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        active = {
+            name: value for name, value in filterset.form.cleaned_data.items()
+            if value not in (None, '')
+        }
+        pay_range = request.query_params.get('pay_range')
+        if pay_range in dict(Job.PAY_BUCKET_CHOICES):
+            active['pay_range'] = pay_range
+        
+        params = facets.normalized_params(request.query_params, active)
+        data, outcome = caching.get_or_build(
+            facets.cache_key(params),
+            lambda: facets.compute(queryset, active),
+        )
+        response = Response(data)
+        response['X-Cache'] = outcome
+        return response
+    
+    @action(detail=False, methods=['get'], url_path='pay-histogram')
+    def pay_histogram(self, request):
+        """
+        Job counts per pay bucket and min/median/max hourly rate, honouring
+        every list filter except pay_range itself
+        """
+        queryset = self.filter_queryset(self.queryset.all())
+        return Response(facets.pay_histogram(queryset))
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def recommended(self, request):
+        """
+        Active jobs ranked by how well they match the user's resume,
+        skipping jobs already applied to
+        """
+        try:
+            limit = int(request.query_params.get('limit', recommend.DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= recommend.MAX_LIMIT:
+            raise ValidationError({'limit': [f'Must be a whole number from 1 to {recommend.MAX_LIMIT}.']})
+        
+        applied = JobApplication.objects.filter(applicant=request.user).values_list('job_id', flat=True)
+        # Ask for a margin: jobs deactivated since indexing drop out below
+        scored = recommend.recommend(request.user, limit * 2, exclude=set(applied))
+        scores = dict(scored)
+        rows = {
+            row['id']: row
+            for row in self.queryset.filter(id__in=scores).values(*self.get_value_columns())
+        }
+        ranked = [rows[job_id] for job_id, _ in scored if job_id in rows][:limit]
+        results = self.get_serializer(ranked, many=True).data
+        for job, row in zip(results, ranked):
+            job['score'] = round(scores[row['id']], 4)
+        return Response({'count': len(results), 'results': results})
+    
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        The active jobs most similar to this one, from the precomputed
+        neighbour table (see similar.py)
+        """
+        if not pk.isdigit():
+            raise Http404
+        rows = list(
+            self.queryset.filter(neighbour_of__job_id=pk)
+            .annotate(score=F('neighbour_of__score'))
+            .order_by('-score', 'id')
+            .values(*self.get_value_columns(), 'score')
+        )
+        if not rows and not self.queryset.filter(pk=pk).exists():
+            raise Http404
+        results = self.get_serializer(rows, many=True).data
+        for job, row in zip(results, rows):
+            job['score'] = round(row['score'], 4)
+        return Response({'count': len(results), 'results': results})
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def posted(self, request):
+        """
+        The current user's job postings, active or not, newest first, each
+        with its application counts per status
+        """
+        rows = list(
+            Job.objects.filter(employer=request.user)
+            .order_by('-posted_date', '-id')
+            .values(*self.get_value_columns(), *APPLICATION_COUNTER_FIELDS)
+        )
+        results = self.get_serializer(rows, many=True).data
+        for job, row in zip(results, rows):
+            job['applications'] = counters.as_dict(row)
+        return Response({'count': len(results), 'results': results})
+    
+    @action(detail=False, methods=['get'], url_path='feed-stats', permission_classes=[IsAdminUser])
+    def feed_stats(self, request):
+        """
+        Hit/miss counters for the cached homepage feeds
+        """
+        return Response(caching.stats())
+    
+    def cached_feed(self, name, queryset, limit):
+        """
+        Serve the first ``limit`` jobs of a homepage feed as pre-rendered
+        JSON from the feed cache, or a 304 when the client's copy is
+        current. Each ``?view=`` preset is cached separately; any other
+        query parameter (e.g. pay_range, fields) bypasses the cache.
+        """
+        def render():
+            serializer = self.get_serializer(queryset.values(*self.get_value_columns())[:limit], many=True)
+            return FastJSONRenderer().render(serializer.data)
+        
+        def respond():
+            params = self.request.query_params
+            if set(params) - {fieldsets.VIEW_PARAM}:
+                payload, outcome = render(), 'BYPASS'
+            else:
+                view = params.get(fieldsets.VIEW_PARAM, 'full')
+                key = f'feed:{name}' if view == 'full' else f'feed:{name}:{view}'
+                payload, outcome = caching.get_or_build(key, render)
+            response = HttpResponse(payload, content_type='application/json')
+            response['X-Cache'] = outcome
+            return response
+        
+        self.get_fieldset()  # reject an unknown view before touching the cache
+        return conditional.respond(self.request, queryset[:limit], ['updated_at'], respond)
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
+class JobApplicationViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for job applications
     """
     serializer_class = JobApplicationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ApplicationPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'job']
     ordering_fields = ['applied_date', 'last_updated']
     ordering = ['-applied_date']
+    field_views = {'card': APPLICATION_CARD_FIELDS, 'compact': APPLICATION_COMPACT_FIELDS}
+    nested_field_views = {'job': {'card': JOB_CARD_FIELDS, 'compact': JOB_COMPACT_FIELDS}}
     
     def get_queryset(self):
-        # Users can only see their own applications
-        return JobApplication.objects.filter(applicant=self.request.user)
+        if self.action in ('received', 'bulk_status', 'update_status'):
+            # Employers see the applications to the jobs they posted
+            queryset = JobApplication.objects.filter(job__employer=self.request.user)
+        else:
+            # Users can only see their own applications
+            queryset = JobApplication.objects.filter(applicant=self.request.user)
+        if self.action == 'retrieve':
+            columns = self.get_only_columns()
+            if columns is None:
+                return queryset.select_related('job', 'applicant')
+            # Only join what the requested fields read
+            related = {column.split('__')[0] for column in columns if '__' in column}
+            queryset = queryset.select_related(*related).only(*columns)
+        return queryset
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Nested jobs are part of the body, so their changes count too
+        return conditional.respond(
+            request, validated_rows(self, queryset), ['last_updated', 'job__updated_at'],
+            lambda: list_values(self, queryset.values(*self.get_value_columns())),
+            private=True,
+        )
+    
+    @action(detail=False, methods=['get'])
+    def received(self, request):
+        """
+        Applications to the current user's job postings, with the same
+        filters, views and pagination as the applicant's own list
+        """
+        return self.list(request)
+    
+    @action(detail=False, methods=['post'])
+    @idempotency.idempotent
+    def batch(self, request):
+        """
+        Apply to several jobs with one shared application body
+        
+        The body is validated once. Each job id gets a result: ``applied``
+        (with its ``application_id``), ``already_applied``, or ``not_found``
+        for a job that does not exist or is no longer active. Inserts that
+        keep colliding with concurrent applications end in a 409.
+        """
+        serializer = JobApplicationBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        application = dict(serializer.validated_data)
+        job_ids = list(dict.fromkeys(application.pop('jobs')))
+        # A concurrent request applied to one of the jobs (or one was
+        # deleted) after the check; the next check sees that job as taken.
+        # Each retry settles at least one more job, so this ends.
+        for _ in range(len(job_ids) + 1):
+            try:
+                results = self.apply_to_each(job_ids, application)
+                break
+            except IntegrityError:
+                continue
+        else:
+            return Response(
+                {'error': 'You have already applied to one of these jobs.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response({
+            'applied': sum(result['result'] == 'applied' for result in results),
+            'results': results,
+        })
+    
+    def apply_to_each(self, job_ids, application):
+        """Create ``application`` for each of ``job_ids`` still open to the user; one result per job."""
+        applicant = self.request.user
+        with transaction.atomic():
+            # {job_id: already applied} for the active jobs, in one query
+            open_jobs = dict(
+                Job.objects.filter(pk__in=job_ids, is_active=True)
+                .annotate(applied=Exists(JobApplication.objects.filter(job=OuterRef('pk'), applicant=applicant)))
+                .values_list('id', 'applied')
+            )
+            created = JobApplication.objects.bulk_create(
+                JobApplication(job_id=job_id, applicant=applicant, **application)
+                for job_id in job_ids if open_jobs.get(job_id) is False
+            )
+            if created:
+                counters.added_to_each([new.job_id for new in created], created[0].status)
+                signals.submitted(created)
+        
+        application_ids = {new.job_id: new.id for new in created}
+        results = []
+        for job_id in job_ids:
+            if job_id in application_ids:
+                results.append({'job': job_id, 'result': 'applied', 'application_id': application_ids[job_id]})
+            else:
+                results.append({'job': job_id, 'result': 'already_applied' if job_id in open_jobs else 'not_found'})
+        return results
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            counters.removed(instance.job_id, instance.status)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -112,6 +396,9 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
     def update_status(self, request, pk=None):
         """
         Update application status (for employers)
+        
+        Only applications to the user's own postings, and only along
+        ``JobApplication.STATUS_TRANSITIONS``, as with ``bulk_status``.
         """
         application = self.get_object()
         new_status = request.data.get('status')
@@ -122,10 +409,81 @@ class JobApplicationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        old_status = application.status
+        if new_status == old_status:
+            return Response({'message': 'Status unchanged', 'status': new_status})
+        if new_status not in JobApplication.STATUS_TRANSITIONS[old_status]:
+            return Response(
+                {'error': f'Cannot move an application from {old_status} to {new_status}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         application.status = new_status
-        application.save()
+        with transaction.atomic():
+            application.save()
+            counters.moved(application.job_id, old_status, new_status)
+            signals.status_changed(
+                [(application.pk, application.job_id, application.applicant_id, old_status)],
+                new_status, application.last_updated,
+            )
         
         return Response({
             'message': 'Status updated successfully',
             'status': new_status
-        }) 
\ No newline at end of file
+        })
+    
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """
+        Move many applications to one status (for employers)
+        
+        Takes the target ``status`` and either ``ids`` or a ``filter`` on
+        ``job`` and current ``status``, over applications to the user's own
+        postings. Applications whose current status does not allow the move
+        (see ``JobApplication.STATUS_TRANSITIONS``) are left alone and listed
+        under ``skipped``. The rest change in a single UPDATE, and each one
+        sends ``application_status_changed``.
+        """
+        serializer = ApplicationBulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        new_status = serializer.validated_data['status']
+        ids = serializer.validated_data.get('ids')
+        queryset = self.get_queryset()
+        if ids is not None:
+            ids = list(dict.fromkeys(ids))
+            queryset = queryset.filter(pk__in=ids)
+        else:
+            queryset = queryset.filter(**serializer.validated_data['filter'])
+        
+        changed_at = timezone.now()
+        with transaction.atomic():
+            rows = list(
+                queryset.select_for_update(of=('self',)).order_by('id')
+                .values_list('id', 'job_id', 'applicant_id', 'status')
+            )
+            moving = [row for row in rows if new_status in JobApplication.STATUS_TRANSITIONS[row[3]]]
+            if moving:
+                JobApplication.objects.filter(pk__in=[row[0] for row in moving]).update(
+                    status=new_status, last_updated=changed_at,
+                )
+                moves = {}
+                for _, job_id, _, old_status in moving:
+                    per_job = moves.setdefault(job_id, {})
+                    per_job[old_status] = per_job.get(old_status, 0) + 1
+                counters.moved_many(moves, new_status)
+                signals.status_changed(moving, new_status, changed_at)
+        
+        body = {
+            'status': new_status,
+            'updated': [row[0] for row in moving],
+            'skipped': [
+                {'id': row[0], 'status': row[3]}
+                for row in rows if new_status not in JobApplication.STATUS_TRANSITIONS[row[3]]
+            ],
+        }
+        if ids is not None:
+            found = {row[0] for row in rows}
+            body['not_found'] = [application_id for application_id in ids if application_id not in found]
+        return Response(body) 
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+The transactional outbox: side effects as rows written with the change.
+
+Code that changes data and needs work done because of it (notifications,
+mirrors, analytics) calls ``publish()`` inside the transaction that makes
+the change. The message commits or rolls back with that change, so no side
+effect is lost or runs for a change that never happened. The request pays
+one ``INSERT`` and the work itself runs later in ``run_worker``
+(worker.py), which calls the ``@handler`` registered for the topic.
+
+Delivery is at least once. A handler that fails is retried, and a worker
+that dies mid-batch leaves its messages to be picked up again after
+``OUTBOX_LEASE`` seconds. Handlers must therefore be idempotent. A
+handler's own database writes commit together with the message's removal,
+so those are applied once.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+from .models import Message
+
+HANDLERS = {}
+
+
+def handler(topic):
+    """Register the decorated function to handle ``topic`` messages; it is called with the payload."""
+    def register(func):
+        if topic in HANDLERS:
+            raise ImproperlyConfigured(f'Outbox topic {topic!r} already has a handler: {HANDLERS[topic]!r}')
+        HANDLERS[topic] = func
+        return func
+    return register
+
+
+def publish(topic, payload):
+    """Queue one ``topic`` message. Call it inside the transaction making the change."""
+    return Message.objects.create(topic=topic, payload=payload)
+
+
+def publish_many(topic, payloads):
+    """Queue one ``topic`` message per payload with a single ``INSERT``."""
+    return Message.objects.bulk_create(Message(topic=topic, payload=payload) for payload in payloads)
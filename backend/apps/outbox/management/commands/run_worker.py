@@ -0,0 +1,33 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.outbox.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Deliver outbox messages to their handlers until stopped (SIGINT/SIGTERM finish the current batch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=settings.OUTBOX_THREADS)
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--poll-interval', type=float, default=settings.OUTBOX_POLL_INTERVAL,
+                            help='Seconds to wait when nothing is due')
+        parser.add_argument('--once', action='store_true', help='Exit once nothing is due')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--threads and --batch-size must be positive.')
+        worker = Worker(
+            threads=options['threads'], batch_size=options['batch_size'], poll_interval=options['poll_interval'],
+        )
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+
+        started = time.perf_counter()
+        delivered, failed = worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Delivered {delivered} messages, {failed} failed, in {time.perf_counter() - started:.1f}s'
+        ))
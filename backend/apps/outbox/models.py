@@ -0,0 +1,30 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Message(models.Model):
+    """
+    A side effect waiting to run, written in the same transaction as the
+    change that caused it (see events.py). The worker deletes it once its
+    handler has succeeded; until then it stays here and is retried.
+    """
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Not picked up before this: set to a retry's backoff, or to the end
+    # of the lease while a worker holds the message
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        indexes = [
+            # The worker's claim query: the due messages, oldest first
+            models.Index(fields=['available_at', 'id'], name='outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.topic} #{self.pk} (attempt {self.attempts})"
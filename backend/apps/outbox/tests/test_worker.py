@@ -0,0 +1,127 @@
+"""
+The outbox: messages commit or roll back with the change that published
+them, and the worker delivers each at least once, retrying failures with
+backoff until ``OUTBOX_MAX_ATTEMPTS``.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.jobs.benchmarks import make_jobs
+from apps.jobs.models import Job
+from apps.jobs.signals import application_submitted
+from apps.outbox import events
+from apps.outbox.models import Message
+from apps.outbox.worker import Worker
+
+User = get_user_model()
+
+delivered = []
+
+
+@events.handler('tests.record')
+def record(payload):
+    delivered.append(payload)
+    # Handler writes commit with the message's removal
+    User.objects.create(username=payload['username'])
+
+
+@events.handler('tests.fail')
+def fail(payload):
+    User.objects.create(username=payload['username'])
+    raise RuntimeError('downstream is down')
+
+
+class WorkerTests(TestCase):
+
+    def setUp(self):
+        delivered.clear()
+
+    def test_message_rolls_back_with_the_change(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            events.publish('tests.record', {'username': 'lost'})
+            raise RuntimeError
+        self.assertFalse(Message.objects.exists())
+
+    def test_delivers_and_removes(self):
+        events.publish_many('tests.record', [{'username': 'first'}, {'username': 'second'}])
+        self.assertEqual(Worker().run_once(), (2, 0))
+        self.assertEqual([payload['username'] for payload in delivered], ['first', 'second'])
+        self.assertEqual(User.objects.filter(username__in=['first', 'second']).count(), 2)
+        self.assertFalse(Message.objects.exists())
+        self.assertEqual(Worker().run_once(), (0, 0))
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_retries_with_backoff_then_gives_up(self):
+        message = events.publish('tests.fail', {'username': 'failing'})
+        with self.assertLogs('apps.outbox', 'WARNING'):
+            self.assertEqual(Worker().run_once(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual(message.attempts, 1)
+        self.assertIn('downstream is down', message.last_error)
+        self.assertGreater(message.available_at, timezone.now())
+        # The handler's own writes rolled back
+        self.assertFalse(User.objects.filter(username='failing').exists())
+        # Not due yet
+        self.assertEqual(Worker().run_once(), (0, 0))
+
+        Message.objects.update(available_at=timezone.now())
+        with self.assertLogs('apps.outbox', 'ERROR'):
+            self.assertEqual(Worker().run_once(), (0, 1))
+        Message.objects.update(available_at=timezone.now())
+        self.assertEqual(Worker().run_once(), (0, 0))
+        self.assertEqual(Message.objects.get().attempts, 2)
+
+    def test_unknown_topic_fails(self):
+        events.publish('tests.nobody', {})
+        with self.assertLogs('apps.outbox', 'WARNING') as logs:
+            self.assertEqual(Worker().run_once(), (0, 1))
+        self.assertIn("No outbox handler for topic 'tests.nobody'", logs.output[0])
+
+    def test_expired_lease_is_claimed_again(self):
+        events.publish('tests.record', {'username': 'crashed'})
+        worker = Worker()
+        self.assertEqual(len(worker.claim()), 1)
+        # Claimed and then the worker died: hidden until the lease runs out
+        self.assertEqual(Worker().claim(), [])
+        Message.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(Worker().run_once(), (1, 0))
+        self.assertFalse(Message.objects.exists())
+
+    def test_run_once_drains_in_batches(self):
+        events.publish_many('tests.record', [{'username': f'user{number}'} for number in range(5)])
+        self.assertEqual(Worker(batch_size=2).run_once(), (2, 0))
+        self.assertEqual(Message.objects.count(), 3)
+
+
+class ApplicationEventTests(TestCase):
+
+    def test_apply_queues_submitted(self):
+        employer = User.objects.create(username='employer@example.com', email='employer@example.com')
+        student = User.objects.create(username='student@example.com', email='student@example.com')
+        Job.objects.bulk_create(make_jobs(1, employer))
+        job = Job.objects.get()
+        received = []
+
+        def receiver(sender, **event):
+            received.append(event)
+        application_submitted.connect(receiver)
+        self.addCleanup(application_submitted.disconnect, receiver)
+
+        client = APIClient()
+        client.force_authenticate(student)
+        response = client.post(f'/api/jobs/jobs/{job.pk}/apply/', {
+            'cover_letter': 'Hi.', 'why_interested': 'Close.', 'relevant_experience': 'Some.',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        # Nothing runs in the request; the worker sends it
+        self.assertEqual(received, [])
+        self.assertEqual(Worker().run_once(), (1, 0))
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['application_id'], response.json()['application_id'])
+        self.assertEqual((received[0]['job_id'], received[0]['applicant_id']), (job.pk, student.pk))
+        self.assertIsNotNone(received[0]['applied_date'].tzinfo)
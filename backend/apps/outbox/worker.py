@@ -0,0 +1,136 @@
+"""
+The outbox worker behind ``run_worker``.
+
+Each round claims up to ``batch_size`` due messages. The claim is one
+``UPDATE`` that stamps them with a per-round token, counts the attempt and
+pushes ``available_at`` out by ``OUTBOX_LEASE`` seconds, so other workers
+skip them while this one works. The messages then go to a thread pool. For
+each one, the handler and the message's ``DELETE`` share a transaction.
+A handler that raises leaves the message to come back after an exponential
+backoff (``OUTBOX_RETRY_DELAY`` doubling up to ``OUTBOX_RETRY_MAX_DELAY``,
+with jitter). After ``OUTBOX_MAX_ATTEMPTS`` it stays in the table with its
+``last_error`` and is no longer claimed. Setting ``attempts`` back to 0
+queues it again.
+
+Messages are claimed oldest first but run in parallel, so handlers must not
+rely on the order of messages.
+"""
+import logging
+import random
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .events import HANDLERS
+from .models import Message
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before retrying a message that has failed ``attempts`` times."""
+    delay = min(settings.OUTBOX_RETRY_MAX_DELAY, settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+    # Jitter spreads out retries of messages that failed together
+    return delay * random.uniform(0.5, 1.0)
+
+
+class Worker:
+
+    def __init__(self, threads=None, batch_size=None, poll_interval=None):
+        self.threads = threads or settings.OUTBOX_THREADS
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.OUTBOX_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.stopping = threading.Event()
+
+    def stop(self):
+        """Finish the current batch, then return from ``run()``."""
+        self.stopping.set()
+
+    def claim(self):
+        """Claim up to ``batch_size`` due messages, oldest first."""
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        due = Message.objects.filter(available_at__lte=now, attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+        ids = list(due.order_by('available_at', 'id').values_list('id', flat=True)[:self.batch_size])
+        if not ids:
+            return []
+        # Still due: of two workers that picked the same message, one gets it
+        due.filter(pk__in=ids).update(
+            claimed_by=token,
+            attempts=F('attempts') + 1,
+            available_at=now + timedelta(seconds=settings.OUTBOX_LEASE),
+        )
+        return list(Message.objects.filter(pk__in=ids, claimed_by=token).order_by('available_at', 'id'))
+
+    def process(self, message):
+        """Run ``message``'s handler and remove the message; ``False`` if it failed and was rescheduled."""
+        handle = HANDLERS.get(message.topic)
+        try:
+            if handle is None:
+                raise LookupError(f'No outbox handler for topic {message.topic!r}')
+            with transaction.atomic():
+                handle(message.payload)
+                Message.objects.filter(pk=message.pk, claimed_by=message.claimed_by).delete()
+        except Exception:
+            self.failed(message, traceback.format_exc())
+            return False
+        return True
+
+    def failed(self, message, error):
+        if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            logger.error('Outbox message %s gave up after %d attempts:\n%s', message, message.attempts, error)
+        else:
+            logger.warning('Outbox message %s failed, will retry:\n%s', message, error)
+        Message.objects.filter(pk=message.pk, claimed_by=message.claimed_by).update(
+            available_at=timezone.now() + timedelta(seconds=retry_delay(message.attempts)),
+            last_error=error,
+        )
+
+    def _process_in_thread(self, message):
+        # Pool threads keep their own connections; treat each message like a request
+        close_old_connections()
+        try:
+            return self.process(message)
+        finally:
+            close_old_connections()
+
+    def run_once(self, pool=None):
+        """
+        Claim and process one batch; returns ``(delivered, failed)``. Without
+        a ``pool`` the messages run one by one in the calling thread.
+        """
+        messages = self.claim()
+        if pool is None:
+            results = [self.process(message) for message in messages]
+        else:
+            results = list(pool.map(self._process_in_thread, messages))
+        delivered = sum(results)
+        return delivered, len(results) - delivered
+
+    def run(self, once=False):
+        """
+        Process batches until ``stop()`` is called, or with ``once`` until
+        nothing is due. Returns the ``(delivered, failed)`` totals.
+        """
+        delivered = failed = 0
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='outbox') as pool:
+            while not self.stopping.is_set():
+                close_old_connections()
+                batch_delivered, batch_failed = self.run_once(pool)
+                delivered += batch_delivered
+                failed += batch_failed
+                if batch_delivered or batch_failed:
+                    logger.info('Outbox batch: %d delivered, %d failed', batch_delivered, batch_failed)
+                if batch_delivered + batch_failed < self.batch_size:
+                    if once:
+                        break
+                    # Nothing more due right now
+                    self.stopping.wait(self.poll_interval)
+        return delivered, failed
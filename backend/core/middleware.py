@@ -0,0 +1,111 @@
+"""
+Negotiated response compression.
+
+``CompressionMiddleware`` replaces Django's ``GZipMiddleware``. It honours
+``Accept-Encoding`` q-values and prefers brotli, when the optional
+``brotli`` package is installed, over gzip. Bodies smaller than
+``settings.API_COMPRESSION_MIN_SIZE`` bytes and content types that are
+already compressed (images, archives) are sent as-is, as is any body
+that would not get smaller. gzip keeps Django's BREACH mitigation (random
+bytes in the header); brotli has no equivalent, so do not enable it for
+pages that mix secrets with reflected input.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+def accepted_encodings(header):
+    """Parse an ``Accept-Encoding`` header into ``{coding: q}``."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def available_encodings():
+    """Codings this server can produce, most preferred first."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate(header, encodings=None):
+    """Return the coding to use for a request's ``Accept-Encoding``, or ``None``."""
+    accepted = accepted_encodings(header)
+    best, best_quality = None, 0.0
+    for coding in encodings or available_encodings():
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(content, coding):
+    if coding == 'br':
+        return brotli.compress(content, quality=settings.API_BROTLI_QUALITY)
+    return compress_string(content, max_random_bytes=GZipMiddleware.max_random_bytes)
+
+
+class CompressionMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < settings.API_COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if response.streaming:
+            # Streams are compressed chunk by chunk, which only gzip supports here
+            if response.is_async or negotiate(accept_encoding, ['gzip']) is None:
+                return response
+            response.streaming_content = compress_sequence(
+                response.streaming_content, max_random_bytes=GZipMiddleware.max_random_bytes,
+            )
+            del response.headers['Content-Length']
+            coding = 'gzip'
+        else:
+            coding = negotiate(accept_encoding)
+            if coding is None:
+                return response
+            compressed = compress(response.content, coding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The encoded body is a different representation of the same
+        # content: weaken strong ETags so If-None-Match still matches
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
@@ -0,0 +1,118 @@
+"""
+Per-request SQL statistics.
+
+``QueryStatsMiddleware`` counts and times the queries a sampled request
+runs. ``settings.QUERY_STATS_SAMPLE_RATE`` sets the share of requests
+sampled. It adds a ``Server-Timing`` header (``db`` time and query count,
+``app`` time for the whole request) and logs one JSON line per sampled
+request to the ``core.querystats`` logger. A query shape that runs more
+than ``settings.QUERY_STATS_REPEAT_THRESHOLD`` times in one request is
+listed under ``repeated`` and logged as a warning, since it is usually a
+per-row lookup (N+1) that ``select_related`` or ``.values()`` would fold
+into the list query.
+
+Requests that are not sampled cost one random number. Sampled ones pay
+a timer and a dict update per query. Shapes are worked out once per
+distinct SQL string, when the response goes out. Literals and
+placeholders become ``?`` and ``IN`` lists collapse to ``(...)``, so
+``WHERE id = 7`` and ``WHERE id = 8`` are the same shape.
+"""
+import json
+import logging
+import random
+import re
+import time
+from contextlib import ExitStack
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('core.querystats')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def shape(sql):
+    """``sql`` with its literals and parameters replaced, for grouping repeated queries."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _LIST.sub('(...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """A ``connection.execute_wrapper`` that tallies every query it sees."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] = self.statements.get(sql, 0) + 1
+
+    def shapes(self):
+        """``{shape: executions}`` over the statements recorded so far."""
+        counts = {}
+        for sql, executions in self.statements.items():
+            key = shape(sql)
+            counts[key] = counts.get(key, 0) + executions
+        return counts
+
+    def repeated(self, threshold):
+        """``[(shape, executions), ...]`` for shapes run more than ``threshold`` times, most first."""
+        found = [(key, executions) for key, executions in self.shapes().items() if executions > threshold]
+        return sorted(found, key=lambda pair: -pair[1])
+
+
+class QueryStatsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.QUERY_STATS_SAMPLE_RATE:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        timing = f'db;dur={recorder.seconds * 1000:.1f};desc="{recorder.count} queries", app;dur={total * 1000:.1f}'
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+
+        repeated = recorder.repeated(settings.QUERY_STATS_REPEAT_THRESHOLD)
+        stats = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(recorder.seconds * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'repeated': [{'sql': key, 'count': executions} for key, executions in repeated],
+        }
+        logger.log(
+            logging.WARNING if repeated else logging.INFO,
+            json.dumps(stats, separators=(',', ':')),
+            extra={'query_stats': stats},
+        )
+        return response
@@ -0,0 +1,59 @@
+"""
+Fast JSON rendering for the API.
+
+``FastJSONRenderer`` is a drop-in replacement for DRF's ``JSONRenderer``.
+It encodes with the backend named by ``settings.API_JSON_BACKEND``: orjson
+(the default, several times faster) or the stdlib. orjson output is the
+same as ``JSONRenderer``'s: compact, UTF-8, with ``U+2028``/``U+2029``
+escaped. ``Decimal``, datetime and lazy string values go through DRF's own
+encoder. There are two differences. Float exponents are written ``1e16``,
+not ``1e+16``, which parses to the same number. Non-finite floats (NaN,
+infinities) become ``null``, where ``JSONRenderer`` raises ``ValueError``
+and turns the response into a 500: JSON has no such values, and one bad
+score should not cost the whole page. Anything orjson rejects, such as
+integers wider than 64 bits, and indented (browsable API) output fall
+back to the stdlib renderer.
+"""
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def backend():
+    """Return the JSON backend in use: ``'orjson'`` or ``'json'``."""
+    name = getattr(settings, 'API_JSON_BACKEND', 'orjson')
+    return 'orjson' if name == 'orjson' and orjson is not None else 'json'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` backed by orjson when available."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None
+            or backend() != 'orjson'
+            or not (self.compact and not self.ensure_ascii)
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict-JavaScript-subset escaping as JSONRenderer
+        if b'\xe2\x80' in content:
+            for raw, escaped in LINE_SEPARATORS:
+                content = content.replace(raw, escaped)
+        return content
@@ -34,6 +34,7 @@ LOCAL_APPS = [
     'apps.jobs',         # <-- enable jobs app
     # 'apps.checkins',     # <-- remove
     'apps.resume.apps.ResumeConfig',         # <-- new app for admin grouping
+    'apps.outbox',
     # 'apps.common',       # keep/remove as you wish
 ]
 
@@ -41,8 +42,10 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 
 MIDDLEWARE = [
+    'core.querystats.QueryStatsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,6 +82,31 @@ DATABASES = {
     }
 }
 
+# --- Cache -------------------------------------------------------
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='nextstep'),
+    }
+}
+
+# Rendered featured/recent feeds; short so "posted N minutes ago" stays fresh
+JOB_FEED_CACHE_TIMEOUT = config('JOB_FEED_CACHE_TIMEOUT', default=60, cast=int)
+
+# How long a response saved under an Idempotency-Key is replayed to retries
+IDEMPOTENCY_KEY_TIMEOUT = config('IDEMPOTENCY_KEY_TIMEOUT', default=24 * 60 * 60, cast=int)
+
+# --- Outbox worker (apps/outbox, `manage.py run_worker`) ---------
+OUTBOX_THREADS = config('OUTBOX_THREADS', default=4, cast=int)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=100, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=1.0, cast=float)
+# Seconds a claimed message stays hidden from other workers
+OUTBOX_LEASE = config('OUTBOX_LEASE', default=300, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=10, cast=int)
+# Backoff before the first retry, doubling per attempt up to the max
+OUTBOX_RETRY_DELAY = config('OUTBOX_RETRY_DELAY', default=5, cast=int)
+OUTBOX_RETRY_MAX_DELAY = config('OUTBOX_RETRY_MAX_DELAY', default=60 * 60, cast=int)
+
 # --- Auth --------------------------------------------------------
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -134,10 +162,51 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
 
+# JSON encoder behind FastJSONRenderer: 'orjson' (falls back to 'json'
+# when orjson is not installed) or 'json'
+API_JSON_BACKEND = config('API_JSON_BACKEND', default='orjson')
+
+# --- Compression ---------------------------------------------------------
+# Responses smaller than this go out uncompressed
+API_COMPRESSION_MIN_SIZE = config('API_COMPRESSION_MIN_SIZE', default=1024, cast=int)
+# 0-11; 5 beats gzip on size for job pages while compressing faster
+API_BROTLI_QUALITY = config('API_BROTLI_QUALITY', default=5, cast=int)
+
+# --- Query stats ---------------------------------------------------------
+# Share of requests (0-1) whose SQL is counted, timed and logged; see core/querystats.py
+QUERY_STATS_SAMPLE_RATE = config('QUERY_STATS_SAMPLE_RATE', default=1.0 if DEBUG else 0.01, cast=float)
+# A query shape run more times than this in one request is flagged as a likely N+1
+QUERY_STATS_REPEAT_THRESHOLD = config('QUERY_STATS_REPEAT_THRESHOLD', default=5, cast=int)
+# Flagged requests log at WARNING; INFO logs every sampled request
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.querystats': {
+            'handlers': ['console'],
+            'level': config('QUERY_STATS_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+        'apps.outbox': {
+            'handlers': ['console'],
+            'level': config('OUTBOX_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
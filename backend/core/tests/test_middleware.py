@@ -0,0 +1,109 @@
+"""
+``CompressionMiddleware``: ``Accept-Encoding`` negotiation, the minimum
+size, ``Vary`` and ETag weakening.
+"""
+import gzip
+import os
+import unittest
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core import middleware
+from core.middleware import CompressionMiddleware, accepted_encodings, negotiate
+
+BODY = b'{"results":[' + b','.join([b'{"title":"Lawn Mowing & Yard Work","tags":["Outdoors"]}'] * 100) + b']}'
+
+
+class NegotiationTests(SimpleTestCase):
+
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings('gzip;q=0.8, BR , identity;q=0, *;q=bad'),
+            {'gzip': 0.8, 'br': 1.0, 'identity': 0.0, '*': 0.0},
+        )
+
+    def test_negotiate(self):
+        both = ['br', 'gzip']
+        for header, expected in [
+            ('gzip, deflate, br', 'br'),
+            ('br;q=0.5, gzip', 'gzip'),
+            ('br;q=0, gzip', 'gzip'),
+            ('*', 'br'),
+            ('*;q=0.1, gzip;q=0.5', 'gzip'),
+            ('gzip;q=0', None),
+            ('identity', None),
+            ('', None),
+        ]:
+            with self.subTest(header):
+                self.assertEqual(negotiate(header, both), expected)
+        self.assertEqual(negotiate('gzip, br', ['gzip']), 'gzip')
+
+
+@override_settings(API_COMPRESSION_MIN_SIZE=200)
+class CompressionTests(SimpleTestCase):
+
+    def respond(self, accept_encoding='gzip', body=BODY, content_type='application/json', **headers):
+        request = RequestFactory().get('/api/jobs/jobs/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        response = HttpResponse(body, content_type=content_type, headers=headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip(self):
+        response = self.respond('gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    @unittest.skipIf(middleware.brotli is None, 'brotli is not installed')
+    def test_brotli_preferred(self):
+        response = self.respond('gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(middleware.brotli.decompress(response.content), BODY)
+        self.assertEqual(self.respond('gzip, br;q=0.5')['Content-Encoding'], 'gzip')
+
+    def test_identity(self):
+        for accept_encoding in ('identity', 'gzip;q=0', ''):
+            with self.subTest(accept_encoding):
+                response = self.respond(accept_encoding)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, BODY)
+                # The choice still depended on the header
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_minimum_size(self):
+        with override_settings(API_COMPRESSION_MIN_SIZE=len(BODY) + 1):
+            response = self.respond()
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+        with override_settings(API_COMPRESSION_MIN_SIZE=len(BODY)):
+            self.assertEqual(self.respond()['Content-Encoding'], 'gzip')
+
+    def test_left_alone(self):
+        noise = os.urandom(1024)
+        for name, response, body in (
+            ('image', self.respond(content_type='image/png'), BODY),
+            ('encoded', self.respond(**{'Content-Encoding': 'br'}), BODY),
+            ('incompressible', self.respond(body=noise), noise),
+        ):
+            with self.subTest(name):
+                self.assertNotEqual(response.get('Content-Encoding'), 'gzip')
+                self.assertEqual(response.content, body)
+
+    def test_vary_appended(self):
+        response = self.respond(Vary='Cookie')
+        self.assertEqual(response['Vary'], 'Cookie, Accept-Encoding')
+
+    def test_etag_weakened(self):
+        self.assertEqual(self.respond(ETag='"abc"')['ETag'], 'W/"abc"')
+        self.assertEqual(self.respond(ETag='W/"abc"')['ETag'], 'W/"abc"')
+        # Not compressed: the strong ETag still holds
+        self.assertEqual(self.respond('identity', ETag='"abc"')['ETag'], '"abc"')
+
+    def test_streaming(self):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='br, gzip')
+        response = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter([BODY[:500], BODY[500:]]), content_type='application/json'),
+        )(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), BODY)
@@ -0,0 +1,101 @@
+"""
+``QueryStatsMiddleware``: query shapes, N+1 flagging, sampling and the
+``Server-Timing`` header.
+"""
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from core.querystats import QueryRecorder, QueryStatsMiddleware, shape
+
+User = get_user_model()
+
+
+class ShapeTests(SimpleTestCase):
+
+    def test_literals_and_parameters(self):
+        self.assertEqual(
+            shape("SELECT * FROM t WHERE id = 7 AND name = 'O''Hara' AND rate > 17.5 AND x = %s"),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND rate > ? AND x = ?',
+        )
+
+    def test_in_lists_collapse(self):
+        self.assertEqual(shape('SELECT * FROM t WHERE id IN (%s, %s, %s)'), shape('SELECT * FROM t WHERE id IN (1,2)'))
+        self.assertEqual(shape('SELECT * FROM t WHERE id IN (?, ?)'), 'SELECT * FROM t WHERE id IN (...)')
+
+    def test_identifiers_and_whitespace(self):
+        self.assertEqual(shape('SELECT  "t2"."id"\n  FROM t2'), 'SELECT "t2"."id" FROM t2')
+
+
+class RecorderTests(SimpleTestCase):
+
+    def run_queries(self, recorder, *statements):
+        for sql in statements:
+            recorder(lambda sql, params, many, context: None, sql, (), False, {})
+
+    def test_repeated_over_threshold(self):
+        recorder = QueryRecorder()
+        lookups = [f'SELECT * FROM user WHERE id = {number}' for number in range(6)]
+        self.run_queries(recorder, 'SELECT * FROM job', *lookups, 'SELECT 1', 'SELECT 1')
+        self.assertEqual(recorder.count, 9)
+        self.assertEqual(recorder.repeated(5), [('SELECT * FROM user WHERE id = ?', 6)])
+        self.assertEqual(recorder.repeated(6), [])
+
+
+def list_with_lookups(request):
+    # An N+1: one query per user
+    for user_id in User.objects.values_list('id', flat=True):
+        User.objects.filter(pk=user_id).exists()
+    return HttpResponse('ok')
+
+
+@override_settings(QUERY_STATS_SAMPLE_RATE=1.0, QUERY_STATS_REPEAT_THRESHOLD=2)
+class MiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(User(username=f'user{number}') for number in range(3))
+
+    def setUp(self):
+        self.request = RequestFactory().get('/api/jobs/jobs/')
+
+    def test_header_and_log(self):
+        with self.assertLogs('core.querystats', 'INFO') as logs:
+            response = QueryStatsMiddleware(list_with_lookups)(self.request)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="4 queries", app;dur=[\d.]+$')
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+        stats = json.loads(logs.records[0].getMessage())
+        self.assertEqual((stats['path'], stats['status'], stats['queries']), ('/api/jobs/jobs/', 200, 4))
+        [repeated] = stats['repeated']
+        self.assertEqual(repeated['count'], 3)
+        table = User._meta.db_table
+        self.assertEqual(repeated['sql'], f'SELECT ? AS "a" FROM "{table}" WHERE "{table}"."id" = ? LIMIT ?')
+        self.assertEqual(logs.records[0].query_stats, stats)
+
+    def test_no_repeats_logs_info(self):
+        with self.assertLogs('core.querystats', 'INFO') as logs:
+            QueryStatsMiddleware(lambda request: HttpResponse(str(User.objects.count())))(self.request)
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        self.assertEqual(json.loads(logs.records[0].getMessage())['repeated'], [])
+
+    def test_existing_header_kept(self):
+        def view(request):
+            response = HttpResponse('ok')
+            response['Server-Timing'] = 'cache;desc="hit"'
+            return response
+        with self.assertLogs('core.querystats', 'INFO'):
+            response = QueryStatsMiddleware(view)(self.request)
+        self.assertTrue(response['Server-Timing'].startswith('cache;desc="hit", db;dur='))
+
+    @override_settings(QUERY_STATS_SAMPLE_RATE=0.25)
+    def test_sampling(self):
+        middleware = QueryStatsMiddleware(list_with_lookups)
+        with mock.patch('core.querystats.random.random', return_value=0.5), self.assertNoLogs('core.querystats'):
+            response = middleware(self.request)
+        self.assertFalse(response.has_header('Server-Timing'))
+        with mock.patch('core.querystats.random.random', return_value=0.1), self.assertLogs('core.querystats', 'INFO'):
+            response = middleware(self.request)
+        self.assertTrue(response.has_header('Server-Timing'))
@@ -0,0 +1,63 @@
+"""
+``FastJSONRenderer`` writes the same bytes as DRF's ``JSONRenderer``,
+except for non-finite floats, which it writes as ``null``.
+"""
+import unittest
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.renderers import FastJSONRenderer, backend
+
+DATA = {
+    'id': 7,
+    'title': 'Lawn care \u2014 caf\u00e9 \u2028 line \u2029 paragraph',
+    'rate': Decimal('17.50'),
+    'score': 0.8125,
+    'posted': datetime(2026, 5, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+    'day': date(2026, 5, 1),
+    'token': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'label': gettext_lazy('Part-time'),
+    'tags': ['Outdoors', None, True, False],
+    'counts': {1: 3, 'submitted': 0},
+    'nested': [{'latitude': None, 'longitude': -79.38}],
+}
+
+
+class RendererTests(SimpleTestCase):
+
+    def assertSameAsDRF(self, data, media_type=None):
+        self.assertEqual(FastJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+
+    @unittest.skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_orjson_in_use(self):
+        self.assertEqual(backend(), 'orjson')
+
+    def test_parity(self):
+        self.assertSameAsDRF(DATA)
+        self.assertSameAsDRF([DATA, DATA])
+        self.assertSameAsDRF({})
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_fallbacks(self):
+        # Wider than 64 bits
+        self.assertSameAsDRF({'big': 2 ** 70})
+        # The browsable API asks for indented output
+        self.assertSameAsDRF(DATA, 'application/json; indent=4')
+        with override_settings(API_JSON_BACKEND='json'):
+            self.assertEqual(backend(), 'json')
+            self.assertSameAsDRF(DATA)
+
+    @unittest.skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_non_finite_floats(self):
+        data = {'score': float('nan'), 'low': float('-inf'), 'high': float('inf')}
+        self.assertEqual(FastJSONRenderer().render(data), b'{"score":null,"low":null,"high":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+        with override_settings(API_JSON_BACKEND='json'), self.assertRaises(ValueError):
+            FastJSONRenderer().render(data)
@@ -23,8 +23,16 @@ def api_root(request):
                 "list": "/api/jobs/jobs/",
                 "featured": "/api/jobs/jobs/featured/",
                 "recent": "/api/jobs/jobs/recent/",
+                "facets": "/api/jobs/jobs/facets/",
+                "pay_histogram": "/api/jobs/jobs/pay-histogram/",
+                "recommended": "/api/jobs/jobs/recommended/",
+                "posted": "/api/jobs/jobs/posted/",
+                "similar": "/api/jobs/jobs/{id}/similar/",
                 "apply": "/api/jobs/jobs/{id}/apply/",
                 "applications": "/api/jobs/applications/",
+                "applications_received": "/api/jobs/applications/received/",
+                "applications_batch": "/api/jobs/applications/batch/",
+                "applications_bulk_status": "/api/jobs/applications/bulk-status/",
             }
         }
     })
@@ -8,6 +8,7 @@ export interface Job {
   hourly_rate_min: number;
   hourly_rate_max: number;
   hourly_rate_display: string;
+  pay_bucket: string;
   job_type: string;
   schedule: string;
   description: string;
@@ -19,6 +20,12 @@ export interface Job {
   posted_date: string;
   posted_date_display: string;
   is_active: boolean;
+  latitude: number | null;
+  longitude: number | null;
+}
+
+export interface RecommendedJob extends Job {
+  score: number;
 }
 
 export interface JobApplication {
@@ -35,6 +42,29 @@ export interface JobApplication {
   applicant_name: string;
 }
 
+// An application as listed with ?view=compact
+export interface JobApplicationSummary {
+  id: number;
+  job: Pick<Job, 'id' | 'title' | 'company'>;
+  status: string;
+  applied_date: string;
+  last_updated: string;
+  applicant_name: string;
+}
+
+// One of the current user's postings, with its application counts by status
+export interface PostedJob extends Job {
+  applications: {
+    total: number;
+    submitted: number;
+    under_review: number;
+    interview_scheduled: number;
+    interviewed: number;
+    hired: number;
+    rejected: number;
+  };
+}
+
 export interface JobApplicationCreate {
   job: number;
   cover_letter: string;
@@ -44,17 +74,54 @@ export interface JobApplicationCreate {
   questions?: string;
 }
 
+export interface BatchApplyResult {
+  applied: number;
+  results: {
+    job: number;
+    result: 'applied' | 'already_applied' | 'not_found';
+    application_id?: number;
+  }[];
+}
+
+export interface BulkStatusResult {
+  status: string;
+  updated: number[];
+  skipped: { id: number; status: string }[];
+  not_found?: number[];
+}
+
 export interface JobFilters {
   job_type?: string;
   schedule?: string;
   location?: string;
-  pay_range?: string;
+  pay_range?: string;  // a pay bucket key from getPayHistogram()
   search?: string;
+  near?: { latitude: number; longitude: number };
+  radius_km?: number;
+}
+
+export interface PayBucket {
+  value: string;
+  label: string;
+  count: number;
+}
+
+export interface PayHistogram {
+  count: number;
+  buckets: PayBucket[];
+  min: string | null;
+  median: string | null;
+  max: string | null;
+}
+
+export interface JobsPage {
+  jobs: Job[];
+  next: string | null;
 }
 
 export class JobsAPI {
-  // Get all jobs with optional filters
-  static async getJobs(filters?: JobFilters): Promise<Job[]> {
+  // Translate UI filters into backend query parameters
+  private static buildParams(filters?: JobFilters): URLSearchParams {
     const params = new URLSearchParams();
     
     if (filters) {
@@ -68,20 +135,25 @@ export class JobsAPI {
         params.append('location', filters.location);
       }
       if (filters.pay_range && filters.pay_range !== 'All') {
-        // Convert frontend pay range to backend format
-        const payRangeMap: { [key: string]: string } = {
-          'Under $10': 'under_10',
-          '$10-15': '10_15',
-          '$15-20': '15_20',
-          '$20+': '20_plus'
-        };
-        params.append('pay_range', payRangeMap[filters.pay_range] || '');
+        params.append('pay_range', filters.pay_range);
       }
       if (filters.search) {
         params.append('search', filters.search);
       }
+      if (filters.near) {
+        params.append('near', `${filters.near.latitude},${filters.near.longitude}`);
+        if (filters.radius_km) {
+          params.append('radius_km', String(filters.radius_km));
+        }
+      }
     }
     
+    return params;
+  }
+
+  // Get all jobs with optional filters
+  static async getJobs(filters?: JobFilters): Promise<Job[]> {
+    const params = JobsAPI.buildParams(filters);
     const url = `/api/jobs/jobs/?${params.toString()}`;
     
     const response = await apiClient.get<{count: number, results: Job[]}>(url);
@@ -98,6 +170,53 @@ export class JobsAPI {
     return response.data || [];
   }
 
+  // Get one page of jobs. Pass an empty cursor for the first page and the
+  // returned `next` for the following ones; `next` is null on the last page.
+  // Jobs come newest first through keyset (cursor) pagination. Search and
+  // `near` results are ranked by relevance or distance instead, which the
+  // backend only pages by number, so for those `next` is a page number.
+  static async getJobsPage(filters?: JobFilters, cursor: string = ''): Promise<JobsPage> {
+    const params = JobsAPI.buildParams(filters);
+    const pageParam = filters?.search || filters?.near ? 'page' : 'cursor';
+    if (pageParam === 'cursor' || cursor) {
+      params.append(pageParam, cursor);
+    }
+    
+    const response = await apiClient.get<{next: string | null, results: Job[]}>(
+      `/api/jobs/jobs/?${params.toString()}`
+    );
+    
+    if (response.error) {
+      throw new Error(response.error);
+    }
+    
+    const next = response.data?.next ? new URL(response.data.next).searchParams.get(pageParam) : null;
+    
+    return {
+      jobs: response.data?.results || [],
+      next
+    };
+  }
+
+  // Get the pay buckets with job counts and min/median/max hourly rate.
+  // The buckets are defined by the backend; use their `value` as pay_range.
+  static async getPayHistogram(filters?: JobFilters): Promise<PayHistogram> {
+    const params = JobsAPI.buildParams(filters);
+    const response = await apiClient.get<PayHistogram>(
+      `/api/jobs/jobs/pay-histogram/?${params.toString()}`
+    );
+    
+    if (response.error) {
+      throw new Error(response.error);
+    }
+    
+    if (!response.data) {
+      throw new Error('Failed to load pay histogram');
+    }
+    
+    return response.data;
+  }
+
   // Get a specific job by ID
   static async getJob(id: number): Promise<Job> {
     const response = await apiClient.get<Job>(`/api/jobs/jobs/${id}/`);
@@ -145,6 +264,44 @@ export class JobsAPI {
     return response.data || [];
   }
 
+  // Get active jobs ranked against the current user's resume (requires login).
+  // Each job carries a match `score` between 0 and 1.
+  static async getRecommendedJobs(limit: number = 20): Promise<RecommendedJob[]> {
+    const response = await apiClient.get<{count: number, results: RecommendedJob[]}>(
+      `/api/jobs/jobs/recommended/?limit=${limit}`
+    );
+    
+    if (response.error) {
+      throw new Error(response.error);
+    }
+    
+    return response.data?.results || [];
+  }
+
+  // The current user's job postings, newest first, with application counts
+  static async getPostedJobs(): Promise<PostedJob[]> {
+    const response = await apiClient.get<{count: number, results: PostedJob[]}>('/api/jobs/jobs/posted/');
+    
+    if (response.error) {
+      throw new Error(response.error);
+    }
+    
+    return response.data?.results || [];
+  }
+
+  // Get the jobs most similar to a job, most similar first
+  static async getSimilarJobs(jobId: number): Promise<RecommendedJob[]> {
+    const response = await apiClient.get<{count: number, results: RecommendedJob[]}>(
+      `/api/jobs/jobs/${jobId}/similar/`
+    );
+    
+    if (response.error) {
+      throw new Error(response.error);
+    }
+    
+    return response.data?.results || [];
+  }
+
   // Apply to a job
   static async applyToJob(jobId: number, application: Omit<JobApplicationCreate, 'job'>): Promise<{ message: string; application_id: number }> {
     const response = await apiClient.post<{ message: string; application_id: number }>(
@@ -163,6 +320,27 @@ export class JobsAPI {
     return response.data;
   }
 
+  // Apply to several jobs with the same application; one result per job
+  static async applyToJobs(
+    jobIds: number[],
+    application: Omit<JobApplicationCreate, 'job'>
+  ): Promise<BatchApplyResult> {
+    const response = await apiClient.post<BatchApplyResult>('/api/jobs/applications/batch/', {
+      jobs: jobIds,
+      ...application,
+    });
+    
+    if (response.error) {
+      throw new Error(response.error);
+    }
+    
+    if (!response.data) {
+      throw new Error('Failed to submit applications');
+    }
+    
+    return response.data;
+  }
+
   // Get user's job applications
   static async getUserApplications(): Promise<JobApplication[]> {
     const response = await apiClient.get<{count: number, results: JobApplication[]}>('/api/jobs/applications/');
@@ -179,6 +357,23 @@ export class JobsAPI {
     return response.data || [];
   }
 
+  // Applications to the current user's job postings (for employers)
+  static async getReceivedApplications(status?: string): Promise<JobApplicationSummary[]> {
+    const params = new URLSearchParams({ view: 'compact' });
+    if (status) {
+      params.append('status', status);
+    }
+    const response = await apiClient.get<{count: number, results: JobApplicationSummary[]}>(
+      `/api/jobs/applications/received/?${params}`
+    );
+    
+    if (response.error) {
+      throw new Error(response.error);
+    }
+    
+    return response.data?.results || [];
+  }
+
   // Get a specific application
   static async getApplication(id: number): Promise<JobApplication> {
     const response = await apiClient.get<JobApplication>(`/api/jobs/applications/${id}/`);
@@ -211,4 +406,26 @@ export class JobsAPI {
     
     return response.data;
   }
-} 
\ No newline at end of file
+
+  // Move many applications to one status (for employers), picked by id or by
+  // job and current status. Moves the status does not allow come back in `skipped`.
+  static async bulkUpdateApplicationStatus(
+    status: string,
+    selection: { ids: number[] } | { filter: { job?: number; status?: string } }
+  ): Promise<BulkStatusResult> {
+    const response = await apiClient.post<BulkStatusResult>('/api/jobs/applications/bulk-status/', {
+      status,
+      ...selection,
+    });
+    
+    if (response.error) {
+      throw new Error(response.error);
+    }
+    
+    if (!response.data) {
+      throw new Error('Failed to update statuses');
+    }
+    
+    return response.data;
+  }
+}
@@ -1,8 +1,9 @@
-import { writable } from 'svelte/store';
+import { get, writable } from 'svelte/store';
 import { JobsAPI, type Job, type JobApplication, type JobFilters } from '$lib/api/jobs';
 
 interface JobsState {
   jobs: Job[];
+  nextCursor: string | null;
   applications: JobApplication[];
   selectedJob: Job | null;
   isLoading: boolean;
@@ -13,6 +14,7 @@ interface JobsState {
 function createJobsStore() {
   const { subscribe, set, update } = writable<JobsState>({
     jobs: [],
+    nextCursor: null,
     applications: [],
     selectedJob: null,
     isLoading: false,
@@ -28,10 +30,11 @@ function createJobsStore() {
       update(state => ({ ...state, isLoading: true, error: null }));
       
       try {
-        const jobs = await JobsAPI.getJobs(filters);
+        const page = await JobsAPI.getJobsPage(filters);
         update(state => ({ 
           ...state, 
-          jobs, 
+          jobs: page.jobs, 
+          nextCursor: page.next,
           isLoading: false,
           filters: filters || {}
         }));
@@ -45,13 +48,39 @@ function createJobsStore() {
       }
     },
 
+    // Append the next page of jobs (the jobs page's "Load more" button)
+    async loadMoreJobs() {
+      const state = get({ subscribe });
+      if (state.isLoading || !state.nextCursor) {
+        return;
+      }
+      
+      update(state => ({ ...state, isLoading: true, error: null }));
+      
+      try {
+        const page = await JobsAPI.getJobsPage(state.filters, state.nextCursor);
+        update(state => ({ 
+          ...state, 
+          jobs: [...state.jobs, ...page.jobs], 
+          nextCursor: page.next,
+          isLoading: false
+        }));
+      } catch (error) {
+        update(state => ({ 
+          ...state, 
+          isLoading: false, 
+          error: error instanceof Error ? error.message : 'Failed to load more jobs'
+        }));
+      }
+    },
+
     // Load featured jobs
     async loadFeaturedJobs() {
       update(state => ({ ...state, isLoading: true, error: null }));
       
       try {
         const jobs = await JobsAPI.getFeaturedJobs();
-        update(state => ({ ...state, jobs, isLoading: false }));
+        update(state => ({ ...state, jobs, nextCursor: null, isLoading: false }));
       } catch (error) {
         update(state => ({ 
           ...state, 
@@ -113,6 +142,7 @@ function createJobsStore() {
     reset() {
       set({
         jobs: [],
+        nextCursor: null,
         applications: [],
         selectedJob: null,
         isLoading: false,